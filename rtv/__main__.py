@@ -11,7 +11,7 @@ import logging
 import warnings
 
 import six
-import requests
+from six.moves.urllib.parse import urlparse
 
 # Need to check for curses compatibility before performing the rtv imports
 try:
@@ -35,9 +35,12 @@ if RTV_BROWSER:
 from . import docs
 from . import packages
 from .packages import praw
-from .config import Config, copy_default_config, copy_default_mailcap
+from .config import (
+    Config, copy_default_config, copy_default_mailcap, HTTP_CACHE)
 from .theme import Theme
-from .oauth import OAuthHelper
+from .oauth import OAuthHelper, TokenRefresher
+from .startup import (
+    StartupTrace, Task, warm_connection, expand_link, prefetch_listing)
 from .terminal import Terminal
 from .content import RequestHeaderRateLimiter
 from .objects import curses_session, patch_webbrowser
@@ -60,6 +63,8 @@ _logger = logging.getLogger(__name__)
 def main():
     """Main entry point"""
 
+    trace = StartupTrace()
+
     # Squelch SSL warnings
     logging.captureWarnings(True)
     if six.PY3:
@@ -72,13 +77,14 @@ def main():
         sys.stdout.write('\x1b]2;{0}\x07'.format(title))
         sys.stdout.flush()
 
-    args = Config.get_args()
-    fargs, bindings = Config.get_file(args.get('config'))
+    with trace.phase('config'):
+        args = Config.get_args()
+        fargs, bindings = Config.get_file(args.get('config'))
 
-    # Apply the file config first, then overwrite with any command line args
-    config = Config()
-    config.update(**fargs)
-    config.update(**args)
+        # Apply the file config first, then overwrite with command line args
+        config = Config()
+        config.update(**fargs)
+        config.update(**args)
 
     # If key bindings are supplied in the config file, overwrite the defaults
     if bindings:
@@ -182,57 +188,95 @@ def main():
         return
 
     try:
+        handler = RequestHeaderRateLimiter(
+            cache_file=HTTP_CACHE if config['persistent_cache'] else None,
+            cache_max_entries=config['response_cache_entries'],
+            cache_max_bytes=config['response_cache_mb'] * 1024 * 1024)
+
+        with trace.phase('reddit'):
+            reddit = praw.Reddit(user_agent=user_agent,
+                                 decode_html_entities=True,
+                                 lazy_objects=True,
+                                 disable_update_check=True,
+                                 timeout=10,  # 10 second request timeout
+                                 handler=handler)
+
+        # Dial the request cache up from 30 seconds to 5 minutes
+        # I'm trying this out to make navigation back and forth
+        # between pages quicker, it may still need to be fine tuned.
+        reddit.config.api_request_delay = 300
+
+        # Keep the access token fresh so requests aren't rejected mid-session
+        refresher = TokenRefresher(reddit).start()
+
+        # Startup is split up so that the network round trips overlap with
+        # each other and with setting up the terminal:
+        #
+        #   connect -> warm up the connection that the pages will use
+        #   login   -> refresh the access token
+        #   link    -> expand short links, doesn't need to be logged in
+        #   listing -> the first page of the subreddit, needs the login
+        #
+        # The main thread initializes curses and the theme in the meantime,
+        # and waits for the login under the loader so errors are handled as
+        # usual. The pages still load their own content, and pick up the
+        # background requests through the handler's request cache.
+        autologin = config['autologin'] and config.refresh_token
+        host = reddit.config.oauth_url if autologin else reddit.config.api_url
+        Task('connect ' + urlparse(host).netloc, warm_connection,
+             (handler.http, host, reddit.http.headers), trace=trace).start()
+
+        login = None
+        if autologin:
+            handler.set_account(config.refresh_token)
+            login = Task('login', reddit.refresh_access_information,
+                         (config.refresh_token,), trace=trace).start()
+
+        link = None
+        if config['link']:
+            link = Task('expand link', expand_link,
+                        (reddit, config['link']), trace=trace).start()
+        else:
+            # Nothing else is shown first, so load the subreddit right away
+            Task('first listing', prefetch_listing,
+                 (reddit, config['subreddit']),
+                 after=[login] if login else [], trace=trace).start()
+
         with curses_session() as stdscr:
 
-            term = Terminal(stdscr, config)
-
-            if config['monochrome'] or config['theme'] == 'monochrome':
-                _logger.info('Using monochrome theme')
-                theme = Theme(use_color=False)
-            elif config['theme'] and config['theme'] != 'default':
-                _logger.info('Loading theme: %s', config['theme'])
-                theme = Theme.from_name(config['theme'])
-            else:
-                # Set to None to let the terminal figure out which theme
-                # to use depending on if colors are supported or not
-                theme = None
-            term.set_theme(theme)
-
-            with term.loader('Initializing', catch_exception=False):
-                reddit = praw.Reddit(user_agent=user_agent,
-                                     decode_html_entities=False,
-                                     disable_update_check=True,
-                                     timeout=10,  # 10 second request timeout
-                                     handler=RequestHeaderRateLimiter())
-
-            # Dial the request cache up from 30 seconds to 5 minutes
-            # I'm trying this out to make navigation back and forth
-            # between pages quicker, it may still need to be fine tuned.
-            reddit.config.api_request_delay = 300
+            with trace.phase('terminal'):
+                term = Terminal(stdscr, config)
+
+                if config['monochrome'] or config['theme'] == 'monochrome':
+                    _logger.info('Using monochrome theme')
+                    theme = Theme(use_color=False)
+                elif config['theme'] and config['theme'] != 'default':
+                    _logger.info('Loading theme: %s', config['theme'])
+                    theme = Theme.from_name(config['theme'])
+                else:
+                    # Set to None to let the terminal figure out which theme
+                    # to use depending on if colors are supported or not
+                    theme = None
+                term.set_theme(theme)
 
             # Authorize on launch if the refresh token is present
             oauth = OAuthHelper(reddit, term, config)
-            if config['autologin'] and config.refresh_token:
-                oauth.authorize(autologin=True)
+            if autologin:
+                oauth.authorize(autologin=True, refresh=login)
 
             # Open the supplied submission link before opening the subreddit
-            if config['link']:
-                # Expand shortened urls like https://redd.it/
-                # Praw won't accept the shortened versions, add the reddit
-                # headers to avoid a 429 response from reddit.com
-                url = requests.head(
-                    config['link'],
-                    headers=reddit.http.headers,
-                    allow_redirects=True
-                ).url
-
+            if link:
                 page = None
                 with term.loader('Loading submission'):
                     try:
-                        page = SubmissionPage(reddit, term, config, oauth, url)
+                        with trace.phase('submission page'):
+                            url = link.result()
+                            page = SubmissionPage(
+                                reddit, term, config, oauth, url)
                     except Exception as e:
                         _logger.exception(e)
-                        raise SubmissionError('Unable to load {0}'.format(url))
+                        raise SubmissionError(
+                            'Unable to load {0}'.format(config['link']))
                 while page:
                     page = page.loop()
 
@@ -240,7 +284,8 @@ def main():
             name = config['subreddit']
             with term.loader('Loading subreddit'):
                 try:
-                    page = SubredditPage(reddit, term, config, oauth, name)
+                    with trace.phase('subreddit page'):
+                        page = SubredditPage(reddit, term, config, oauth, name)
                 except Exception as e:
                     # If we can't load the subreddit that was requested, try
                     # to load the "popular" page instead so at least the
@@ -272,9 +317,19 @@ def main():
     finally:
         # Try to save the browsing history
         config.save_history()
+        _logger.info('Startup trace:\n%s', trace.format())
+        if config['startup_trace']:
+            print(trace.format())
+        if 'refresher' in locals():
+            refresher.stop()
         # Ensure sockets are closed to prevent a ResourceWarning
         if 'reddit' in locals():
+            _logger.info('Request cache stats: %s', reddit.handler.cache.stats())
+            _logger.info('Coalesced request stats: %s',
+                         reddit.handler.single_flight.stats())
             reddit.handler.http.close()
+            if reddit.handler.disk_cache:
+                reddit.handler.disk_cache.close()
 
 
 sys.exit(main())
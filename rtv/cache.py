@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from timeit import default_timer as timer
+
+from six.moves import cPickle
+
+_logger = logging.getLogger(__name__)
+
+
+class LRUCache(object):
+    """
+    An in-memory cache with a bounded size and time based expiration.
+
+    Entries are kept in two ordered dicts, one sorted by the last time that
+    each entry was accessed and the other by the time that it was created.
+    When the cache grows past the maximum number of entries or bytes, the
+    least recently used entries are evicted. Entries are usually created when
+    they're added, so they're appended to the end of the creation order. An
+    entry that was already some age when it was added, e.g. a response that
+    was loaded from disk, is moved back in front of the entries that are
+    newer than it. Expired entries are then always at the front of the
+    creation order and can be removed without scanning the whole cache.
+
+    The cache can be used like a dict. Lookups through `get()` will update
+    the hit and miss counters.
+    """
+
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=len):
+        """
+        Params:
+            max_entries (int): Maximum number of entries to keep.
+            max_bytes (int): Maximum combined size of all of the entries.
+            sizeof (function): Returns the size of a value in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, size), LRU first
+        self._timestamps = OrderedDict()  # key -> timestamp, oldest first
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def __getitem__(self, key):
+        return self._entries[key][0]
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def keys(self):
+        return list(self._entries)
+
+    def values(self):
+        return [value for value, _ in list(self._entries.values())]
+
+    def get(self, key, default=None, max_age=None):
+        """
+        Return the value for the key and mark it as recently used.
+
+        If `max_age` is given, entries that were created more than `max_age`
+        seconds ago are treated as missing, but they're left in the cache.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+
+            if max_age is not None and \
+                    timer() - self._timestamps[key] > max_age:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            item = self._entries.pop(key)
+            self._entries[key] = item
+            return item[0]
+
+    def set(self, key, value, age=0):
+        """
+        Add the value to the cache. If it was created `age` seconds ago, it
+        will expire that much sooner than a value that was just created.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            size = self.sizeof(value)
+            self._entries[key] = (value, size)
+            self._insert_timestamp(key, timer() - age)
+            self.size += size
+
+            while self._entries and self._is_full():
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _insert_timestamp(self, key, timestamp):
+        # Set aside the entries that were created after this one, so it can
+        # be inserted in front of them
+        newer = []
+        while self._timestamps:
+            last = next(reversed(self._timestamps))
+            if self._timestamps[last] <= timestamp:
+                break
+            newer.append((last, self._timestamps.pop(last)))
+
+        self._timestamps[key] = timestamp
+        for item in reversed(newer):
+            self._timestamps[item[0]] = item[1]
+
+    def expire(self, timeout):
+        """
+        Remove all of the entries that were added more than `timeout` seconds
+        ago.
+        """
+        with self._lock:
+            now = timer()
+            while self._timestamps:
+                key, timestamp = next(iter(self._timestamps.items()))
+                if now - timestamp <= timeout:
+                    break
+                self._remove(key)
+                self.expirations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._timestamps.clear()
+            self.size = 0
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations}
+
+    def _is_full(self):
+        max_entries = self.max_entries
+        if max_entries is not None and len(self._entries) > max_entries:
+            return True
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            return True
+        return False
+
+    def _remove(self, key):
+        _, size = self._entries.pop(key)
+        del self._timestamps[key]
+        self.size -= size
+
+
+class DiskCache(object):
+    """
+    A persistent key-value store backed by a sqlite database.
+
+    Values are pickled and stored along with the time that they were written,
+    so callers can decide for themselves if an entry is still fresh enough to
+    use. Each entry can optionally be tagged with a url, which allows groups of
+    entries to be evicted together.
+
+    The cache should never be allowed to crash the program. If the database
+    can't be opened or becomes corrupt, the error is logged and the cache
+    behaves as if it were empty.
+    """
+
+    def __init__(self, filename, max_age=None):
+        """
+        Params:
+            filename (str): Path to the sqlite database file, the parent
+                directory will be created if it doesn't exist.
+            max_age (float): Entries older than this many seconds will be
+                removed when the cache is opened.
+        """
+        self.filename = filename
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = None
+
+        try:
+            self._open()
+        except (sqlite3.Error, OSError, IOError) as e:
+            _logger.warning('Unable to open cache %s: %s', filename, e)
+            self._conn = None
+
+    def _open(self):
+        dirname = os.path.dirname(self.filename)
+        if dirname and not os.path.exists(dirname):
+            os.makedirs(dirname)
+
+        # The connection is shared between the main thread and background
+        # loaders, access is serialized with self._lock
+        self._conn = sqlite3.connect(self.filename, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, url TEXT, timestamp REAL, value BLOB)')
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS cache_url ON cache (url)')
+            if self.max_age is not None:
+                self._conn.execute(
+                    'DELETE FROM cache WHERE timestamp < ?',
+                    (time.time() - self.max_age,))
+
+    def _execute(self, sql, args=()):
+        """
+        Run a statement and return all of the resulting rows. Database errors
+        are logged and an empty result is returned.
+        """
+        if self._conn is None:
+            return []
+
+        with self._lock:
+            try:
+                with self._conn:
+                    return self._conn.execute(sql, args).fetchall()
+            except sqlite3.Error as e:
+                _logger.warning('Cache error: %s', e)
+                return []
+
+    def get(self, key):
+        """
+        Return a tuple of (timestamp, value) for the given key, or None if the
+        key is not in the cache.
+        """
+        rows = self._execute(
+            'SELECT timestamp, value FROM cache WHERE key = ?', (key,))
+        if not rows:
+            return None
+
+        timestamp, value = rows[0]
+        try:
+            return timestamp, cPickle.loads(bytes(value))
+        except Exception as e:
+            _logger.warning('Discarding unreadable cache entry: %s', e)
+            self.delete(key)
+            return None
+
+    def set(self, key, value, url=None):
+        data = cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL)
+        self._execute(
+            'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+            (key, url, time.time(), sqlite3.Binary(data)))
+
+    def delete(self, key):
+        self._execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def evict(self, urls):
+        """
+        Remove all of the entries that were tagged with any of the given urls.
+        """
+        for url in urls:
+            self._execute('DELETE FROM cache WHERE url = ?', (url,))
+
+    def clear(self):
+        self._execute('DELETE FROM cache')
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
@@ -21,11 +21,16 @@ DEFAULT_MAILCAP = os.path.join(TEMPLATES, 'mailcap')
 DEFAULT_THEMES = os.path.join(PACKAGE, 'themes')
 XDG_CONFIG_HOME = os.getenv('XDG_CONFIG_HOME', os.path.join(HOME, '.config'))
 XDG_DATA_HOME = os.getenv('XDG_DATA_HOME', os.path.join(HOME, '.local', 'share'))
+XDG_CACHE_HOME = os.getenv('XDG_CACHE_HOME', os.path.join(HOME, '.cache'))
 CONFIG = os.path.join(XDG_CONFIG_HOME, 'rtv', 'rtv.cfg')
 MAILCAP = os.path.join(HOME, '.mailcap')
 TOKEN = os.path.join(XDG_DATA_HOME, 'rtv', 'refresh-token')
 HISTORY = os.path.join(XDG_DATA_HOME, 'rtv', 'history.log')
 THEMES = os.path.join(XDG_CONFIG_HOME, 'rtv', 'themes')
+PARSERS = os.path.join(XDG_CONFIG_HOME, 'rtv', 'parsers')
+HTTP_CACHE = os.path.join(XDG_CACHE_HOME, 'rtv', 'http-cache.db')
+MIME_CACHE = os.path.join(XDG_CACHE_HOME, 'rtv', 'mime-cache.db')
+MAILCAP_CACHE = os.path.join(XDG_CACHE_HOME, 'rtv', 'mailcap.db')
 
 
 def build_parser():
@@ -87,6 +92,9 @@ def build_parser():
     parser.add_argument(
         '--debug-info', dest='debug_info', action='store_const', const=True,
         help='Show system and environment information and exit')
+    parser.add_argument(
+        '--startup-trace', dest='startup_trace', action='store_const',
+        const=True, help='Print the time taken by each phase of startup on exit')
     return parser
 
 
@@ -276,7 +284,13 @@ class Config(object):
             'max_pager_cols': partial(config.getint, 'rtv'),
             'hide_username': partial(config.getboolean, 'rtv'),
             'flash': partial(config.getboolean, 'rtv'),
-            'force_new_browser_window': partial(config.getboolean, 'rtv')
+            'force_new_browser_window': partial(config.getboolean, 'rtv'),
+            'prefetch_items': partial(config.getint, 'rtv'),
+            'media_prefetch': partial(config.getint, 'rtv'),
+            'persistent_cache': partial(config.getboolean, 'rtv'),
+            'response_cache_entries': partial(config.getint, 'rtv'),
+            'response_cache_mb': partial(config.getint, 'rtv'),
+            'low_memory': partial(config.getboolean, 'rtv')
         }
 
         for key, func in params.items():
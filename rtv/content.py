@@ -2,26 +2,192 @@
 from __future__ import unicode_literals
 
 import re
+import sys
 import time
+import hashlib
 import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
 from datetime import datetime
-from timeit import default_timer as timer
 
 import six
-from bs4 import BeautifulSoup
+import requests
 from kitchen.text.display import wrap
 
 from . import exceptions
+from .cache import DiskCache, LRUCache
+from .records import (
+    SubmissionRecord, CommentRecord, MoreCommentsRecord, SavedCommentRecord,
+    SubscriptionRecord, MessageRecord)
 from .packages import praw
 from .packages.praw.errors import InvalidSubreddit
 from .packages.praw.helpers import normalize_url
-from .packages.praw.handlers import DefaultHandler
+from .packages.praw.handlers import DefaultHandler, SingleFlight
 
 _logger = logging.getLogger(__name__)
 
 
+class RequestPriority(object):
+    """
+    Marks the http requests made by a thread as background requests, which
+    are paced more conservatively by RequestHeaderRateLimiter so they don't
+    use up the rate limit that the user's own requests need. Requests from
+    threads without a priority are treated as interactive.
+
+    The priority can be raised from another thread, e.g. when the user has
+    caught up with a prefetcher and is now waiting for the same request.
+
+    >>> priority = RequestPriority()
+    >>> with priority.use():
+    >>>     reddit.get_subreddit('python').get_hot()
+    """
+
+    _local = threading.local()
+
+    def __init__(self, background=True):
+        self.background = background
+
+    @classmethod
+    def is_background(cls):
+        """
+        Check if the current thread is making background requests.
+        """
+        priority = getattr(cls._local, 'priority', None)
+        return priority is not None and priority.background
+
+    @contextmanager
+    def use(self):
+        previous = getattr(self._local, 'priority', None)
+        self._local.priority = self
+        try:
+            yield self
+        finally:
+            self._local.priority = previous
+
+
+class Prefetcher(object):
+    """
+    Wrap a lazy PRAW generator and pull items from it on a background thread
+    before they are needed.
+
+    PRAW listings are loaded one page at a time, and the next page is only
+    requested when the generator runs out of items. Calling `prefetch()` when
+    the cursor nears the end of the loaded content will start a worker thread
+    that reads the next `batch_size` items into a buffer, so the http request
+    for the following page happens while the user is still reading. Iterating
+    over the prefetcher drains the buffer first, waits for a running worker to
+    finish, and falls back to reading from the generator directly.
+
+    Exceptions raised by the generator inside of the worker are stored and
+    re-raised on the main thread when the failed item is requested, so they
+    can be caught by the loader as usual.
+
+    >>> items = Prefetcher(reddit.get_subreddit('python').get_hot())
+    >>> items.prefetch()
+    >>> with term.loader('Loading more submissions'):
+    >>>     submission = next(items)
+    """
+
+    def __init__(self, iterable, transform=None, batch_size=25):
+        """
+        Params:
+            iterable: The generator that items will be pulled from.
+            transform (function): Optional function that will be applied to
+                each item inside of the worker thread.
+            batch_size (int): Number of items to read ahead on each prefetch.
+        """
+        self.batch_size = batch_size
+        self._iterable = iter(iterable)
+        self._transform = transform
+        self._buffer = deque()
+        self._exc_info = None
+        self._exhausted = False
+        self._thread = None
+        self._priority = None
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.wait()
+        if not self._buffer and not self._done:
+            self._fill(1)
+
+        if self._buffer:
+            return self._buffer.popleft()
+        elif self._exc_info:
+            exc_info, self._exc_info = self._exc_info, None
+            six.reraise(*exc_info)
+        else:
+            raise StopIteration
+
+    next = __next__  # Python 2
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def _done(self):
+        return self._exhausted or self._exc_info is not None
+
+    def prefetch(self):
+        """
+        Start reading the next batch of items in the background, unless a
+        worker is already running or enough items have been buffered.
+        """
+        if self.running or self._done:
+            return
+        if len(self._buffer) >= self.batch_size:
+            return
+
+        count = self.batch_size - len(self._buffer)
+        self._priority = RequestPriority()
+        self._thread = threading.Thread(
+            target=self._fill, args=(count, self._priority))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wait(self):
+        """
+        Block until the background worker has finished.
+        """
+        if self.running:
+            # The user is waiting on the worker now
+            self._priority.background = False
+        # Join with a timeout so the wait can be interrupted with ctrl-c
+        while self.running:
+            self._thread.join(0.05)
+
+    def _fill(self, count, priority=None):
+        if priority is None:
+            priority = RequestPriority(background=False)
+
+        # The lock guards against the generator being advanced by two
+        # threads at the same time, which would raise a ValueError
+        with self._lock, priority.use():
+            for _ in range(count):
+                try:
+                    item = next(self._iterable)
+                    if self._transform is not None:
+                        item = self._transform(item)
+                except StopIteration:
+                    self._exhausted = True
+                    break
+                except Exception:
+                    _logger.info('Prefetch failed', exc_info=True)
+                    self._exc_info = sys.exc_info()
+                    break
+                self._buffer.append(item)
+
+
 class Content(object):
 
+    # Shared between all of the pages, see wrap_text()
+    _wrap_cache = LRUCache(max_entries=4096)
+
     def get(self, index, n_cols):
         """
         Grab the item at the given index, and format the text to fit a width of
@@ -81,15 +247,18 @@ class Content(object):
         Reference:
             https://github.com/praw-dev/praw/issues/391
 
+        The tree is walked depth-first using a list as a stack. The stack is
+        kept in reverse order so that items can be popped off of the end, which
+        keeps the traversal linear for very large comment threads.
         """
 
-        stack = comments[:]
+        stack = comments[::-1]
         for item in stack:
             item.nested_level = root_level
 
         retval, parent_candidates = [], {}
         while stack:
-            item = stack.pop(0)
+            item = stack.pop()
 
             # The MoreComments item count should never be zero, discard it if
             # it is. Need to look into this further.
@@ -105,12 +274,12 @@ class Content(object):
                 if parent:
                     item.nested_level = parent.nested_level + 1
 
-            # Add all of the attached replies to the front of the stack to be
+            # Add all of the attached replies to the top of the stack to be
             # parsed separately
             if hasattr(item, 'replies'):
                 for n in item.replies:
                     n.nested_level = item.nested_level + 1
-                stack[0:0] = item.replies
+                stack.extend(reversed(item.replies))
 
             # The comment is now a potential parent for the items that are
             # remaining on the stack.
@@ -119,17 +288,40 @@ class Content(object):
             retval.append(item)
         return retval
 
+    @staticmethod
+    def get_raw_attr(obj, name):
+        """
+        PRAW objects keep the attributes that haven't been accessed yet in
+        their original json form. Return the raw string value if it's
+        available, or None otherwise. Reading the author and subreddit this
+        way avoids building a Redditor or Subreddit object that would only be
+        used to read back its name.
+        """
+        attrs = getattr(obj, '__dict__', {})
+        raw = attrs.get('_raw')
+        if raw is not None and name not in attrs:
+            value = raw.get(name)
+            if isinstance(value, six.string_types):
+                return value
+        return None
+
+    @classmethod
+    def get_author_name(cls, obj):
+        name = cls.get_raw_attr(obj, 'author')
+        if name is None:
+            author = getattr(obj, 'author', '[deleted]')
+            name = getattr(author, 'name', '[deleted]')
+        return name
+
     @classmethod
     def strip_praw_comment(cls, comment):
         """
-        Parse through a submission comment and return a dict with data ready to
-        be displayed through the terminal.
+        Parse through a submission comment and return a record with data ready
+        to be displayed through the terminal.
         """
 
-        data = {}
-        data['object'] = comment
-
         if isinstance(comment, praw.objects.MoreComments):
+            data = MoreCommentsRecord(comment)
             data['type'] = 'MoreComments'
             data['level'] = comment.nested_level
             data['count'] = comment.count
@@ -137,15 +329,14 @@ class Content(object):
             data['hidden'] = True
 
         elif hasattr(comment, 'nested_level'):
-            author = getattr(comment, 'author', '[deleted]')
-            name = getattr(author, 'name', '[deleted]')
+            name = cls.get_author_name(comment)
             sub = getattr(comment, 'submission', '[deleted]')
-            sub_author = getattr(sub, 'author', '[deleted]')
-            sub_name = getattr(sub_author, 'name', '[deleted]')
+            sub_name = cls.get_author_name(sub)
             flair = getattr(comment, 'author_flair_text', '')
             permalink = getattr(comment, 'permalink', None)
             stickied = getattr(comment, 'stickied', False)
 
+            data = CommentRecord(comment)
             data['type'] = 'Comment'
             data['level'] = comment.nested_level
             data['body'] = comment.body
@@ -176,6 +367,7 @@ class Content(object):
             stickied = getattr(comment, 'stickied', False)
             flair = getattr(comment, 'author_flair_text', '')
 
+            data = SavedCommentRecord(comment)
             data['type'] = 'SavedComment'
             data['level'] = None
             data['title'] = '[Comment] {0}'.format(comment.body)
@@ -207,7 +399,7 @@ class Content(object):
     @classmethod
     def strip_praw_submission(cls, sub):
         """
-        Parse through a submission and return a dict with data ready to be
+        Parse through a submission and return a record with data ready to be
         displayed through the terminal.
 
         Definitions:
@@ -220,12 +412,11 @@ class Content(object):
 
         reddit_link = re.compile(
             r'https?://(www\.)?(np\.)?redd(it\.com|\.it)/r/.*')
-        author = getattr(sub, 'author', '[deleted]')
-        name = getattr(author, 'name', '[deleted]')
+        name = cls.get_author_name(sub)
+        subreddit = cls.get_raw_attr(sub, 'subreddit')
         flair = getattr(sub, 'link_flair_text', '')
 
-        data = {}
-        data['object'] = sub
+        data = SubmissionRecord(sub)
         data['type'] = 'Submission'
         data['title'] = sub.title
         data['text'] = sub.selftext
@@ -236,7 +427,7 @@ class Content(object):
         data['score'] = '{0} pts'.format('-' if sub.hide_score else sub.score)
         data['author'] = name
         data['permalink'] = sub.permalink
-        data['subreddit'] = six.text_type(sub.subreddit)
+        data['subreddit'] = subreddit or six.text_type(sub.subreddit)
         data['flair'] = '[{0}]'.format(flair.strip(' []')) if flair else ''
         data['url_full'] = sub.url
         data['likes'] = sub.likes
@@ -278,12 +469,11 @@ class Content(object):
     @staticmethod
     def strip_praw_subscription(subscription):
         """
-        Parse through a subscription and return a dict with data ready to be
-        displayed through the terminal.
+        Parse through a subscription and return a record with data ready to
+        be displayed through the terminal.
         """
 
-        data = {}
-        data['object'] = subscription
+        data = SubscriptionRecord(subscription)
         if isinstance(subscription, praw.objects.Multireddit):
             data['type'] = 'Multireddit'
             data['name'] = subscription.path
@@ -298,7 +488,7 @@ class Content(object):
     @classmethod
     def strip_praw_message(cls, msg):
         """
-        Parse through a message and return a dict with data ready to be
+        Parse through a message and return a record with data ready to be
         displayed through the terminal. Messages can be of either type
         praw.objects.Message or praw.object.Comment. The comments returned will
         contain special fields unique to messages and can't be parsed as normal
@@ -306,8 +496,7 @@ class Content(object):
         """
         author = getattr(msg, 'author', None)
 
-        data = {}
-        data['object'] = msg
+        data = MessageRecord(msg)
 
         if isinstance(msg, praw.objects.Message):
             data['type'] = 'Message'
@@ -397,26 +586,40 @@ class Content(object):
         else:
             return '%dyr' % years
 
-    @staticmethod
-    def wrap_text(text, width):
+    @classmethod
+    def wrap_text(cls, text, width):
         """
         Wrap text paragraphs to the given character width while preserving
         newlines.
+
+        Wrapping is slow and get() is called for every visible item on every
+        redraw, so the results are memoized by (text, width). An item is only
+        re-wrapped after its text has been changed or the terminal has been
+        resized. A copy of the lines is returned so the callers are free to
+        modify them.
         """
-        out = []
-        for paragraph in text.splitlines():
-            # Wrap returns an empty list when paragraph is a newline. In order
-            # to preserve newlines we substitute a list containing an empty
-            # string.
-            lines = wrap(paragraph, width=width) or ['']
-            out.extend(lines)
-        return out
+        key = (text, width)
+        out = cls._wrap_cache.get(key)
+        if out is None:
+            out = []
+            for paragraph in text.splitlines():
+                # Wrap returns an empty list when paragraph is a newline. In
+                # order to preserve newlines we substitute a list containing
+                # an empty string.
+                lines = wrap(paragraph, width=width) or ['']
+                out.extend(lines)
+            cls._wrap_cache[key] = out
+        return list(out)
 
     @staticmethod
     def extract_links(html):
         """
         Extract a list of hyperlinks from an HTML document.
         """
+        # bs4 is slow to import and is only needed once the user asks for
+        # the links in a post, so it's imported here instead of on launch
+        from bs4 import BeautifulSoup
+
         links = []
         soup = BeautifulSoup(html, 'html.parser')
         for link in soup.findAll('a'):
@@ -433,6 +636,18 @@ class SubmissionContent(Content):
     """
     Grab a submission from PRAW and lazily store comments to an internal
     list for repeat access.
+
+    Stripping a comment is relatively expensive, so the list holds the PRAW
+    comment objects until get() is called for them the first time. The
+    comment levels can be read with get_level() without stripping anything.
+
+    The shape of the comment tree is kept in lists alongside the comments:
+    the distance back to each comment's parent, the number of rows in its
+    subtree, and the number of comments that the subtree stands for,
+    including the ones packed into hidden or unloaded items. This makes
+    looking up the parent or the next sibling of a comment a single lookup,
+    and hiding a comment a single splice. When rows are replaced, only the
+    ancestors of the replaced rows and their later siblings are updated.
     """
 
     def __init__(self, submission, loader, indent_size=2, max_indent_level=8,
@@ -449,8 +664,9 @@ class SubmissionContent(Content):
         self._loader = loader
         self._submission = submission
         self._submission_data = submission_data
-        self._comment_data = [self.strip_praw_comment(c) for c in comments]
+        self._comment_data = self._prepare_comments(comments)
         self._max_comment_cols = max_comment_cols
+        self._reindex()
 
     @classmethod
     def from_url(cls, reddit, url, loader, indent_size=2, max_indent_level=8,
@@ -494,6 +710,10 @@ class SubmissionContent(Content):
 
         else:
             data = self._comment_data[index]
+            if isinstance(data, praw.objects.Comment):
+                data = self.strip_praw_comment(data)
+                self._comment_data[index] = data
+
             indent_level = min(data['level'], self.max_indent_level)
             data['h_offset'] = indent_level * self.indent_size
 
@@ -521,27 +741,24 @@ class SubmissionContent(Content):
             pass
 
         elif data['type'] == 'Comment':
-            cache = [data]
-            count = 1
-            for d in self.iterate(index + 1, 1, n_cols):
-                if d['level'] <= data['level']:
-                    break
-
-                count += d.get('count', 1)
-                cache.append(d)
-
+            # The children are packed without being stripped, along with
+            # their part of the index so it doesn't need to be rebuilt
+            end = index + self._sizes[index]
             comment = {
                 'type': 'HiddenComment',
-                'cache': cache,
-                'count': count,
+                'cache': self._comment_data[index:end],
+                'cache_index': (self._offsets[index:end],
+                                self._sizes[index:end],
+                                self._counts[index:end]),
+                'count': self._counts[index],
                 'level': data['level'],
                 'body': 'Hidden',
                 'hidden': True}
 
-            self._comment_data[index:index + len(cache)] = [comment]
+            self._splice(index, [comment])
 
         elif data['type'] == 'HiddenComment':
-            self._comment_data[index:index + 1] = data['cache']
+            self._splice(index, data['cache'], data['cache_index'])
 
         elif data['type'] == 'MoreComments':
             with self._loader('Loading comments'):
@@ -550,12 +767,229 @@ class SubmissionContent(Content):
                 comments = data['object'].comments(update=True)
             if not self._loader.exception:
                 comments = self.flatten_comments(comments, data['level'])
-                comment_data = [self.strip_praw_comment(c) for c in comments]
-                self._comment_data[index:index + 1] = comment_data
+                self._splice(index, self._prepare_comments(comments))
 
         else:
             raise ValueError('%s type not recognized' % data['type'])
 
+    def expand_all(self, max_workers=4):
+        """
+        Load every MoreComments item in the submission, including the new
+        ones that are uncovered along the way.
+
+        The MoreComments items that are currently visible don't depend on each
+        other, so each round fetches all of them concurrently on a small pool
+        of threads. The results are spliced back into the comment list in
+        tree order. Comments that have been hidden are left alone.
+        """
+        requested = set()
+        with self._loader('Loading comments'):
+            while True:
+                indices = [
+                    i for i, data in enumerate(self._comment_data)
+                    if not isinstance(data, praw.objects.Comment)
+                    and data['type'] == 'MoreComments'
+                    and data['object'].fullname not in requested]
+                if not indices:
+                    break
+
+                items = [self._comment_data[i] for i in indices]
+                requested.update(data['object'].fullname for data in items)
+                results = self._map_concurrently(
+                    self._load_more_comments, items, max_workers)
+                results = list(zip(indices, results))
+
+                # Replace the items from the bottom up so that the indices of
+                # the earlier items stay valid
+                error = None
+                for index, (comments, e) in reversed(results):
+                    if e is not None:
+                        error = e
+                        continue
+                    level = self._comment_data[index]['level']
+                    comments = self.flatten_comments(comments or [], level)
+                    comment_data = self._prepare_comments(comments)
+                    self._comment_data[index:index + 1] = comment_data
+
+                # Rebuilding the index once is cheaper than updating it for
+                # every item that was replaced
+                self._reindex()
+
+                if error is not None:
+                    # Keep whatever was loaded and report the last failure
+                    raise error
+
+    def get_level(self, index):
+        """
+        Return the nested level of the comment at the given index, without
+        formatting it for display.
+        """
+        if index < 0:
+            raise IndexError
+
+        return self._get_level(self._comment_data[index])
+
+    def get_parent(self, index):
+        """
+        Return the index of the comment's parent, or -1 for top level
+        comments.
+        """
+        if index < 0:
+            raise IndexError
+
+        offset = self._offsets[index]
+        return index - offset if offset else -1
+
+    def get_next_sibling(self, index):
+        """
+        Return the index of the next comment that shares the same parent, or
+        None if this is the last one.
+        """
+        if index < 0:
+            raise IndexError
+
+        sibling = index + self._sizes[index]
+        if sibling < len(self._comment_data) and \
+                self.get_parent(sibling) == self.get_parent(index):
+            return sibling
+        return None
+
+    def get_root(self, index):
+        """
+        Return the index of the top level comment that the comment is nested
+        under.
+        """
+        if index < 0:
+            raise IndexError
+
+        parent = self.get_parent(index)
+        while parent >= 0:
+            index, parent = parent, self.get_parent(parent)
+        return index
+
+    def _reindex(self):
+        self._offsets, self._sizes, self._counts = self._build_index(
+            self._comment_data)
+
+    def _splice(self, index, rows, rows_index=None):
+        """
+        Replace the subtree at the given index with the rows, which must form
+        one or more complete subtrees with the same parent. If the rows were
+        a single subtree taken from the index earlier, its part of the index
+        can be given instead of being rebuilt.
+
+        Parents are stored as the distance back to the parent, so the rows
+        after the subtree only need to be updated if their parent is above it,
+        i.e. if they are later siblings of the subtree or of one of its
+        ancestors. Top level comments don't store the distance.
+        """
+        end = index + self._sizes[index]
+        parent = self.get_parent(index)
+        if rows_index is None:
+            offsets, sizes, counts = self._build_index(rows, index, parent)
+        else:
+            offsets, sizes, counts = (list(x) for x in rows_index)
+            offsets[0] = self._offsets[index]
+
+        size_delta = len(rows) - (end - index)
+        count_delta = -self._counts[index]
+        root = 0
+        while root < len(rows):
+            count_delta += counts[root]
+            root += sizes[root]
+
+        node = index
+        while size_delta and parent >= 0:
+            sibling = node + self._sizes[node]
+            while sibling < len(self._comment_data) and \
+                    self.get_parent(sibling) == parent:
+                self._offsets[sibling] += size_delta
+                sibling += self._sizes[sibling]
+            node, parent = parent, self.get_parent(parent)
+
+        ancestor = self.get_parent(index)
+        while ancestor >= 0:
+            self._sizes[ancestor] += size_delta
+            self._counts[ancestor] += count_delta
+            ancestor = self.get_parent(ancestor)
+
+        self._offsets[index:end] = offsets
+        self._sizes[index:end] = sizes
+        self._counts[index:end] = counts
+        self._comment_data[index:end] = rows
+
+    @classmethod
+    def _build_index(cls, rows, start=0, parent=-1):
+        """
+        Work out the distance to the parent, the subtree size, and the comment
+        count for each of the rows, which are in tree order and placed at
+        `start`. The parent of a row is the closest row above it with a lower
+        level, rows without one are given `parent`.
+        """
+        levels = [cls._get_level(row) for row in rows]
+        offsets = [start + i - parent if parent >= 0 else 0
+                   for i in range(len(rows))]
+        sizes = [1] * len(rows)
+        counts = [1 if isinstance(row, praw.objects.Comment)
+                  else row.get('count', 1) for row in rows]
+
+        stack = []
+        for i, level in enumerate(levels + [None]):
+            # Close off the subtrees that this row isn't a part of, and add
+            # them to their parents
+            while stack and (level is None or levels[stack[-1]] >= level):
+                child = stack.pop()
+                if stack:
+                    sizes[stack[-1]] += sizes[child]
+                    counts[stack[-1]] += counts[child]
+            if level is None:
+                break
+            if stack:
+                offsets[i] = i - stack[-1]
+            stack.append(i)
+
+        return offsets, sizes, counts
+
+    @staticmethod
+    def _get_level(data):
+        if isinstance(data, praw.objects.Comment):
+            return data.nested_level
+        return data['level']
+
+    @classmethod
+    def _prepare_comments(cls, comments):
+        # MoreComments are cheap to strip and need to be recognized by
+        # expand_all(), regular comments are stripped on demand by get()
+        return [cls.strip_praw_comment(c)
+                if isinstance(c, praw.objects.MoreComments) else c
+                for c in comments]
+
+    @staticmethod
+    def _load_more_comments(data):
+        try:
+            return data['object'].comments(update=True), None
+        except Exception as e:
+            _logger.info('Failed to load comments: %s', e)
+            return None, e
+
+    @staticmethod
+    def _map_concurrently(func, items, max_workers):
+        """
+        Apply the function to each item on a pool of threads and return the
+        results in order.
+        """
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(min(max_workers, len(items)))
+        try:
+            result = pool.map_async(func, items)
+            # Wait with a timeout so the loader can interrupt with ctrl-c
+            while not result.ready():
+                result.wait(0.05)
+            return result.get()
+        finally:
+            pool.terminate()
+
 
 class SubredditContent(Content):
     """
@@ -564,15 +998,19 @@ class SubredditContent(Content):
     """
 
     def __init__(self, name, submissions, loader, order=None,
-                 max_title_rows=4, query=None, filter_nsfw=False):
+                 max_title_rows=4, query=None, filter_nsfw=False,
+                 prefetch_items=0, keep_objects=True):
 
         self.name = name
         self.order = order
         self.query = query
         self.max_title_rows = max_title_rows
         self.filter_nsfw = filter_nsfw
+        self.prefetch_items = prefetch_items
+        self.keep_objects = keep_objects
         self._loader = loader
-        self._submissions = submissions
+        self._submissions = Prefetcher(
+            submissions, self._strip_item, batch_size=prefetch_items)
         self._submission_data = []
 
         # Verify that content exists for the given submission generator.
@@ -588,7 +1026,8 @@ class SubredditContent(Content):
             raise exceptions.NoSubmissionsError(full_name)
 
     @classmethod
-    def from_name(cls, reddit, name, loader, order=None, query=None):
+    def from_name(cls, reddit, name, loader, order=None, query=None,
+                  prefetch_items=0, keep_objects=True):
         """
         Params:
             reddit (praw.Reddit): Instance of the reddit api.
@@ -604,6 +1043,12 @@ class SubredditContent(Content):
                 specified, it will be extracted from the name.
             query (text): Content to search for on the given subreddit or
                 user's page.
+            prefetch_items (int): Start loading more submissions in the
+                background when within this many items of the end of the
+                loaded content. Set to 0 to disable.
+            keep_objects (bool): If False, the PRAW object for each submission
+                is released after it has been parsed to reduce memory usage.
+                A minimal object is rebuilt from the id when it's needed.
         """
         # TODO: This desperately needs to be refactored
 
@@ -797,7 +1242,8 @@ class SubredditContent(Content):
 
         # We made it!
         return cls(display_name, submissions, loader, order=display_order,
-                   query=query, filter_nsfw=filter_nsfw)
+                   query=query, filter_nsfw=filter_nsfw,
+                   prefetch_items=prefetch_items, keep_objects=keep_objects)
 
     @property
     def range(self):
@@ -819,7 +1265,7 @@ class SubredditContent(Content):
         while index >= len(self._submission_data):
             try:
                 with self._loader('Loading more submissions'):
-                    submission = next(self._submissions)
+                    data = next(self._submissions)
                 if self._loader.exception:
                     raise IndexError
             except StopIteration:
@@ -831,7 +1277,7 @@ class SubredditContent(Content):
                 # only has NSFW content and abort. This allows us to avoid making
                 # an additional API call to check if a subreddit is over18 (which
                 # doesn't work for things like multireddits anyway)
-                if self.filter_nsfw and submission.over_18:
+                if self.filter_nsfw and data['nsfw']:
                     nsfw_count += 1
                     if not self._submission_data and nsfw_count >= 20:
                         raise exceptions.SubredditError(
@@ -840,18 +1286,19 @@ class SubredditContent(Content):
                 else:
                     nsfw_count = 0
 
-                if hasattr(submission, 'title'):
-                    data = self.strip_praw_submission(submission)
-                else:
-                    # when submission is a saved comment
-                    data = self.strip_praw_comment(submission)
+                if not self.keep_objects:
+                    data.release_object()
 
                 data['index'] = len(self._submission_data) + 1
                 # Add the post number to the beginning of the title
                 data['title'] = '{0}. {1}'.format(data['index'], data['title'])
                 self._submission_data.append(data)
 
-        # Modifies the original dict, faster than copying
+        if self.prefetch_items:
+            if index >= len(self._submission_data) - self.prefetch_items:
+                self._submissions.prefetch()
+
+        # Modifies the original record, faster than copying
         data = self._submission_data[index]
         data['split_title'] = self.wrap_text(data['title'], width=n_cols)
         if len(data['split_title']) > self.max_title_rows:
@@ -862,16 +1309,27 @@ class SubredditContent(Content):
 
         return data
 
+    @classmethod
+    def _strip_item(cls, submission):
+        if hasattr(submission, 'title'):
+            return cls.strip_praw_submission(submission)
+        else:
+            # when submission is a saved comment
+            return cls.strip_praw_comment(submission)
+
 
 class SubscriptionContent(Content):
 
-    def __init__(self, name, subscriptions, loader):
+    def __init__(self, name, subscriptions, loader, prefetch_items=0):
 
         self.name = name
         self.order = None
         self.query = None
+        self.prefetch_items = prefetch_items
         self._loader = loader
-        self._subscriptions = subscriptions
+        self._subscriptions = Prefetcher(
+            subscriptions, self.strip_praw_subscription,
+            batch_size=prefetch_items)
         self._subscription_data = []
 
         try:
@@ -889,7 +1347,8 @@ class SubscriptionContent(Content):
                 pass
 
     @classmethod
-    def from_user(cls, reddit, loader, content_type='subreddit'):
+    def from_user(cls, reddit, loader, content_type='subreddit',
+                  prefetch_items=0):
         if content_type == 'subreddit':
             name = 'My Subreddits'
             items = reddit.get_my_subreddits(limit=None)
@@ -903,7 +1362,7 @@ class SubscriptionContent(Content):
         else:
             raise exceptions.SubscriptionError('Invalid type %s' % content_type)
 
-        return cls(name, items, loader)
+        return cls(name, items, loader, prefetch_items=prefetch_items)
 
     @property
     def range(self):
@@ -921,15 +1380,18 @@ class SubscriptionContent(Content):
         while index >= len(self._subscription_data):
             try:
                 with self._loader('Loading content'):
-                    subscription = next(self._subscriptions)
+                    data = next(self._subscriptions)
                 if self._loader.exception:
                     raise IndexError
             except StopIteration:
                 raise IndexError
             else:
-                data = self.strip_praw_subscription(subscription)
                 self._subscription_data.append(data)
 
+        if self.prefetch_items:
+            if index >= len(self._subscription_data) - self.prefetch_items:
+                self._subscriptions.prefetch()
+
         data = self._subscription_data[index]
         data['split_title'] = self.wrap_text(data['title'], width=n_cols)
         data['n_rows'] = len(data['split_title']) + 1
@@ -941,15 +1403,17 @@ class SubscriptionContent(Content):
 class InboxContent(Content):
 
     def __init__(self, order, content_generator, loader,
-                 indent_size=2, max_indent_level=8):
+                 indent_size=2, max_indent_level=8, prefetch_items=0):
 
         self.name = 'My Inbox'
         self.order = order
         self.query = None
         self.indent_size = indent_size
         self.max_indent_level = max_indent_level
+        self.prefetch_items = prefetch_items
         self._loader = loader
-        self._content_generator = content_generator
+        self._content_generator = Prefetcher(
+            content_generator, self._strip_item, batch_size=prefetch_items)
         self._content_data = []
 
         try:
@@ -961,7 +1425,7 @@ class InboxContent(Content):
                 raise exceptions.InboxError('Empty Inbox [%s]' % order)
 
     @classmethod
-    def from_user(cls, reddit, loader, order='all'):
+    def from_user(cls, reddit, loader, order='all', prefetch_items=0):
         if order == 'all':
             items = reddit.get_inbox(limit=None)
         elif order == 'unread':
@@ -979,7 +1443,7 @@ class InboxContent(Content):
         else:
             raise exceptions.InboxError('Invalid order %s' % order)
 
-        return cls(order, items, loader)
+        return cls(order, items, loader, prefetch_items=prefetch_items)
 
     @property
     def range(self):
@@ -997,22 +1461,17 @@ class InboxContent(Content):
         while index >= len(self._content_data):
             try:
                 with self._loader('Loading content'):
-                    item = next(self._content_generator)
+                    items = next(self._content_generator)
                 if self._loader.exception:
                     raise IndexError
             except StopIteration:
                 raise IndexError
             else:
-                if isinstance(item, praw.objects.Message):
-                    # Message chains can be treated like comment trees
-                    for child_message in self.flatten_comments([item]):
-                        data = self.strip_praw_message(child_message)
-                        self._content_data.append(data)
-                else:
-                    # Comments also return children, but we don't display them
-                    # in the Inbox page so they don't need to be parsed here.
-                    data = self.strip_praw_message(item)
-                    self._content_data.append(data)
+                self._content_data.extend(items)
+
+        if self.prefetch_items:
+            if index >= len(self._content_data) - self.prefetch_items:
+                self._content_generator.prefetch()
 
         data = self._content_data[index]
         indent_level = min(data['level'], self.max_indent_level)
@@ -1023,6 +1482,17 @@ class InboxContent(Content):
 
         return data
 
+    @classmethod
+    def _strip_item(cls, item):
+        if isinstance(item, praw.objects.Message):
+            # Message chains can be treated like comment trees
+            return [cls.strip_praw_message(child_message)
+                    for child_message in cls.flatten_comments([item])]
+        else:
+            # Comments also return children, but we don't display them
+            # in the Inbox page so they don't need to be parsed here.
+            return [cls.strip_praw_message(item)]
+
 
 class RequestHeaderRateLimiter(DefaultHandler):
     """Custom PRAW request handler for rate-limiting requests.
@@ -1032,40 +1502,129 @@ class RequestHeaderRateLimiter(DefaultHandler):
     on the X-Ratelimit-* headers returned from Reddit. Most of
     these methods are copied from or derived from the DefaultHandler.
 
+    If a cache file is provided, GET responses are also written to disk so
+    they can be reused after the program is restarted. Entries older than the
+    cache timeout are considered stale. A stale entry is returned immediately
+    while a fresh copy is downloaded in the background, and the fresh copy
+    will be used for the next request to the same url.
+
+    Identical GET requests that are made at the same time from different
+    threads, e.g. by a prefetcher and the page that's waiting for the same
+    listing, are coalesced so only the first one goes out to the network.
+
+    Requests are spread out over what's left of the rate limit period once
+    the remaining budget starts to run low, and background requests (see
+    RequestPriority) are paced more slowly and leave a reserve for the user.
+    When the budget runs out, interactive requests don't sleep until the
+    period resets. The last copy of the response is served from the cache
+    instead, regardless of its age, and `take_notice()` returns a message
+    that can be shown to the user. If there is nothing cached, the request
+    fails with a RateLimitExceeded error.
+
     References:
         https://github.com/reddit/reddit/wiki/API
         https://github.com/praw-dev/prawcore/blob/master/prawcore/rate_limit.py
     """
 
-    def __init__(self):
+    def __init__(self, cache_file=None, cache_max_age=24 * 60 * 60,
+                 cache_max_entries=512, cache_max_bytes=64 * 1024 * 1024):
+        """
+        Params:
+            cache_file (str): Optional path to a persistent response cache.
+            cache_max_age (float): Number of seconds that a stale entry in the
+                persistent cache can still be displayed for.
+            cache_max_entries (int): Maximum number of responses to keep in
+                the memory cache.
+            cache_max_bytes (int): Maximum combined size of the response
+                bodies in the memory cache.
+        """
 
         # In PRAW's convention, these variables were bound to the
         # class so the cache could be shared among all of the ``reddit``
         # instances. In RTV's use-case there is only ever a single reddit
         # instance so it made sense to clean up the globals and transfer them
         # to method variables
-        self.cache = {}
-        self.timeouts = {}
-
-        # These are used for the header rate-limiting
+        self.cache = LRUCache(
+            max_entries=cache_max_entries, max_bytes=cache_max_bytes,
+            sizeof=lambda response: len(response.content))
+
+        self.single_flight = SingleFlight()
+        self.disk_cache = None
+        self.cache_max_age = cache_max_age
+        self.account = None
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        if cache_file:
+            self.disk_cache = DiskCache(cache_file, max_age=cache_max_age)
+
+        # These are used for the header rate-limiting. The lock keeps the
+        # values consistent when requests are made from multiple threads.
+        self._rate_lock = threading.Lock()
         self.used = None
         self.remaining = None
         self.seconds_to_reset = None
-        self.next_request_timestamp = None
+        self.reset_timestamp = None
+        self.last_response_timestamp = None
+        self._notice = None
 
         super(RequestHeaderRateLimiter, self).__init__()
 
+    # Number of requests that background requests leave for the user
+    BACKGROUND_RESERVE = 30
+    # Upper limits on how long requests are spaced apart by the pacing
+    MAX_INTERACTIVE_DELAY = 1.0
+    MAX_BACKGROUND_DELAY = 10.0
+
+    def _pacing(self, background, now):
+        """
+        Return the number of seconds to wait before the next request, or None
+        if the budget for this kind of request has been used up.
+
+        The delay grows as the remaining budget shrinks relative to the time
+        left in the period, the same way that prawcore spaces out requests,
+        but it's capped so that a user who is browsing doesn't notice it.
+        """
+        if self.remaining is None or now >= self.reset_timestamp:
+            return 0
+
+        available = self.remaining
+        if background:
+            available -= self.BACKGROUND_RESERVE
+        if available <= 0:
+            return None
+
+        seconds_left = self.reset_timestamp - now
+        delay = (seconds_left - available) / (available / 2.0)
+        limit = self.MAX_BACKGROUND_DELAY if background \
+            else self.MAX_INTERACTIVE_DELAY
+        delay = min(max(delay, 0), limit)
+        return max(self.last_response_timestamp + delay - now, 0)
+
     def _delay(self):
         """
         Pause before making the next HTTP request.
-        """
-        if self.next_request_timestamp is None:
-            return
 
-        sleep_seconds = self.next_request_timestamp - time.time()
-        if sleep_seconds <= 0:
-            return
-        time.sleep(sleep_seconds)
+        Background requests wait for the period to reset when their budget
+        is used up, and are re-evaluated while they sleep in case the user
+        starts waiting on them. Interactive requests raise an error instead.
+        """
+        while True:
+            background = RequestPriority.is_background()
+            with self._rate_lock:
+                now = time.time()
+                delay = self._pacing(background, now)
+                if delay is None:
+                    seconds_left = self.reset_timestamp - now
+                    if not background:
+                        raise exceptions.RateLimitExceeded(seconds_left)
+                    delay = seconds_left
+
+            if delay <= 0:
+                return
+            elif not background:
+                time.sleep(delay)
+                return
+            time.sleep(min(delay, 0.1))
 
     def _update(self, response_headers):
         """
@@ -1080,10 +1639,12 @@ class RequestHeaderRateLimiter(DefaultHandler):
         like a bot or crawler.
 
         This handler's logic, on the other hand, is geared more towards
-        interactive usage. It allows for short, sporadic bursts of requests.
-        The assumption is that actual users browsing reddit shouldn't ever be
-        in danger of hitting the rate limit. If they do hit the limit, they
-        will be cutoff until the period resets.
+        interactive usage. It allows for short, sporadic bursts of requests,
+        and only starts spacing them out when the remaining budget gets low
+        compared to the time left in the period. The assumption is that
+        actual users browsing reddit shouldn't ever be in danger of hitting
+        the rate limit. If they do hit the limit, they will be shown cached
+        data until the period resets.
         """
 
         if 'x-ratelimit-remaining' not in response_headers:
@@ -1092,31 +1653,43 @@ class RequestHeaderRateLimiter(DefaultHandler):
             # which Reddit doesn't appear to care about rate limiting.
             return
 
-        self.used = float(response_headers['x-ratelimit-used'])
-        self.remaining = float(response_headers['x-ratelimit-remaining'])
-        self.seconds_to_reset = int(response_headers['x-ratelimit-reset'])
-        _logger.debug('Rate limit: %s used, %s remaining, %s reset',
-                      self.used, self.remaining, self.seconds_to_reset)
-
-        if self.remaining <= 0:
-            self.next_request_timestamp = time.time() + self.seconds_to_reset
-        else:
-            self.next_request_timestamp = None
-
-    def _clear_timeouts(self, cache_timeout):
+        with self._rate_lock:
+            now = time.time()
+            self.used = float(response_headers['x-ratelimit-used'])
+            self.remaining = float(response_headers['x-ratelimit-remaining'])
+            self.seconds_to_reset = int(response_headers['x-ratelimit-reset'])
+            self.reset_timestamp = now + self.seconds_to_reset
+            self.last_response_timestamp = now
+            _logger.debug('Rate limit: %s used, %s remaining, %s reset',
+                          self.used, self.remaining, self.seconds_to_reset)
+
+    def take_notice(self):
         """
-        Clear the cache of timed out results.
+        Return the message for the last time that cached data was shown
+        because of the rate limit, and clear it.
         """
+        with self._rate_lock:
+            notice, self._notice = self._notice, None
+        return notice
 
-        for key in list(self.timeouts):
-            if timer() - self.timeouts[key] > cache_timeout:
-                del self.timeouts[key]
-                del self.cache[key]
+    def set_account(self, refresh_token):
+        """
+        Set the account that logged in requests are made with. Logged in
+        responses are stored on disk under the account, so they can't be
+        shown to a different user that logs in later. Until the account is
+        known, logged in responses aren't stored on disk at all.
+        """
+        if refresh_token:
+            token = six.text_type(refresh_token).encode('utf-8')
+            self.account = hashlib.sha1(token).hexdigest()
+        else:
+            self.account = None
 
     def clear_cache(self):
         """Remove all items from the cache."""
-        self.cache = {}
-        self.timeouts = {}
+        self.cache.clear()
+        if self.disk_cache:
+            self.disk_cache.clear()
 
     def evict(self, urls):
         """Remove items from cache matching URLs.
@@ -1127,11 +1700,12 @@ class RequestHeaderRateLimiter(DefaultHandler):
             urls = [urls]
         urls = set(normalize_url(url) for url in urls)
         retval = 0
-        for key in list(self.cache):
+        for key in self.cache.keys():
             if key[0] in urls:
                 retval += 1
                 del self.cache[key]
-                del self.timeouts[key]
+        if self.disk_cache:
+            self.disk_cache.evict(urls)
         return retval
 
     def request(self, _cache_key, _cache_ignore, _cache_timeout, **kwargs):
@@ -1157,22 +1731,154 @@ class RequestHeaderRateLimiter(DefaultHandler):
         if _cache_ignore:
             return self._request(**kwargs)
 
-        self._clear_timeouts(_cache_timeout)
-        if _cache_key in self.cache:
-            return self.cache[_cache_key]
+        # Expired responses are kept around for as long as the persistent
+        # cache would keep them, so they can be shown if the rate limit runs
+        # out before they can be downloaded again
+        self.cache.expire(self.cache_max_age)
+        result = self.cache.get(_cache_key, max_age=_cache_timeout)
+        if result is not None:
+            return result
+
+        try:
+            return self.single_flight.do(
+                _cache_key, self._cache_fetch, _cache_key, _cache_timeout,
+                kwargs)
+        except exceptions.RateLimitExceeded:
+            result = self._stale_get(_cache_key)
+            if result is None:
+                raise
+            with self._rate_lock:
+                self._notice = 'Reddit rate limit reached, showing cached data'
+            return result
+
+    def _stale_get(self, cache_key):
+        """
+        Look up a response in either cache, no matter how old it is.
+        """
+        result = self.cache.get(cache_key)
+        key = self._disk_cache_key(cache_key)
+        if result is None and self.disk_cache and key is not None:
+            entry = self.disk_cache.get(key)
+            if entry is not None:
+                timestamp, data = entry
+                if time.time() - timestamp <= self.cache_max_age:
+                    result = self._load_response(data)
+        return result
+
+    def _cache_fetch(self, cache_key, cache_timeout, kwargs):
+        # Another thread may have finished the same request between the
+        # memory cache lookup and joining the single flight group
+        result = self.cache.get(cache_key, max_age=cache_timeout)
+        if result is not None:
+            return result
+
+        if self.disk_cache:
+            result = self._disk_cache_get(cache_key, cache_timeout, kwargs)
+            if result is not None:
+                return result
 
         result = self._request(**kwargs)
+        self._cache_set(cache_key, result)
+        return result
+
+    def _cache_set(self, cache_key, result):
 
         # The handlers don't call `raise_for_status` so we need to ignore
         # status codes that will result in an exception that should not be
         # cached.
         if result.status_code not in (200, 302):
+            return
+
+        self.cache[cache_key] = result
+        key = self._disk_cache_key(cache_key)
+        if self.disk_cache and key is not None:
+            self.disk_cache.set(
+                key, self._dump_response(result), url=cache_key[0])
+
+    def _disk_cache_get(self, cache_key, cache_timeout, kwargs):
+        """
+        Look up a response in the persistent cache. Fresh responses are moved
+        into the memory cache, stale responses trigger a background request
+        to replace them.
+        """
+        key = self._disk_cache_key(cache_key)
+        if key is None:
+            return None
+        entry = self.disk_cache.get(key)
+        if entry is None:
+            return None
+
+        timestamp, data = entry
+        age = time.time() - timestamp
+        if age > self.cache_max_age:
+            return None
+
+        result = self._load_response(data)
+        if age <= cache_timeout:
+            # Keep the age, otherwise the response would stay fresh for
+            # another full timeout
+            self.cache.set(cache_key, result, age=age)
             return result
 
-        self.timeouts[_cache_key] = timer()
-        self.cache[_cache_key] = result
+        with self._revalidating_lock:
+            if cache_key in self._revalidating:
+                return result
+            self._revalidating.add(cache_key)
+        thread = threading.Thread(
+            target=self._revalidate, args=(cache_key, kwargs))
+        thread.daemon = True
+        thread.start()
         return result
 
+    def _revalidate(self, cache_key, kwargs):
+        try:
+            with RequestPriority().use():
+                self._cache_set(cache_key, self._request(**kwargs))
+        except Exception as e:
+            # The stale response has already been returned, so there's
+            # nobody to report the failure to
+            _logger.info('Unable to refresh %s: %s', cache_key[0], e)
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(cache_key)
+
+    def _disk_cache_key(self, cache_key):
+        """
+        The OAuth access token is regenerated every time that the program
+        launches, so it can't be used to look up persistent entries. It's
+        replaced with the account that the request was made with, see
+        set_account(). Returns None if the response shouldn't be stored on
+        disk because the account isn't known.
+        """
+        url, (params, data, auth, oauth) = cache_key
+        account = None
+        if oauth:
+            if self.account is None:
+                return None
+            account = self.account
+        return repr((url, params, data, auth, account))
+
+    @staticmethod
+    def _dump_response(response):
+        return {
+            'url': response.url,
+            'status_code': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+            'encoding': response.encoding,
+            'content': response.content}
+
+    @staticmethod
+    def _load_response(data):
+        response = requests.Response()
+        response.url = data['url']
+        response.status_code = data['status_code']
+        response.reason = data['reason']
+        response.headers.update(data['headers'])
+        response.encoding = data['encoding']
+        response._content = data['content']
+        return response
+
     def _request(self, request, proxies, timeout, verify, **_):
         """
         This is where we apply rate limiting and make the HTTP request.
@@ -78,6 +78,7 @@ https://github.com/michael-lazar/rtv
   b     : Send the comment text to the system's urlviewer application
   J     : Move the cursor down the the next comment at the same indentation
   K     : Move the cursor up to the parent comment
+  x     : Load all of the collapsed "more comments" in the submission
 
 [Subscription Mode]
   h     : Close your subscriptions and return to the previous page
@@ -59,5 +59,19 @@ class MailcapEntryNotFound(RTVError):
     "A valid mailcap entry could not be coerced from the given url"
 
 
+class MIMEParserError(RTVError):
+    "The url could not be resolved by a MIME parser the last time it was tried"
+
+
 class InvalidRefreshToken(RTVError):
     "The refresh token is corrupt and cannot be used to login"
+
+
+class RateLimitExceeded(RTVError):
+    "The reddit api rate limit has been used up for the current period"
+
+    def __init__(self, seconds_to_reset):
+        self.seconds_to_reset = seconds_to_reset
+        message = 'Reddit rate limit reached, try again in {0}s'.format(
+            int(seconds_to_reset) + 1)
+        super(RateLimitExceeded, self).__init__(message)
@@ -21,7 +21,9 @@ class InboxPage(Page):
         super(InboxPage, self).__init__(reddit, term, config, oauth)
 
         self.controller = InboxController(self, keymap=config.keymap)
-        self.content = InboxContent.from_user(reddit, term.loader, content_type)
+        self.content = InboxContent.from_user(
+            reddit, term.loader, content_type,
+            prefetch_items=config['prefetch_items'])
         self.nav = Navigator(self.content.get)
         self.content_type = content_type
 
@@ -50,7 +52,8 @@ class InboxPage(Page):
 
         with self.term.loader():
             self.content = InboxContent.from_user(
-                self.reddit, self.term.loader, self.content_type)
+                self.reddit, self.term.loader, self.content_type,
+                prefetch_items=self.config['prefetch_items'])
         if not self.term.loader.exception:
             self.nav = Navigator(self.content.get)
 
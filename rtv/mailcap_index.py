@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import logging
+import threading
+
+from .cache import DiskCache
+
+_logger = logging.getLogger(__name__)
+
+
+def get_mailcap():
+    """
+    Import the mailcap module the first time that it's needed, which is when
+    a link is opened, instead of when rtv is launched.
+    """
+    try:
+        # Fix only needed for versions prior to python 3.6
+        from mailcap_fix import mailcap
+    except ImportError:
+        import mailcap
+    return mailcap
+
+
+class MailcapIndex(object):
+    """
+    A lazily loaded view of the user's mailcap database.
+
+    The mailcap files aren't read until the first time that a link is opened.
+    If a cache file is given, the parsed database is stored on disk along
+    with the modification times of the mailcap files, and it's re-used for
+    as long as none of the files have changed.
+
+    The entries for each MIME type, including the entries for the wildcard
+    subtype, are looked up once and remembered. Entries often have a `test=`
+    command that decides if they can be used, e.g. `test=test -n "$DISPLAY"`.
+    The stdlib runs these in a new shell every time a link is opened. Tests
+    that don't depend on the file being opened are only run once per session
+    here, and the result is re-used.
+    """
+
+    # Bump this to invalidate cached databases when the format changes
+    VERSION = 1
+
+    def __init__(self, cache_file=None):
+        """
+        Params:
+            cache_file (str): Path to the sqlite database that the parsed
+                mailcap files will be stored in.
+        """
+        self.cache_file = cache_file
+        self._caps = None
+        self._entries = {}
+        self._tests = {}
+        self._lock = threading.Lock()
+
+    @property
+    def caps(self):
+        """
+        The mailcap database in the same format as mailcap.getcaps().
+        """
+        with self._lock:
+            if self._caps is None:
+                self._caps = self._load()
+            return self._caps
+
+    def findmatch(self, content_type, filename):
+        """
+        Equivalent to mailcap.findmatch(caps, content_type, filename=...).
+
+        Returns:
+            command (text): The command that should be run, or None.
+            entry (dict): The mailcap entry that was matched, or None.
+        """
+        entries = self._lookup(content_type)
+
+        candidates = []
+        for entry in entries:
+            test = entry.get('test')
+            if test is None or '%' in test:
+                # Tests that reference the filename are left to the stdlib
+                candidates.append(entry)
+            elif self._run_test(test):
+                entry = dict(entry)
+                del entry['test']
+                candidates.append(entry)
+
+        if not candidates:
+            return None, None
+        return get_mailcap().findmatch(
+            {content_type: candidates}, content_type, filename=filename)
+
+    def _lookup(self, content_type):
+        caps = self.caps
+        entries = self._entries.get(content_type)
+        if entries is None:
+            entries = get_mailcap().lookup(caps, content_type, 'view')
+            self._entries[content_type] = entries
+        return entries
+
+    def _run_test(self, test):
+        result = self._tests.get(test)
+        if result is None:
+            result = os.system(test) == 0
+            _logger.info('Mailcap test `%s` returned %s', test, result)
+            self._tests[test] = result
+        return result
+
+    def _load(self):
+        mailcap = get_mailcap()
+        filenames = mailcap.listmailcapfiles()
+        mtimes = []
+        for filename in filenames:
+            try:
+                mtimes.append((filename, os.path.getmtime(filename)))
+            except OSError:
+                mtimes.append((filename, None))
+
+        cache = None
+        if self.cache_file:
+            cache = DiskCache(self.cache_file)
+            row = cache.get('mailcap')
+            if row is not None:
+                version, cached_mtimes, caps = row[1]
+                if version == self.VERSION and cached_mtimes == mtimes:
+                    _logger.info('Loaded mailcap from %s', self.cache_file)
+                    cache.close()
+                    return caps
+
+        caps = mailcap.getcaps()
+        if cache is not None:
+            cache.set('mailcap', (self.VERSION, mtimes, caps))
+            cache.close()
+        return caps
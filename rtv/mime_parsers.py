@@ -1,19 +1,172 @@
+import os
 import re
+import time
+import codecs
 import logging
+import threading
 import mimetypes
+from collections import deque
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from six.moves import html_parser
+
+from . import docs, exceptions
+from .cache import LRUCache, DiskCache
+from .__version__ import __version__
 
 _logger = logging.getLogger(__name__)
 
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+
+class HTTPSession(requests.Session):
+    """
+    The requests session that is shared by all of the parsers.
+
+    Calling requests.get() opens a new connection for every request, which
+    means a fresh TCP and TLS handshake each time a link is checked. The
+    session keeps a pool of connections alive for each host, so repeated
+    lookups against sites like imgur or v.redd.it can re-use them. Every
+    request is given a timeout unless one is passed explicitly, and the
+    response body is compressed when the server supports it.
+    """
+
+    def __init__(self, user_agent=None, timeout=(3.05, 10), pool_size=4):
+        """
+        Params:
+            user_agent (text): Value of the User-Agent header, defaults to
+                rtv's own user agent.
+            timeout (float or tuple): The connect and read timeouts.
+            pool_size (int): Maximum number of connections to keep open to
+                each host.
+        """
+        super(HTTPSession, self).__init__()
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+        if not user_agent:
+            user_agent = docs.AGENT.format(version=__version__)
+        self.headers['User-Agent'] = user_agent
+        self.headers['Accept-Encoding'] = 'gzip, deflate'
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super(HTTPSession, self).request(method, url, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Return the session used by the parsers, creating it on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = HTTPSession()
+        return _session
+
+
+def set_session(session, replace=True):
+    """
+    Replace the session used by the parsers. This can be any object that
+    implements get() and head() like a requests session. If `replace` is
+    False, a session that has already been set is kept instead.
+    """
+    global _session
+    with _session_lock:
+        if replace or _session is None:
+            _session = session
+
+
+class TagScanner(html_parser.HTMLParser):
+    """
+    An incremental html tokenizer that passes each tag to a callback as soon
+    as it has been read, without building a document tree.
+
+    The callback is called with the tag name and a dict of its attributes.
+    Closing tags are passed with a leading slash, e.g. "/head", and an empty
+    dict. Once the callback returns True, the remaining input is ignored.
+    """
+
+    def __init__(self, visit):
+        # HTMLParser is an old-style class on python 2
+        html_parser.HTMLParser.__init__(self)
+        self.visit = visit
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if not self.done:
+            self.done = bool(self.visit(tag, dict(attrs)))
+
+    def handle_endtag(self, tag):
+        if not self.done:
+            self.done = bool(self.visit('/' + tag, {}))
+
+
+def scan_page(url, visit, chunk_size=8 * 1024):
+    """
+    Download the html page at the url and feed it to a TagScanner one chunk
+    at a time. The download is aborted as soon as the callback has found what
+    it's looking for. For most sites that happens at the end of the <head>,
+    long before the bulk of the page has been sent. Callbacks that come up
+    empty handed at the end of the <head> can keep going, at the cost of
+    reading the whole page.
+
+    Params:
+        url (text): The page to download.
+        visit (function): Called with each tag, see TagScanner.
+        chunk_size (int): Number of bytes to read at a time.
+    """
+    response = get_session().get(url, stream=True)
+    try:
+        # requests assumes latin-1 for text/html without an explicit
+        # charset, but nearly every page that we're interested in is utf-8
+        encoding = 'utf-8'
+        if 'charset' in response.headers.get('Content-Type', ''):
+            encoding = response.encoding
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)('replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+        scanner = TagScanner(visit)
+        for chunk in response.iter_content(chunk_size):
+            scanner.feed(decoder.decode(chunk))
+            if scanner.done:
+                break
+        else:
+            scanner.feed(decoder.decode(b'', True))
+            scanner.close()
+    finally:
+        response.close()
+
 
 class BaseMIMEParser(object):
     """
     BaseMIMEParser can be sub-classed to define custom handlers for determining
     the MIME type of external urls.
+
+    Parsers that only handle links to specific websites should list the
+    host names in `domains`, subdomains are included automatically. This
+    allows the parser to be found without trying the pattern of every other
+    parser first. Parsers that need to make http requests should set
+    `cache_ttl` to the number of seconds that their results can be re-used
+    for. Parsers that only look at the url itself leave it as None and are
+    never cached. Parsers that spend a limited API quota should set
+    `prefetch` to False, so they only run when the user opens a link.
     """
     pattern = re.compile(r'.*$')
+    domains = ()
+    cache_ttl = None
+    prefetch = True
 
     @staticmethod
     def get_mimetype(url):
@@ -50,19 +203,32 @@ class OpenGraphMIMEParser(BaseMIMEParser):
     see http://ogp.me
     """
     pattern = re.compile(r'.*$')
+    cache_ttl = DAY
+
+    # In order of priority
+    PROPERTIES = ('og:video:secure_url', 'og:video',
+                  'og:image:secure_url', 'og:image')
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, 'html.parser')
-        for og_type in ['video', 'image']:
-            prop = 'og:' + og_type + ':secure_url'
-            tag = soup.find('meta', attrs={'property': prop})
-            if not tag:
-                prop = 'og:' + og_type
-                tag = soup.find('meta', attrs={'property': prop})
-            if tag:
-                return BaseMIMEParser.get_mimetype(tag.get('content'))
+        properties = {}
+
+        def visit(tag, attrs):
+            if tag == 'meta':
+                prop = attrs.get('property')
+                if prop in OpenGraphMIMEParser.PROPERTIES:
+                    properties.setdefault(prop, attrs.get('content'))
+                    return prop == 'og:video:secure_url'
+            elif tag in ('/head', 'body'):
+                # Some sites put their meta tags in the <body>, so only stop
+                # here if something has already been found
+                return bool(properties)
+            return False
+
+        scan_page(url, visit)
+        for prop in OpenGraphMIMEParser.PROPERTIES:
+            if prop in properties:
+                return BaseMIMEParser.get_mimetype(properties[prop])
 
         return url, None
 
@@ -76,19 +242,24 @@ class VideoTagMIMEParser(BaseMIMEParser):
     </video>
     """
     pattern = re.compile(r'.*$')
+    cache_ttl = DAY
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, 'html.parser')
-
         # TODO: Handle pages with multiple videos
-        video = soup.find('video')
-        source = None
-        if video:
-            source = video.find('source', attr={'res': 'HD'})
-            source = source or video.find('source', attr={'type': 'video/mp4'})
-            source = source or video.find('source')
+        state = {'video': False, 'source': None}
+
+        def visit(tag, attrs):
+            if tag == 'video':
+                state['video'] = True
+            elif tag == 'source' and state['video']:
+                state['source'] = attrs
+                return True
+            # Only look at the first video on the page
+            return tag == '/video'
+
+        scan_page(url, visit)
+        source = state['source']
         if source:
             return source.get('src'), source.get('type')
         else:
@@ -107,12 +278,14 @@ class GfycatMIMEParser(BaseMIMEParser):
         https://giant.gfycat.com/UntidyAcidicIberianemeraldlizard.webm
     """
     pattern = re.compile(r'https?://(www\.)?gfycat\.com/[^.]+$')
+    domains = ('gfycat.com',)
+    cache_ttl = 7 * DAY
 
     @staticmethod
     def get_mimetype(url):
         identifier = url.split('/')[-1]
         api_url = 'https://api.gfycat.com/v1/gfycats/{}'.format(identifier)
-        resp = requests.get(api_url)
+        resp = get_session().get(api_url)
         image_url = resp.json()['gfyItem']['mp4Url']
         return image_url, 'video/mp4'
 
@@ -125,6 +298,7 @@ class YoutubeMIMEParser(BaseMIMEParser):
     pattern = re.compile(
         r'(?:https?://)?(m\.)?(?:youtu\.be/|(?:www\.)?youtube\.com/watch'
         r'(?:\.php)?\'?.*v=)([a-zA-Z0-9\-_]+)')
+    domains = ('youtube.com', 'youtu.be')
 
     @staticmethod
     def get_mimetype(url):
@@ -137,6 +311,7 @@ class VimeoMIMEParser(BaseMIMEParser):
     Assign a custom mime-type so they can be referenced in mailcap.
     """
     pattern = re.compile(r'https?://(www\.)?vimeo\.com/\d+$')
+    domains = ('vimeo.com',)
 
     @staticmethod
     def get_mimetype(url):
@@ -164,10 +339,12 @@ class RedditUploadsMIMEParser(BaseMIMEParser):
     from the page header.
     """
     pattern = re.compile(r'https://i\.reddituploads\.com/.+$')
+    domains = ('i.reddituploads.com',)
+    cache_ttl = 7 * DAY
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.head(url)
+        page = get_session().head(url)
         content_type = page.headers.get('Content-Type', '')
         content_type = content_type.split(';')[0]  # Strip out the encoding
         return url, content_type
@@ -179,11 +356,15 @@ class RedditVideoMIMEParser(BaseMIMEParser):
     Media uses MPEG-DASH format (.mpd)
     """
     pattern = re.compile(r'https://v\.redd\.it/.+$')
+    domains = ('v.redd.it',)
+    cache_ttl = DAY
 
     @staticmethod
     def get_mimetype(url):
+        from bs4 import BeautifulSoup
+
         request_url = url + '/DASHPlaylist.mpd'
-        page = requests.get(request_url)
+        page = get_session().get(request_url)
         soup = BeautifulSoup(page.content, 'html.parser')
         if not soup.find('representation', attrs={'mimetype': 'audio/mp4'}):
             reps = soup.find_all('representation', attrs={'mimetype': 'video/mp4'})
@@ -213,6 +394,9 @@ class ImgurApiMIMEParser(BaseMIMEParser):
     pattern = re.compile(
         r'https?://(w+\.)?(m\.)?imgur\.com/'
         r'((?P<domain>a|album|gallery)/)?(?P<hash>[a-zA-Z0-9]+)$')
+    domains = ('imgur.com',)
+    cache_ttl = 7 * DAY
+    prefetch = False
 
     @classmethod
     def get_mimetype(cls, url):
@@ -236,12 +420,12 @@ class ImgurApiMIMEParser(BaseMIMEParser):
             return cls.fallback(url, domain)
 
         api_url = endpoint.format(domain=domain, page_hash=page_hash)
-        r = requests.get(api_url, headers=headers)
+        r = get_session().get(api_url, headers=headers)
 
         if domain == 'gallery' and r.status_code != 200:
             # Not a gallery, try to download using the image endpoint
             api_url = endpoint.format(domain='image', page_hash=page_hash)
-            r = requests.get(api_url, headers=headers)
+            r = get_session().get(api_url, headers=headers)
 
         if r.status_code != 200:
             _logger.warning('Imgur API failure, status %s', r.status_code)
@@ -294,14 +478,30 @@ class ImgurScrapeMIMEParser(BaseMIMEParser):
         <link rel="image_src" href="http://i.imgur.com/xrqQ4LE.jpg">
     """
     pattern = re.compile(r'https?://(w+\.)?(m\.)?imgur\.com/[^.]+$')
+    domains = ('imgur.com',)
+    cache_ttl = DAY
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, 'html.parser')
-        tag = soup.find('meta', attrs={'name': 'twitter:image'})
-        if tag:
-            url = tag.get('content')
+        found = []
+        in_head = []
+
+        def visit(tag, attrs):
+            if tag == 'meta':
+                if attrs.get('name') == 'twitter:image':
+                    found.append(attrs.get('content'))
+                    return True
+                if attrs.get('property') == 'og:image':
+                    in_head.append(True)
+            elif tag in ('/head', 'body'):
+                # The page has no twitter:image tag if the og:image tag that
+                # goes next to it has already been seen
+                return bool(in_head)
+            return False
+
+        scan_page(url, visit)
+        if found:
+            url = found[0]
             if GifvMIMEParser.pattern.match(url):
                 return GifvMIMEParser.get_mimetype(url)
         return BaseMIMEParser.get_mimetype(url)
@@ -312,6 +512,7 @@ class InstagramMIMEParser(OpenGraphMIMEParser):
     Instagram uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?instagr((am\.com)|\.am)/p/[^.]+$')
+    domains = ('instagram.com', 'instagr.am')
 
 
 class StreamableMIMEParser(OpenGraphMIMEParser):
@@ -319,6 +520,7 @@ class StreamableMIMEParser(OpenGraphMIMEParser):
     Streamable uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?streamable\.com/[^.]+$')
+    domains = ('streamable.com',)
 
 
 class LiveleakMIMEParser(BaseMIMEParser):
@@ -331,30 +533,33 @@ class LiveleakMIMEParser(BaseMIMEParser):
     Sometimes only one video source is available
     """
     pattern = re.compile(r'https?://((www|m)\.)?liveleak\.com/view\?i=\w+$')
+    domains = ('liveleak.com',)
+    cache_ttl = DAY
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, 'html.parser')
-
-        urls = []
-        videos = soup.find_all('video')
-        for vid in videos:
-            source = vid.find('source', attr={'res': 'HD'})
-            source = source or vid.find('source')
-            if source:
-                urls.append((source.get('src'), source.get('type')))
-
         # TODO: Handle pages with multiple videos
-        if urls:
-            return urls[0]
-
-        def filter_iframe(t):
-            return t.name == 'iframe' and 'youtube.com' in t['src']
+        state = {'video': False, 'source': None, 'iframe': None}
+
+        def visit(tag, attrs):
+            if tag == 'video':
+                state['video'] = True
+            elif tag == '/video':
+                state['video'] = False
+            elif tag == 'source' and state['video']:
+                state['source'] = attrs
+                return True
+            elif tag == 'iframe' and state['iframe'] is None:
+                if 'youtube.com' in (attrs.get('src') or ''):
+                    state['iframe'] = attrs['src']
+
+        scan_page(url, visit)
+        source = state['source']
+        if source:
+            return source.get('src'), source.get('type')
 
-        iframe = soup.find_all(filter_iframe)
-        if iframe:
-            return YoutubeMIMEParser.get_mimetype(iframe[0]['src'].strip('/'))
+        if state['iframe']:
+            return YoutubeMIMEParser.get_mimetype(state['iframe'].strip('/'))
 
         return url, None
 
@@ -364,15 +569,22 @@ class ClippitUserMIMEParser(BaseMIMEParser):
     Clippit uses a video player container
     """
     pattern = re.compile(r'https?://(www\.)?clippituser\.tv/c/.+$')
+    domains = ('clippituser.tv',)
+    cache_ttl = DAY
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, 'html.parser')
-        tag = soup.find(id='player-container')
-        if tag:
+        found = []
+
+        def visit(tag, attrs):
+            if attrs.get('id') == 'player-container':
+                found.append(attrs)
+                return True
+
+        scan_page(url, visit)
+        if found:
             quality = ['data-{}-file'.format(_) for _ in ['hd', 'sd']]
-            new_url = tag.get(quality[0])
+            new_url = found[0].get(quality[0])
             if new_url:
                 return new_url, 'video/mp4'
 
@@ -384,6 +596,7 @@ class GifsMIMEParser(OpenGraphMIMEParser):
     Gifs.com uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?gifs\.com/gif/.+$')
+    domains = ('gifs.com',)
 
 
 class GiphyMIMEParser(OpenGraphMIMEParser):
@@ -391,6 +604,7 @@ class GiphyMIMEParser(OpenGraphMIMEParser):
     Giphy.com uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?giphy\.com/gifs/.+$')
+    domains = ('giphy.com',)
 
 
 class ImgflipMIMEParser(OpenGraphMIMEParser):
@@ -398,6 +612,7 @@ class ImgflipMIMEParser(OpenGraphMIMEParser):
     imgflip.com uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?imgflip\.com/i/.+$')
+    domains = ('imgflip.com',)
 
 
 class LivememeMIMEParser(OpenGraphMIMEParser):
@@ -405,6 +620,7 @@ class LivememeMIMEParser(OpenGraphMIMEParser):
     livememe.com uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?livememe\.com/[^.]+$')
+    domains = ('livememe.com',)
 
 
 class MakeamemeMIMEParser(OpenGraphMIMEParser):
@@ -412,6 +628,7 @@ class MakeamemeMIMEParser(OpenGraphMIMEParser):
     makeameme.com uses the Open Graph protocol
     """
     pattern = re.compile(r'https?://(www\.)?makeameme\.org/meme/.+$')
+    domains = ('makeameme.org',)
 
 
 class FlickrMIMEParser(OpenGraphMIMEParser):
@@ -420,6 +637,7 @@ class FlickrMIMEParser(OpenGraphMIMEParser):
     """
     # TODO: handle albums/photosets (https://www.flickr.com/services/api)
     pattern = re.compile(r'https?://(www\.)?flickr\.com/photos/[^/]+/[^/]+/?$')
+    domains = ('flickr.com',)
 
 
 class StreamjaMIMEParser(VideoTagMIMEParser):
@@ -427,6 +645,7 @@ class StreamjaMIMEParser(VideoTagMIMEParser):
     Embedded HTML5 video element
     """
     pattern = re.compile(r'https?://(www\.)?streamja\.com/[^/]+/?$')
+    domains = ('streamja.com',)
 
 
 class WorldStarHipHopMIMEParser(BaseMIMEParser):
@@ -438,25 +657,28 @@ class WorldStarHipHopMIMEParser(BaseMIMEParser):
     Sometimes only one video source is available
     """
     pattern = re.compile(r'https?://((www|m)\.)?worldstarhiphop\.com/videos/video.php\?v=\w+$')
+    domains = ('worldstarhiphop.com',)
+    cache_ttl = DAY
 
     @staticmethod
     def get_mimetype(url):
-        page = requests.get(url)
-        soup = BeautifulSoup(page.content, 'html.parser')
+        state = {'source': None, 'iframe': None}
 
-        def filter_source(t):
-            return t.name == 'source' and t['src'] and t['type'] == 'video/mp4'
+        def visit(tag, attrs):
+            if tag == 'source':
+                if attrs.get('src') and attrs.get('type') == 'video/mp4':
+                    state['source'] = attrs['src']
+                    return True
+            elif tag == 'iframe' and state['iframe'] is None:
+                if 'youtube.com' in (attrs.get('src') or ''):
+                    state['iframe'] = attrs['src']
 
-        source = soup.find_all(filter_source)
-        if source:
-            return source[0]['src'], 'video/mp4'
-
-        def filter_iframe(t):
-            return t.name == 'iframe' and 'youtube.com' in t['src']
+        scan_page(url, visit)
+        if state['source']:
+            return state['source'], 'video/mp4'
 
-        iframe = soup.find_all(filter_iframe)
-        if iframe:
-            return YoutubeMIMEParser.get_mimetype(iframe[0]['src'])
+        if state['iframe']:
+            return YoutubeMIMEParser.get_mimetype(state['iframe'])
 
         return url, None
 
@@ -483,3 +705,352 @@ parsers = [
     WorldStarHipHopMIMEParser,
     GifvMIMEParser,
     BaseMIMEParser]
+
+
+class ParserRegistry(object):
+    """
+    Selects the parser that should be used for a url.
+
+    Checking every pattern in order gets slower with each site that's added,
+    and most of the patterns can only match a single website anyway. The
+    registry indexes parsers by the host names in their `domains`, so only
+    the parsers for the url's host (and its parent domains) need to be
+    tried. If none of them match, the parsers without any domains are tried
+    in order like before, ending with the catch-all BaseMIMEParser.
+
+    Users can add their own parsers by placing python modules in the plugin
+    directory. Each module should define a `parsers` list in the same way as
+    rtv/mime_parsers.py, and its parsers take priority over the built-in
+    ones. Plugin parsers with `domains` are tried first for those hosts, and
+    plugin parsers without them are tried first for every url. The modules
+    aren't imported until the first link is looked up, which happens on a
+    background thread as soon as a link is drawn if media is enabled.
+    """
+
+    # Much faster than urlparse(), which dominates the lookup time otherwise
+    HOST_RE = re.compile(
+        r'[a-zA-Z][a-zA-Z0-9+.-]*://(?:[^/?#@]*@)?([^/?#:]+)')
+
+    def __init__(self, parsers, plugin_dir=None):
+        """
+        Params:
+            parsers (list): Parser classes in the order they will be checked.
+            plugin_dir (str): Directory that user parser modules are loaded
+                from.
+        """
+        self.plugin_dir = plugin_dir
+        self._parsers = []
+        self._first = []
+        self._generic = []
+        self._index = {}
+        self._plugins_loaded = plugin_dir is None
+        self._lock = threading.Lock()
+        for parser in parsers:
+            self.register(parser)
+
+    @property
+    def parsers(self):
+        self._load_plugins()
+        return list(self._parsers)
+
+    def register(self, parser, first=False):
+        """
+        Add a parser, either after or before all of the existing parsers.
+        Parsers without domains that are added first are tried before the
+        domain index.
+        """
+        def insert(items):
+            if first:
+                items.insert(0, parser)
+            else:
+                items.append(parser)
+
+        insert(self._parsers)
+        if parser.domains:
+            for domain in parser.domains:
+                insert(self._index.setdefault(domain.lower(), []))
+        else:
+            insert(self._first if first else self._generic)
+
+    def find(self, url):
+        """
+        Return the first parser that can handle the url, or None.
+        """
+        self._load_plugins()
+
+        match = self.HOST_RE.match(url)
+        if match is None:
+            # Fall back to checking everything if the url can't be parsed
+            candidates = self._parsers
+        else:
+            candidates = list(self._first)
+            domain = match.group(1).lower()
+            while domain:
+                candidates.extend(self._index.get(domain, ()))
+                domain = domain.partition('.')[2]
+            candidates.extend(self._generic)
+
+        for parser in candidates:
+            if parser.pattern.match(url):
+                return parser
+        return None
+
+    def _load_plugins(self):
+        if self._plugins_loaded:
+            return
+
+        with self._lock:
+            if self._plugins_loaded:
+                return
+
+            if os.path.isdir(self.plugin_dir):
+                filenames = sorted(os.listdir(self.plugin_dir), reverse=True)
+                for filename in filenames:
+                    if filename.endswith('.py'):
+                        self._load_plugin(filename)
+            self._plugins_loaded = True
+
+    def _load_plugin(self, filename):
+        path = os.path.join(self.plugin_dir, filename)
+        name = 'rtv_parsers_' + filename[:-3]
+        try:
+            module = load_module(name, path)
+        except Exception as e:
+            _logger.warning('Unable to load parsers from %s', path)
+            _logger.exception(e)
+            return
+
+        _logger.info('Loaded parsers from %s', path)
+        for parser in reversed(getattr(module, 'parsers', [])):
+            self.register(parser, first=True)
+
+
+def load_module(name, path):
+    """
+    Import a python source file that's outside of the package.
+    """
+    try:
+        from importlib.util import spec_from_file_location, module_from_spec
+    except ImportError:
+        # Python 2 and 3.4
+        import imp
+        return imp.load_source(name, path)
+
+    spec = spec_from_file_location(name, path)
+    module = module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MIMECache(object):
+    """
+    Remembers the result of running a parser on a url, so that opening the
+    same link twice doesn't require scraping the page again.
+
+    Results are kept in memory and, if a filename is given, written to disk so
+    they survive between sessions. Each entry is valid for the `cache_ttl` of
+    the parser that produced it. Failures, including pages where no media
+    could be found, are also stored for `negative_ttl` seconds so that a dead
+    host isn't contacted again every time the link is selected.
+    """
+
+    def __init__(self, filename=None, registry=None, max_entries=512,
+                 negative_ttl=5 * 60):
+        """
+        Params:
+            filename (str): Path to the sqlite database that results will be
+                persisted to. If None, results are only kept in memory.
+            registry (ParserRegistry): The parsers that results are stored
+                for, used to work out how long entries are kept on disk.
+                Defaults to the built-in parsers.
+            max_entries (int): Maximum number of results to hold in memory.
+            negative_ttl (float): Number of seconds to remember failures for.
+        """
+        self.filename = filename
+        self.registry = registry
+        self.negative_ttl = negative_ttl
+        self._memory = LRUCache(max_entries=max_entries)
+        self._disk = None
+        self._disk_opened = not filename
+        self._lock = threading.Lock()
+
+    def get_mimetype(self, parser, url):
+        """
+        Return the (modified_url, content_type) for the url, running the
+        parser only if there isn't a fresh result in the cache. A recently
+        cached failure raises a MIMEParserError without contacting the host.
+        """
+        if not parser.cache_ttl:
+            return parser.get_mimetype(url)
+
+        key = '{0} {1}'.format(parser.__name__, url)
+        entry = self._lookup(key)
+        if entry is not None:
+            timestamp, result, error = entry
+            if time.time() - timestamp < self._get_ttl(parser, result):
+                if error:
+                    raise exceptions.MIMEParserError(error)
+                return result
+
+        try:
+            result = parser.get_mimetype(url)
+        except Exception as e:
+            self._store(key, None, '{0}: {1}'.format(type(e).__name__, e))
+            raise
+
+        self._store(key, tuple(result), None)
+        return result
+
+    def clear(self):
+        self._memory.clear()
+        disk = self._get_disk()
+        if disk is not None:
+            disk.clear()
+
+    def _get_disk(self):
+        """
+        The database is opened on first use, because old entries are purged
+        based on the longest cache_ttl of any parser, and the registry
+        doesn't load the plugin parsers until the first link is looked up.
+        """
+        if self._disk_opened:
+            return self._disk
+
+        with self._lock:
+            if not self._disk_opened:
+                if self.registry is None:
+                    registered = parsers
+                else:
+                    registered = self.registry.parsers
+                max_age = max(p.cache_ttl or 0 for p in registered)
+                self._disk = DiskCache(self.filename, max_age=max_age)
+                self._disk_opened = True
+        return self._disk
+
+    def _lookup(self, key):
+        entry = self._memory.get(key)
+        disk = self._get_disk()
+        if entry is None and disk is not None:
+            row = disk.get(key)
+            if row is not None:
+                entry = row[1]
+                self._memory[key] = entry
+        return entry
+
+    def _get_ttl(self, parser, result):
+        # A missing content type usually means that the page didn't load
+        # properly, so it's only remembered for as long as an exception
+        if result is None or not result[1]:
+            return self.negative_ttl
+        return parser.cache_ttl
+
+    def _store(self, key, result, error):
+        entry = (time.time(), result, error)
+        self._memory[key] = entry
+        disk = self._get_disk()
+        if disk is not None:
+            disk.set(key, entry)
+
+
+class MIMEResolver(object):
+    """
+    Runs the MIME parsers for links that are visible on the screen in the
+    background, so the result is already in the cache by the time that the
+    user tries to open one of them.
+
+    Links are queued with `prefetch()` while the page is drawn. A small number
+    of worker threads are started on demand and exit once the queue is empty.
+    The most recently queued links are resolved first, and the queue is
+    bounded so that links which have been scrolled past are dropped instead of
+    being requested long after they're needed. Links that are queued, running,
+    or were resolved recently are ignored, and so are links whose parser
+    doesn't allow prefetching.
+
+    >>> resolver = MIMEResolver(MIMECache(), ParserRegistry(parsers))
+    >>> resolver.prefetch('https://gfycat.com/DeliciousUnfortunateAdouri')
+    >>> resolver.wait('https://gfycat.com/DeliciousUnfortunateAdouri')
+    """
+
+    def __init__(self, cache, registry, max_workers=2, max_pending=32):
+        """
+        Params:
+            cache (MIMECache): Where the results are stored.
+            registry (ParserRegistry): Used to select the parser for a link.
+            max_workers (int): Maximum number of concurrent requests.
+            max_pending (int): Maximum number of links waiting to start.
+        """
+        self.cache = cache
+        self.registry = registry
+        self.max_workers = max_workers
+        self._pending = deque(maxlen=max_pending)
+        self._running = {}  # url -> threading.Event
+        self._resolved = LRUCache(max_entries=1024, sizeof=lambda _: 1)
+        self._workers = 0
+        self._lock = threading.Lock()
+
+    def prefetch(self, url):
+        """
+        Queue the url to be resolved in the background.
+        """
+        if not self.max_workers:
+            return
+
+        # Give failed links another chance once the failure is forgotten
+        self._resolved.expire(self.cache.negative_ttl)
+
+        with self._lock:
+            if url in self._running or url in self._resolved:
+                return
+            if url in self._pending:
+                return
+
+            self._pending.append(url)
+            if self._workers < self.max_workers:
+                self._workers += 1
+                thread = threading.Thread(target=self._work)
+                thread.daemon = True
+                thread.start()
+
+    def wait(self, url, timeout=None):
+        """
+        Take the url off of the queue and block until any request for it
+        that is already in progress has finished. This should be called
+        before resolving a link in the foreground so the same page isn't
+        requested twice.
+        """
+        with self._lock:
+            if url in self._pending:
+                self._pending.remove(url)
+            event = self._running.get(url)
+
+        if event is not None:
+            event.wait(timeout)
+
+    def cancel(self):
+        """
+        Discard all of the links that haven't started resolving yet.
+        """
+        with self._lock:
+            self._pending.clear()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._workers -= 1
+                    return
+                url = self._pending.pop()
+                event = self._running[url] = threading.Event()
+
+            try:
+                parser = self.registry.find(url)
+                if parser is not None and parser.cache_ttl and \
+                        parser.prefetch:
+                    self.cache.get_mimetype(parser, url)
+            except Exception as e:
+                _logger.info('Unable to prefetch %s: %s', url, e)
+            finally:
+                with self._lock:
+                    del self._running[url]
+                    self._resolved[url] = True
+                event.set()
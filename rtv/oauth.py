@@ -113,6 +113,84 @@ class OAuthHandler(BaseHTTPRequestHandler):
         return body
 
 
+class TokenRefresher(object):
+    """
+    Refreshes the OAuth access token on a background thread shortly before
+    it expires.
+
+    Otherwise an expired token is only discovered when reddit rejects a
+    request, and the refresh and the retry are added on top of the request
+    that the user is waiting for. The thread sleeps until `margin` seconds
+    before the expiry time that's recorded by set_access_credentials(), and
+    wakes up periodically to check if the token was replaced in the meantime
+    by logging in or out.
+    """
+
+    # Seconds between checks for a new access token
+    POLL_INTERVAL = 60
+    # Seconds to wait before trying again after a refresh fails
+    RETRY_INTERVAL = 30
+
+    def __init__(self, reddit, margin=60):
+        """
+        Params:
+            reddit (praw.Reddit): Instance of the reddit api.
+            margin (float): Number of seconds before the token expires that
+                it will be refreshed.
+        """
+        self.reddit = reddit
+        self.margin = margin
+        self.refreshes = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name='TokenRefresher')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def seconds_until_refresh(self):
+        """
+        Return the number of seconds until the token should be refreshed, or
+        None if there's no token that can be refreshed.
+        """
+        expires = self.reddit.access_token_expires
+        if expires is None or not self.reddit.refresh_token:
+            return None
+        return max(expires - self.margin - time.time(), 0)
+
+    def refresh(self):
+        """
+        Replace the current access token. If another thread has already
+        replaced it, e.g. because a request was rejected, nothing is sent.
+        """
+        try:
+            # pylint: disable=protected-access
+            self.reddit._refresh_expired_token(self.reddit.access_token)
+        except Exception as e:
+            _logger.warning('Unable to refresh the access token: %s', e)
+            return False
+        self.refreshes += 1
+        _logger.info('Refreshed the access token')
+        return True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            delay = self.seconds_until_refresh()
+            if delay is None:
+                delay = self.POLL_INTERVAL
+            elif delay <= 0:
+                delay = 0 if self.refresh() else self.RETRY_INTERVAL
+            else:
+                delay = min(delay, self.POLL_INTERVAL)
+            self._stopped.wait(delay)
+
+
 class OAuthHelper(object):
 
     params = OAuthHandler.params
@@ -137,16 +215,26 @@ class OAuthHelper(object):
             if '.compact' not in self.reddit.config.API_PATHS['authorize']:
                 self.reddit.config.API_PATHS['authorize'] += '.compact'
 
-    def authorize(self, autologin=False):
+    def authorize(self, autologin=False, refresh=None):
+        """
+        Params:
+            autologin (bool): Log in silently using the saved refresh token.
+            refresh (startup.Task): The request for new access credentials,
+                if it was already started in the background.
+        """
 
         self.params.update(state=None, code=None, error=None)
 
         # If we already have a token, request new access credentials
         if self.config.refresh_token:
+            self.reddit.handler.set_account(self.config.refresh_token)
             with self.term.loader('Logging in'):
                 try:
-                    self.reddit.refresh_access_information(
-                        self.config.refresh_token)
+                    if refresh is not None:
+                        refresh.result()
+                    else:
+                        self.reddit.refresh_access_information(
+                            self.config.refresh_token)
                 except (HTTPException, OAuthException) as e:
                     # Reddit didn't accept the refresh-token
                     # This appears to throw a generic 400 error instead of the
@@ -231,10 +319,14 @@ class OAuthHelper(object):
             self.term.show_notification('UUID mismatch', style='Error')
             return
 
+        # The account isn't known until the refresh token comes back, so
+        # nothing is read from or written to the persistent cache until then
+        self.reddit.handler.set_account(None)
         with self.term.loader('Logging in'):
             info = self.reddit.get_access_information(self.params['code'])
         if self.term.loader.exception:
             return
+        self.reddit.handler.set_account(info['refresh_token'])
 
         message = 'Welcome {}!'.format(self.reddit.user.name)
         self.term.show_notification(message)
@@ -246,3 +338,6 @@ class OAuthHelper(object):
     def clear_oauth_data(self):
         self.reddit.clear_authentication()
         self.config.delete_refresh_token()
+        # Don't leave the user's pages behind in the persistent cache
+        self.reddit.handler.set_account(None)
+        self.reddit.handler.clear_cache()
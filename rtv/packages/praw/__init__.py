@@ -32,20 +32,24 @@ import platform
 import re
 import six
 import sys
+import threading
+import time
+from contextlib import contextmanager
 from . import decorators, errors
 from .handlers import DefaultHandler
 from .helpers import chunk_sequence, normalize_url
-from .internal import (_image_type, _prepare_request,
+from .internal import (_decode_html_entities, _get_json_backend,
+                       _image_type, _prepare_request, RequestContext,
                        _raise_redirect_exceptions,
                        _raise_response_exceptions,
-                       _to_reddit_list, _warn_pyopenssl)
+                       _to_reddit_list, _unescape_leaves, _warn_pyopenssl)
 from .settings import CONFIG
 from requests import Session
 from requests.compat import urljoin
 from requests.utils import to_native_string
 from requests import Request
 # pylint: disable=F0401
-from six.moves import html_entities, http_cookiejar
+from six.moves import http_cookiejar
 from six.moves.urllib.parse import parse_qs, urlparse, urlunparse
 # pylint: enable=F0401
 from warnings import warn_explicit
@@ -214,8 +218,11 @@ class Config(object):  # pylint: disable=R0903
     def __init__(self, site_name, **kwargs):
         """Initialize PRAW's configuration."""
         def config_boolean(item):
+            if isinstance(item, bool):
+                return item
             return item and item.lower() in ('1', 'yes', 'true', 'on')
 
+        self._urls = {}
         obj = dict(CONFIG.items(site_name))
         # Overwrite configuration file settings with those given during
         # instantiation of the Reddit instance.
@@ -260,6 +267,10 @@ class Config(object):  # pylint: disable=R0903
         self.grant_type = obj.get('oauth_grant_type') or None
         self.refresh_token = obj.get('oauth_refresh_token') or None
         self.store_json_result = config_boolean(obj.get('store_json_result'))
+        self.lazy_objects = bool(config_boolean(obj.get('lazy_objects')))
+        self.decode_html_entities = bool(config_boolean(
+            obj.get('decode_html_entities', True)))
+        self.json_backend = obj.get('json_backend') or None
 
         if 'short_domain' in obj and obj['short_domain']:
             self._short_domain = 'http://' + obj['short_domain']
@@ -275,7 +286,14 @@ class Config(object):  # pylint: disable=R0903
     def __getitem__(self, key):
         """Return the URL for key."""
         prefix = self.permalink_url if key in self.WWW_PATHS else self.api_url
-        return urljoin(prefix, self.API_PATHS[key])
+        # Every object that's built looks up its info url, so the joined urls
+        # are remembered instead of calling urljoin() each time.
+        try:
+            return self._urls[prefix, key]
+        except KeyError:
+            url = urljoin(prefix, self.API_PATHS[key])
+            self._urls[prefix, key] = url
+            return url
 
     @property
     def short_domain(self):
@@ -333,6 +351,9 @@ class BaseReddit(object):
         """
         if not user_agent or not isinstance(user_agent, six.string_types):
             raise TypeError('user_agent must be a non-empty string.')
+        # Per-thread stack of request contexts, see _request_context()
+        self._thread_state = threading.local()
+        self._refresh_lock = threading.RLock()
         if 'bot' in user_agent.lower():
             warn_explicit(
                 'The keyword `bot` in your user_agent may be problematic.',
@@ -341,6 +362,7 @@ class BaseReddit(object):
         self.config = Config(site_name or os.getenv('REDDIT_SITE') or 'reddit',
                              **kwargs)
         self.handler = handler or DefaultHandler()
+        self.json_loads = _get_json_backend(self.config.json_backend)
         self.http = Session()
         self.http.headers['User-Agent'] = self.config.ua_string(user_agent)
         self.http.validate_certs = self.config.validate_certs
@@ -375,9 +397,55 @@ class BaseReddit(object):
         # Initial values
         self._use_oauth = False
 
+    @property
+    def _context(self):
+        """Return the request context that is active in the current thread."""
+        try:
+            return self._thread_state.contexts[-1]
+        except AttributeError:
+            self._thread_state.contexts = [RequestContext()]
+            return self._thread_state.contexts[0]
+
+    @contextmanager
+    def _request_context(self, use_oauth=None, url=None):
+        """Make requests in a new context until the block exits.
+
+        Values that aren't given are inherited from the enclosing context.
+        Any changes made to the context inside of the block, e.g. by setting
+        _use_oauth, are discarded when it exits.
+
+        """
+        parent = self._context
+        context = RequestContext(
+            parent.use_oauth if use_oauth is None else use_oauth,
+            parent.url if url is None else url)
+        contexts = self._thread_state.contexts
+        contexts.append(context)
+        try:
+            yield context
+        finally:
+            contexts.pop()
+
+    @property
+    def _use_oauth(self):
+        """Return True when the current request should use the OAuth domain."""
+        return self._context.use_oauth
+
+    @_use_oauth.setter
+    def _use_oauth(self, value):
+        self._context.use_oauth = value
+
+    @property
+    def _request_url(self):
+        """Return the url of the response that is currently being decoded."""
+        url = self._context.url
+        if url is None:
+            raise AttributeError('_request_url')
+        return url
+
     def _request(self, url, params=None, data=None, files=None, auth=None,
                  timeout=None, raw_response=False, retry_on_error=True,
-                 method=None):
+                 method=None, as_bytes=False):
         """Given a page url and a dict of params, open and return the page.
 
         :param url: the url to grab content from.
@@ -391,6 +459,8 @@ class BaseReddit(object):
             response body
         :param retry_on_error: if True retry the request, if it fails, for up
             to 3 attempts
+        :param as_bytes: return the undecoded response body. HTML entities are
+            left for the caller to decode.
         :returns: either the response body or the response object
 
         """
@@ -415,9 +485,6 @@ class BaseReddit(object):
 
             return (request, key_items, kwargs)
 
-        def decode(match):
-            return six.unichr(html_entities.name2codepoint[match.group(1)])
-
         def handle_redirect():
             response = None
             url = request.url
@@ -439,40 +506,64 @@ class BaseReddit(object):
             return response
 
         timeout = self.config.timeout if timeout is None else timeout
-        request, key_items, kwargs = build_key_items(url, params, data,
-                                                     auth, files, method)
 
-        tempauth = self._use_oauth
-        remaining_attempts = 3 if retry_on_error else 1
-        attempt_oauth_refresh = bool(self.refresh_token)
-        while True:
-            try:
-                self._use_oauth = self.is_oauth_session()
-                response = handle_redirect()
-                _raise_response_exceptions(response)
-                self.http.cookies.update(response.cookies)
-                if raw_response:
-                    return response
-                else:
-                    return re.sub('&([^;]+);', decode, response.text)
-            except errors.OAuthInvalidToken as error:
-                if not attempt_oauth_refresh:
-                    raise
-                attempt_oauth_refresh = False
-                self._use_oauth = False
+        # Each request gets its own context, so the OAuth flag can be changed
+        # below without affecting the caller or requests in other threads
+        with self._request_context() as context:
+            tempauth = context.use_oauth
+            access_token = getattr(self, 'access_token', None)
+            request, key_items, kwargs = build_key_items(url, params, data,
+                                                         auth, files, method)
+
+            remaining_attempts = 3 if retry_on_error else 1
+            attempt_oauth_refresh = bool(self.refresh_token)
+            while True:
+                try:
+                    context.use_oauth = self.is_oauth_session()
+                    response = handle_redirect()
+                    _raise_response_exceptions(response)
+                    self.http.cookies.update(response.cookies)
+                    if raw_response:
+                        return response
+                    elif as_bytes:
+                        return response.content
+                    elif self.config.decode_html_entities:
+                        return _decode_html_entities(response.text)
+                    else:
+                        return response.text
+                except errors.OAuthInvalidToken as error:
+                    if not attempt_oauth_refresh:
+                        raise
+                    attempt_oauth_refresh = False
+                    self._refresh_expired_token(access_token)
+                    context.use_oauth = tempauth
+                    access_token = getattr(self, 'access_token', None)
+                    request, key_items, kwargs = build_key_items(
+                        url, params, data, auth, files, method)
+                except errors.HTTPException as error:
+                    remaining_attempts -= 1
+                    # pylint: disable=W0212
+                    if error._raw.status_code not in self.RETRY_CODES or \
+                            remaining_attempts == 0:
+                        raise
+                finally:
+                    context.use_oauth = tempauth
+
+    def _refresh_expired_token(self, access_token):
+        """Refresh the OAuth access token after it was rejected.
+
+        When several threads find out that the token has expired at the same
+        time, only the first one asks for a new token and the others re-use
+        it.
+
+        :param access_token: The token that was used for the failed request.
+
+        """
+        with self._refresh_lock:
+            if getattr(self, 'access_token', None) != access_token:
+                return
+            with self._request_context(use_oauth=False):
                 self.refresh_access_information()
-                self._use_oauth = tempauth
-                request, key_items, kwargs = build_key_items(url, params,
-                                                             data, auth, files,
-                                                             method)
-            except errors.HTTPException as error:
-                remaining_attempts -= 1
-                # pylint: disable=W0212
-                if error._raw.status_code not in self.RETRY_CODES or \
-                        remaining_attempts == 0:
-                    raise
-            finally:
-                self._use_oauth = tempauth
 
     def _json_reddit_objecter(self, json_data):
         """Return an appropriate RedditObject from json_data when possible."""
@@ -558,16 +649,11 @@ class BaseReddit(object):
 
         # While we still need to fetch more content to reach our limit, do so.
         while fetch_once or fetch_all or objects_found < limit:
-            if _use_oauth:  # Set the necessary _use_oauth value
-                assert self._use_oauth is False
-                self._use_oauth = _use_oauth
-            try:
+            # Set the necessary _use_oauth value for this page only
+            with self._request_context(use_oauth=_use_oauth or None):
                 page_data = self.request_json(url, params=params)
                 if object_filter:
                     page_data = page_data[object_filter]
-            finally:  # Restore _use_oauth value
-                if _use_oauth:
-                    self._use_oauth = False
             fetch_once = False
             root = page_data.get(root_field, page_data)
             for thing in root[thing_field]:
@@ -617,18 +703,31 @@ class BaseReddit(object):
         if not url.endswith('.json'):
             url += '.json'
         response = self._request(url, params, data, method=method,
-                                 retry_on_error=retry_on_error)
-        hook = self._json_reddit_objecter if as_objects else None
-        # Request url just needs to be available for the objecter to use
-        self._request_url = url  # pylint: disable=W0201
-
-        if response == '':
+                                 retry_on_error=retry_on_error, as_bytes=True)
+        if not response:
             # Some of the v1 urls don't return anything, even when they're
             # successful.
-            return response
-
-        data = json.loads(response, object_hook=hook)
-        delattr(self, '_request_url')
+            return ''
+
+        # The body is decoded straight from bytes, and html entities are only
+        # decoded in the strings that are found in the json, instead of
+        # running a regex over the whole body before it's parsed.
+        def hook(json_data):
+            if self.config.decode_html_entities:
+                json_data = _unescape_leaves(json_data)
+            if as_objects:
+                json_data = self._json_reddit_objecter(json_data)
+            return json_data
+
+        if not as_objects and not self.config.decode_html_entities:
+            hook = None
+        # Request url just needs to be available for the objecter to use
+        with self._request_context(url=url):
+            data = self.json_loads(response, hook)
+        # The hook is only called for objects, e.g. the submission page is a
+        # list of two listings
+        if self.config.decode_html_entities and isinstance(data, list):
+            _unescape_leaves(data)
         # Update the modhash
         if isinstance(data, dict) and 'data' in data \
                 and 'modhash' in data['data']:
@@ -672,9 +771,12 @@ class OAuth2Reddit(BaseReddit):
 
         :param code: the code received in the request from the OAuth2 server
         :returns: A dictionary with the key/value pairs for ``access_token``,
-            ``refresh_token`` and ``scope``. The ``refresh_token`` value will
-            be None when the OAuth2 grant is not refreshable. The ``scope``
-            value will be a set containing the scopes the tokens are valid for.
+            ``refresh_token``, ``scope`` and ``expires_in``. The
+            ``refresh_token`` value will be None when the OAuth2 grant is not
+            refreshable. The ``scope`` value will be a set containing the
+            scopes the tokens are valid for. The ``expires_in`` value is the
+            number of seconds that the access token is valid for, or None if
+            the server didn't say.
 
         """
         if self.config.grant_type == 'password':
@@ -687,7 +789,8 @@ class OAuth2Reddit(BaseReddit):
         retval = self._handle_oauth_request(data)
         return {'access_token': retval['access_token'],
                 'refresh_token': retval.get('refresh_token'),
-                'scope': set(retval['scope'].split(' '))}
+                'scope': set(retval['scope'].split(' ')),
+                'expires_in': retval.get('expires_in')}
 
     @decorators.require_oauth
     def get_authorize_url(self, state, scope='identity', refreshable=False):
@@ -727,9 +830,11 @@ class OAuth2Reddit(BaseReddit):
         :param refresh_token: the refresh token used to obtain the updated
             information
         :returns: A dictionary with the key/value pairs for access_token,
-            refresh_token and scope. The refresh_token value will be done when
-            the OAuth2 grant is not refreshable. The scope value will be a set
-            containing the scopes the tokens are valid for.
+            refresh_token, scope and expires_in. The refresh_token value will
+            be done when the OAuth2 grant is not refreshable. The scope value
+            will be a set containing the scopes the tokens are valid for.
+            expires_in is the number of seconds that the access token is
+            valid for.
 
         Password grants aren't refreshable, so use `get_access_information()`
         again, instead.
@@ -745,7 +850,8 @@ class OAuth2Reddit(BaseReddit):
         retval = self._handle_oauth_request(data)
         return {'access_token': retval['access_token'],
                 'refresh_token': refresh_token,
-                'scope': set(retval['scope'].split(' '))}
+                'scope': set(retval['scope'].split(' ')),
+                'expires_in': retval.get('expires_in')}
 
     def set_oauth_app_info(self, client_id, client_secret, redirect_uri):
         """Set the app information to use with OAuth2.
@@ -1304,6 +1410,7 @@ class AuthenticatedReddit(OAuth2Reddit, UnauthenticatedReddit):
         #  * set(...) means OAuth authenticated with the scopes in the set
         self._authentication = None
         self.access_token = None
+        self.access_token_expires = None
         self.refresh_token = self.config.refresh_token or None
         self.user = None
 
@@ -1345,12 +1452,13 @@ class AuthenticatedReddit(OAuth2Reddit, UnauthenticatedReddit):
     def clear_authentication(self):
         """Clear any existing authentication on the reddit object.
 
-        This function is implicitly called on `login` and
-        `set_access_credentials`.
+        This function is implicitly called on `login`, and the equivalent is
+        done by `set_access_credentials`.
 
         """
         self._authentication = None
         self.access_token = None
+        self.access_token_expires = None
         self.refresh_token = None
         self.http.cookies.clear()
         self.user = None
@@ -1577,7 +1685,7 @@ class AuthenticatedReddit(OAuth2Reddit, UnauthenticatedReddit):
 
     @decorators.require_oauth
     def set_access_credentials(self, scope, access_token, refresh_token=None,
-                               update_user=True):
+                               update_user=True, expires_in=None):
         """Set the credentials used for OAuth2 authentication.
 
         Calling this function will overwrite any currently existing access
@@ -1588,6 +1696,9 @@ class AuthenticatedReddit(OAuth2Reddit, UnauthenticatedReddit):
         :param refresh_token: the refresh token of the authentication
         :param update_user: Whether or not to set the user attribute for
             identity scopes
+        :param expires_in: The number of seconds until the access token
+            expires. The time is stored in `access_token_expires`, so the
+            token can be refreshed before it's rejected.
 
         """
         if isinstance(scope, (list, tuple)):
@@ -1596,14 +1707,22 @@ class AuthenticatedReddit(OAuth2Reddit, UnauthenticatedReddit):
             scope = set(scope.split())
         if not isinstance(scope, set):
             raise TypeError('`scope` parameter must be a set')
-        self.clear_authentication()
+        # This is the same as clear_authentication(), but the new credentials
+        # are swapped in directly so that requests made from other threads
+        # never see the session without an access token, or without a user,
+        # while it's refreshed
+        self.http.cookies.clear()
         # Update authentication settings
         self._authentication = scope
         self.access_token = access_token
+        self.access_token_expires = (
+            time.time() + float(expires_in) if expires_in else None)
         self.refresh_token = refresh_token
         # Update the user object
+        user = None
         if update_user and ('identity' in scope or '*' in scope):
-            self.user = self.get_me()
+            user = self.get_me()
+        self.user = user
 
 
 class ModConfigMixin(AuthenticatedReddit):
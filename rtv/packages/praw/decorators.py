@@ -251,12 +251,12 @@ def restrict_access(scope, mod=None, login=None, oauth_only=False,
             subreddit = None
 
         obj = getattr(args[0], 'reddit_session', args[0])
-        # This function sets _use_oauth for one time use only.
-        # Verify that statement is actually true.
-        assert not obj._use_oauth  # pylint: disable=W0212
+        # The OAuth flag only applies to the requests made by this function,
+        # so it's set in a new request context that's dropped afterwards.
+        use_oauth = False
 
         if scope and obj.has_scope(scope):
-            obj._use_oauth = not generator_called  # pylint: disable=W0212
+            use_oauth = not generator_called
         elif oauth_only:
             raise errors.OAuthScopeRequired(function.__name__, scope)
         elif login and obj.is_logged_in():
@@ -273,10 +273,9 @@ def restrict_access(scope, mod=None, login=None, oauth_only=False,
             if scope:
                 raise errors.LoginOrScopeRequired(function.__name__, scope)
             raise errors.LoginRequired(function.__name__)
-        try:
+        # pylint: disable=W0212
+        with obj._request_context(use_oauth=use_oauth):
             return function(*args, **kwargs)
-        finally:
-            obj._use_oauth = False  # pylint: disable=W0212
     return wrap
 
 
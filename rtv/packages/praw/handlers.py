@@ -9,17 +9,86 @@ from functools import wraps
 from .errors import ClientException
 from .helpers import normalize_url
 from requests import Session
-from six import text_type
+from six import reraise, text_type
 from six.moves import cPickle  # pylint: disable=F0401
-from threading import Lock
+from threading import Event, Lock
 from timeit import default_timer as timer
 
 
+class SingleFlight(object):
+    """Coalesce concurrent calls that are made with the same key.
+
+    The first caller for a key runs the function. Callers that arrive with the
+    same key while it's still running wait for it to finish and share its
+    return value, or its exception, instead of running the function again.
+
+    The `requests` and `coalesced` counters track how many calls were made and
+    how many were answered by a call that was already in flight.
+
+    """
+
+    class _Call(object):
+        def __init__(self):
+            self.event = Event()
+            self.result = None
+            self.exc_info = None
+
+    def __init__(self):
+        """Construct an instance of the SingleFlight object."""
+        self._lock = Lock()
+        self._calls = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self):
+        """Return the number of keys that are currently being fetched."""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """Return a dict with the current value of the counters."""
+        with self._lock:
+            return {'requests': self.requests, 'coalesced': self.coalesced,
+                    'in_flight': len(self._calls)}
+
+    def do(self, key, function, *args, **kwargs):
+        """Call function(*args, **kwargs), or wait for the call in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = self._Call()
+                self.requests += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.exc_info is not None:
+                reraise(*call.exc_info)
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException:
+            # Including e.g. KeyboardInterrupt, otherwise the callers that
+            # are waiting would return None as if it was the result
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
 class RateLimitHandler(object):
     """The base handler that provides thread-safe rate limiting enforcement.
 
-    While this handler is threadsafe, PRAW is not thread safe when the same
-    `Reddit` instance is being utilized from multiple threads.
+    The state of each request is kept in a per-thread request context, so the
+    same `Reddit` instance can be used from multiple threads.
 
     """
 
@@ -115,6 +184,7 @@ class DefaultHandler(RateLimitHandler):
     cache = {}
     cache_hit_callback = None
     timeouts = {}
+    single_flight = SingleFlight()
 
     @staticmethod
     def with_cache(function):
@@ -136,27 +206,38 @@ class DefaultHandler(RateLimitHandler):
 
             if _cache_ignore:
                 return function(cls, **kwargs)
-            with cls.ca_lock:
-                clear_timeouts()
-                if _cache_key in cls.cache:
-                    if cls.cache_hit_callback:
-                        cls.cache_hit_callback(_cache_key)
-                    return cls.cache[_cache_key]
-            # Releasing the lock before actually making the request allows for
-            # the possibility of more than one thread making the same request
-            # to get through. Without having domain-specific caching (under the
-            # assumption only one request to a domain can be made at a
-            # time), there isn't a better way to handle this.
-            result = function(cls, **kwargs)
-            # The handlers don't call `raise_for_status` so we need to ignore
-            # status codes that will result in an exception that should not be
-            # cached.
-            if result.status_code not in (200, 302):
-                return result
-            with cls.ca_lock:
-                cls.timeouts[_cache_key] = timer()
-                cls.cache[_cache_key] = result
+            def lookup():
+                with cls.ca_lock:
+                    clear_timeouts()
+                    if _cache_key in cls.cache:
+                        if cls.cache_hit_callback:
+                            cls.cache_hit_callback(_cache_key)
+                        return cls.cache[_cache_key]
+
+            def fetch():
+                # Check again in case the same request finished between the
+                # first lookup and joining the single flight group
+                result = lookup()
+                if result is not None:
+                    return result
+                result = function(cls, **kwargs)
+                # The handlers don't call `raise_for_status` so we need to
+                # ignore status codes that will result in an exception that
+                # should not be cached.
+                if result.status_code not in (200, 302):
+                    return result
+                with cls.ca_lock:
+                    cls.timeouts[_cache_key] = timer()
+                    cls.cache[_cache_key] = result
+                    return result
+
+            result = lookup()
+            if result is not None:
                 return result
+            # The lock is released while the request is being made, so
+            # concurrent requests for the same key wait on the first one and
+            # share its response instead of all going out to the network.
+            return cls.single_flight.do(_cache_key, fetch)
         return wrapped
 
     @classmethod
@@ -19,12 +19,14 @@ The functions in this module are not to be relied upon by third-parties.
 """
 
 from __future__ import print_function, unicode_literals
+import json
 import os
 import re
 import six
 import sys
 from requests import Request, codes, exceptions
 from requests.compat import urljoin
+from six.moves import html_entities
 from .decorators import restrict_access
 from .errors import (ClientException, HTTPException, Forbidden, NotFound,
                      InvalidSubreddit, OAuthException,
@@ -44,6 +46,31 @@ MAX_IMAGE_SIZE = 512000
 JPEG_HEADER = b'\xff\xd8\xff'
 PNG_HEADER = b'\x89\x50\x4e\x47\x0d\x0a\x1a\x0a'
 RE_REDIRECT = re.compile('(rand(om|nsfw))|about/sticky')
+RE_HTML_ENTITY = re.compile('&([^;]+);')
+
+
+class RequestContext(object):
+    """The state that's carried through a single call into the API.
+
+    BaseReddit keeps a stack of these for each thread. A new context is
+    pushed for every request, and for every function that needs to change
+    how its requests are made, so nested calls and calls from other threads
+    never see each other's state.
+
+    """
+
+    __slots__ = ('use_oauth', 'url')
+
+    def __init__(self, use_oauth=False, url=None):
+        """Construct an instance of the RequestContext object.
+
+        :param use_oauth: True when the requests should be made to the OAuth
+            domain with the session's access token.
+        :param url: The url of the response that is being decoded.
+
+        """
+        self.use_oauth = use_oauth
+        self.url = url
 
 
 def _get_redditor_listing(subpath=''):
@@ -106,6 +133,19 @@ def _image_type(image):
     raise ClientException('`image` must be either jpg or png.')
 
 
+def _join_url(base, path):
+    """Equivalent to urljoin(base, path), with a fast path for joining a
+    domain like `https://www.reddit.com` with an absolute path, which is how
+    every submission's permalink is built.
+
+    """
+    origin = base.rstrip('/')
+    if (origin.count('/') == 2 and path[:1] == '/' and path[:2] != '//'
+            and '/.' not in path):
+        return origin + path
+    return urljoin(base, path)
+
+
 def _modify_relationship(relationship, unlink=False, is_sub=False):
     """Return a function for relationship modification.
 
@@ -269,3 +309,120 @@ def _warn_pyopenssl():
             "github.com/praw/pull/625 for more information".format(
                 _opensslversion)
         ))
+
+
+def _decode_html_entities(text):
+    """Replace the named html entities in text with their characters."""
+    def decode(match):
+        try:
+            return six.unichr(html_entities.name2codepoint[match.group(1)])
+        except KeyError:
+            return match.group(0)
+
+    if '&' not in text:
+        return text
+
+    # Reddit only escapes these characters, so use str.replace() to avoid
+    # calling back into python for every match. `&amp;` must go last so that
+    # e.g. `&amp;lt;` is decoded once to `&lt;`, the same as the regex.
+    decoded = text.replace('&lt;', '<').replace('&gt;', '>')
+    decoded = decoded.replace('&quot;', '"')
+    if '&' in decoded.replace('&amp;', ''):
+        return RE_HTML_ENTITY.sub(decode, text)
+    return decoded.replace('&amp;', '&')
+
+
+def _unescape_leaves(value):
+    """Decode the html entities in the strings held by a json list or dict.
+
+    The keys of a dict are decoded as well as its values. Nested dicts are
+    left alone, because the json decoder passes each one to the object hook
+    on its own before its parent. A list at the top of the document is never
+    passed to the hook, so it needs to be given to this function directly.
+
+    """
+    if isinstance(value, list):
+        items = enumerate(value)
+    else:
+        escaped = [key for key in value if '&' in key]
+        for key in escaped:
+            value[_decode_html_entities(key)] = value.pop(key)
+        items = value.items()
+    for key, item in items:
+        if isinstance(item, six.text_type):
+            if '&' in item:
+                value[key] = _decode_html_entities(item)
+        elif isinstance(item, list):
+            _unescape_leaves(item)
+    return value
+
+
+def _json_stdlib(content, object_hook=None):
+    """Decode json with the standard library."""
+    if isinstance(content, six.binary_type):
+        content = content.decode('utf-8')
+    return json.loads(content, object_hook=object_hook)
+
+
+def _json_orjson(content, object_hook=None):
+    """Decode json with orjson, which doesn't support an object_hook.
+
+    The hook is applied afterwards by walking the decoded tree, in the same
+    (innermost first) order that the standard library calls it.
+
+    """
+    import orjson
+
+    data = orjson.loads(content)
+    if object_hook is None:
+        return data
+
+    def walk(value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, (dict, list)):
+                    value[key] = walk(item)
+            return object_hook(value)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, (dict, list)):
+                    value[i] = walk(item)
+        return value
+    return walk(data)
+
+
+def _module_available(name):
+    """Check if a module can be imported, without importing it."""
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return False
+        return True
+    return find_spec(name) is not None
+
+
+# Functions that take the body of a response, as bytes or text, along with an
+# optional object_hook and return the decoded json. Other decoders can be
+# added here and selected with the `json_backend` config option. They import
+# their modules when they're first used.
+JSON_BACKENDS = {'json': _json_stdlib}
+if _module_available('orjson'):
+    JSON_BACKENDS['orjson'] = _json_orjson
+
+
+def _get_json_backend(name=None):
+    """Return the json decoder with the given name, or the standard library.
+
+    orjson parses faster, but PRAW always decodes with an object_hook and
+    walking the tree in python to apply it gives back most of the gain, so it
+    isn't picked by default.
+
+    """
+    try:
+        return JSON_BACKENDS[name or 'json']
+    except KeyError:
+        raise ClientException('Unknown json backend: {0}'.format(name))
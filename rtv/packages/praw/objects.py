@@ -26,6 +26,7 @@ from __future__ import print_function, unicode_literals
 import six
 from six.moves.urllib.parse import (  # pylint: disable=F0401
     parse_qs, urlparse, urlunparse)
+from collections import deque
 from heapq import heappop, heappush
 from json import dumps
 from requests.compat import urljoin
@@ -38,7 +39,7 @@ from . import (AuthenticatedReddit as AR, ModConfigMixin as MCMix,
 from .decorators import (alias_function, limit_chars, restrict_access,
                          deprecated)
 from .errors import ClientException
-from .internal import (_get_redditor_listing, _get_sorter,
+from .internal import (_get_redditor_listing, _get_sorter, _join_url,
                        _modify_relationship)
 
 
@@ -46,9 +47,17 @@ REDDITOR_KEYS = ('approved_by', 'author', 'banned_by', 'redditor',
                  'revision_by')
 
 
+# Attributes that __setattr__ wraps in another object
+DEFERRED_KEYS = frozenset(('subreddit',) + REDDITOR_KEYS)
+
+
 class RedditContentObject(object):
     """Base class that represents actual reddit objects."""
 
+    # Classes that support deferring the conversion of their attributes until
+    # they are first accessed, see _populate()
+    _lazy_populate = False
+
     @classmethod
     def from_api_response(cls, reddit_session, json_dict):
         """Return an instance of the appropriate class from the json_dict."""
@@ -85,6 +94,13 @@ class RedditContentObject(object):
         # __members__, __methods__: Caused by `dir(obj)` in Python 2.
         # __setstate__: Caused by Pickle deserialization.
         blacklist = ('__members__', '__methods__', '__setstate__')
+        raw = self.__dict__.get('_raw')
+        if raw and attr not in blacklist:
+            key = self._get_raw_key(attr)
+            if key in raw:
+                setattr(self, attr, raw[key])
+                if attr in self.__dict__:
+                    return self.__dict__[attr]
         if attr not in blacklist and not self._has_fetched:
             self._has_fetched = self._populate(None, True)
             return getattr(self, attr)
@@ -151,22 +167,28 @@ class RedditContentObject(object):
         #    scope.
         # b) The object is not a WikiPage and the reddit_session has the
         #    `read` scope.
-        prev_use_oauth = self.reddit_session._use_oauth
-
         wiki_page = isinstance(self, WikiPage)
         scope = self.reddit_session.has_scope
 
-        self.reddit_session._use_oauth = wiki_page and scope('wikiread') or \
+        use_oauth = wiki_page and scope('wikiread') or \
             not wiki_page and scope('read')
 
-        try:
+        with self.reddit_session._request_context(use_oauth=bool(use_oauth)):
             params = {'uniq': self._uniq} if self._uniq else {}
             response = self.reddit_session.request_json(
                 self._info_url, params=params, as_objects=False)
-        finally:
-            self.reddit_session._use_oauth = prev_use_oauth
         return response['data']
 
+    def _get_raw_key(self, attr):
+        """Return the json key that the attribute is populated from."""
+        names = self._underscore_names
+        if names:
+            if attr[:1] == '_' and attr[1:] in names:
+                return attr[1:]
+            elif attr in names:
+                return None
+        return attr
+
     def _populate(self, json_dict, fetch):
         if json_dict is None:
             json_dict = self._get_json_dict() if fetch else {}
@@ -180,14 +202,54 @@ class RedditContentObject(object):
         if isinstance(json_dict, list):
             json_dict = {'_tmp': json_dict}
 
-        for name, value in six.iteritems(json_dict):
-            if self._underscore_names and name in self._underscore_names:
-                name = '_' + name
-            setattr(self, name, value)
+        if (self._lazy_populate and self.reddit_session.config.lazy_objects
+                and '_has_fetched' not in self.__dict__):
+            # Keep the json and convert each attribute the first time that
+            # it's accessed. Most of the fields returned by the api are never
+            # looked at, so this saves a lot of work for large listings.
+            self._raw = json_dict
+        else:
+            self._bulk_populate(json_dict)
 
         self._post_populate(fetch)
         return bool(json_dict) or fetch
 
+    def _bulk_populate(self, json_dict):
+        """Copy the attributes from the json dict onto the instance.
+
+        Plain values are written straight into __dict__, skipping the checks
+        in __setattr__. The keys that __setattr__ turns into Redditor and
+        Subreddit objects are set aside in the same way as _populate() does
+        for lazy objects, and are only converted when they're accessed.
+
+        """
+        attrs = self.__dict__
+        raw = attrs.get('_raw')
+        names = self._underscore_names
+        for name, value in six.iteritems(json_dict):
+            if names and name in names:
+                name = '_' + name
+            elif value and name in DEFERRED_KEYS:
+                if raw is None:
+                    raw = attrs['_raw'] = {}
+                raw[name] = value
+                attrs.pop(name, None)
+                continue
+            elif name == 'permalink' and isinstance(self, Comment):
+                # See the note in __setattr__
+                continue
+            attrs[name] = value
+
+    def _materialize(self):
+        """Convert all of the attributes that are still held as raw json."""
+        raw = self.__dict__.pop('_raw', None)
+        if raw:
+            for name, value in six.iteritems(raw):
+                if self._underscore_names and name in self._underscore_names:
+                    name = '_' + name
+                if name not in self.__dict__:
+                    setattr(self, name, value)
+
     def _post_populate(self, fetch):
         """Called after populating the attributes of the instance."""
 
@@ -477,6 +539,8 @@ class Refreshable(RedditContentObject):
                 self.reddit_session._unique_count += 1
                 other = self.reddit_session.get_info(thing_id=self.name,
                                                      params={'uniq': unique})
+                self._materialize()
+                other._materialize()
                 oldkeys = set(self.__dict__.keys())
                 newkeys = set(other.__dict__.keys())
                 keydiff = ", ".join(oldkeys - newkeys)
@@ -638,6 +702,8 @@ class Comment(Editable, Gildable, Inboxable, Moderatable, Refreshable,
               Reportable, Saveable, Voteable):
     """A class that represents a reddit comments."""
 
+    _lazy_populate = True
+
     def __init__(self, reddit_session, json_dict):
         """Construct an instance of the Comment object."""
         super(Comment, self).__init__(reddit_session, json_dict,
@@ -730,6 +796,8 @@ class Comment(Editable, Gildable, Inboxable, Moderatable, Refreshable,
 class Message(Inboxable):
     """A class for private messages."""
 
+    _lazy_populate = True
+
     @staticmethod
     @restrict_access(scope='privatemessages')
     def from_id(reddit_session, message_id, *args, **kwargs):
@@ -803,6 +871,8 @@ class Message(Inboxable):
 class MoreComments(RedditContentObject):
     """A class indicating there are more comments."""
 
+    _lazy_populate = True
+
     def __init__(self, reddit_session, json_dict):
         """Construct an instance of the MoreComment object."""
         super(MoreComments, self).__init__(reddit_session, json_dict)
@@ -1093,24 +1163,30 @@ class Submission(Editable, Gildable, Hideable, Moderatable, Refreshable,
                  Reportable, Saveable, Voteable):
     """A class for submissions to reddit."""
 
+    _lazy_populate = True
+
     _methods = (('select_flair', AR),)
 
     @staticmethod
     def _extract_more_comments(tree):
         """Return a list of MoreComments objects removed from tree."""
         more_comments = []
-        queue = [(None, x) for x in tree]
+        pruned = {}
+        queue = deque((None, x) for x in tree)
         while len(queue) > 0:
-            parent, comm = queue.pop(0)
+            parent, comm = queue.popleft()
             if isinstance(comm, MoreComments):
                 heappush(more_comments, comm)
-                if parent:
-                    parent.replies.remove(comm)
-                else:
-                    tree.remove(comm)
+                replies = parent.replies if parent else tree
+                pruned[id(replies)] = replies
             else:
                 for item in comm.replies:
                     queue.append((comm, item))
+        # Filter each list once instead of calling list.remove() for every
+        # item, which is quadratic for wide trees
+        for replies in pruned.values():
+            replies[:] = [x for x in replies
+                          if not isinstance(x, MoreComments)]
         return more_comments
 
     @staticmethod
@@ -1171,10 +1247,11 @@ class Submission(Editable, Gildable, Hideable, Moderatable, Refreshable,
         """Construct an instance of the Subreddit object."""
         super(Submission, self).__init__(reddit_session, json_dict)
         # pylint: disable=E0203
-        self._api_link = urljoin(reddit_session.config.api_url, self.permalink)
+        self._api_link = _join_url(reddit_session.config.api_url,
+                                   self.permalink)
         # pylint: enable=E0203
-        self.permalink = urljoin(reddit_session.config.permalink_url,
-                                 self.permalink)
+        self.permalink = _join_url(reddit_session.config.permalink_url,
+                                   self.permalink)
         self._comment_sort = None
         self._comments_by_id = {}
         self._comments = None
@@ -5,6 +5,7 @@ import re
 import os
 import sys
 import time
+import curses
 import logging
 from functools import wraps
 
@@ -57,6 +58,13 @@ class Page(object):
         self._row = 0
         self._subwindows = None
 
+        # State used to skip repainting the parts of the screen that haven't
+        # changed, see draw()
+        self._drawn = {}
+        self._layout = None
+        self._damaged_items = None
+        self._suspended = term.suspended
+
     def refresh_content(self, order=None, name=None):
         raise NotImplementedError
 
@@ -81,21 +89,34 @@ class Page(object):
         the methods.
         """
         self.active = True
+        self.invalidate()
+        # The links that were queued by the last page are off the screen now
+        self.term.cancel_prefetch()
 
         # This needs to be called once before the main loop, in case a subpage
         # was pre-selected before the loop started. This happens in __main__.py
         # with ``page.open_submission(url=url)``
         while self.selected_page and self.active:
             self.handle_selected_page()
+            self.invalidate()
 
         while self.active:
             self.draw()
             ch = self.term.stdscr.getch()
             self.controller.trigger(ch)
 
+            # Let the user know if the last action was served from the cache
+            # because the rate limit ran out
+            notice = self.reddit.handler.take_notice()
+            if notice:
+                self.term.show_notification(notice, timeout=2)
+
             while self.selected_page and self.active:
                 self.handle_selected_page()
+                # A nested page may have drawn over the whole screen
+                self.invalidate()
 
+        self.term.cancel_prefetch()
         return self.selected_page
 
     def handle_selected_page(self):
@@ -649,7 +670,14 @@ class Page(object):
 
     def draw(self):
         """
-        Clear the terminal screen and redraw all of the sub-windows
+        Redraw the parts of the screen that have changed since the last draw.
+
+        The header, banner, and footer are only repainted when the values that
+        they display have changed. If the only thing that happened since the
+        last draw was the cursor moving within the visible page, only the
+        subwindows of the previously selected and the newly selected items are
+        repainted and flushed with noutrefresh()/doupdate(). Everything else
+        repaints the content window and refreshes the whole screen.
         """
         n_rows, n_cols = self.term.stdscr.getmaxyx()
         if n_rows < self.term.MIN_HEIGHT or n_cols < self.term.MIN_WIDTH:
@@ -657,20 +685,90 @@ class Page(object):
             # small at startup because self._subwindows will never be populated
             return
 
+        if self._suspended != self.term.suspended:
+            self._suspended = self.term.suspended
+            self.invalidate()
+
+        damaged_items, self._damaged_items = self._damaged_items, None
+        if damaged_items is not None and self._layout == self._get_layout():
+            self._draw_damaged_items(damaged_items)
+            return
+
         self._row = 0
         self._draw_header()
         self._draw_banner()
         self._draw_content()
         self._draw_footer()
+        self._layout = self._get_layout()
         self.term.clear_screen()
         self.term.stdscr.refresh()
 
+    def invalidate(self):
+        """
+        Forget what was drawn on the screen, so the next draw() repaints
+        everything. This is needed when something else has drawn over the
+        page, e.g. a nested page or a program that was run in the terminal.
+        """
+        self._drawn = {}
+        self._layout = None
+        self._damaged_items = None
+
+    def _get_layout(self):
+        """
+        Return the values that determine the position of every subwindow.
+        """
+        n_rows, n_cols = self.term.stdscr.getmaxyx()
+        return (n_rows, n_cols, self.content, self.term.theme,
+                self.nav.page_index, self.nav.inverted,
+                self.nav.top_item_height)
+
+    def _is_damaged(self, region, *inputs):
+        """
+        Return True if a region of the screen needs to be repainted because
+        the values that it displays have changed since it was last drawn.
+        """
+        if self._drawn.get(region) == inputs:
+            return False
+        self._drawn[region] = inputs
+        return True
+
+    def _draw_damaged_items(self, indices):
+        """
+        Repaint the subwindows at the given cursor indices, without touching
+        the rest of the screen.
+        """
+        for index in sorted(indices):
+            if index >= len(self._subwindows):
+                continue
+            win, data, inverted = self._subwindows[index]
+            win.erase()
+            self._draw_subwindow(index, win, data, inverted)
+            win.noutrefresh()
+        curses.doupdate()
+
+    def _draw_subwindow(self, index, win, data, inverted):
+        if self.nav.absolute_index >= 0 and index == self.nav.cursor_index:
+            win.bkgd(str(' '), self.term.attr('Selected'))
+            with self.term.theme.turn_on_selected():
+                self._draw_item(win, data, inverted)
+        else:
+            win.bkgd(str(' '), self.term.attr('Normal'))
+            self._draw_item(win, data, inverted)
+
     def _draw_header(self):
         """
         Draw the title bar at the top of the screen
         """
         n_rows, n_cols = self.term.stdscr.getmaxyx()
 
+        user = self.reddit.user if self.reddit else None
+        if not self._is_damaged(
+                'header', n_cols, self.content.name, self.content.query,
+                getattr(user, 'name', None), self.config['hide_username'],
+                self.config['ascii'], self.term.theme):
+            self._row += 1
+            return
+
         # Note: 2 argument form of derwin breaks PDcurses on Windows 7!
         window = self.term.stdscr.derwin(1, n_cols, self._row, 0)
         window.erase()
@@ -751,6 +849,12 @@ class Page(object):
         Draw the banner with sorting options at the top of the page
         """
         n_rows, n_cols = self.term.stdscr.getmaxyx()
+        if not self._is_damaged(
+                'banner', n_cols, self.BANNER, self.content.query,
+                self.content.order, self.term.theme):
+            self._row += 1
+            return
+
         window = self.term.stdscr.derwin(1, n_cols, self._row, 0)
         window.erase()
         window.bkgd(str(' '), self.term.attr('OrderBar'))
@@ -835,13 +939,7 @@ class Page(object):
         # Now that the windows are setup, we can take a second pass through
         # to draw the text onto each subwindow
         for index, (win, data, inverted) in enumerate(self._subwindows):
-            if self.nav.absolute_index >= 0 and index == self.nav.cursor_index:
-                win.bkgd(str(' '), self.term.attr('Selected'))
-                with self.term.theme.turn_on_selected():
-                    self._draw_item(win, data, inverted)
-            else:
-                win.bkgd(str(' '), self.term.attr('Normal'))
-                self._draw_item(win, data, inverted)
+            self._draw_subwindow(index, win, data, inverted)
 
         self._row += win_n_rows
 
@@ -850,6 +948,11 @@ class Page(object):
         Draw the key binds help bar at the bottom of the screen
         """
         n_rows, n_cols = self.term.stdscr.getmaxyx()
+        if not self._is_damaged(
+                'footer', n_rows, n_cols, self.FOOTER, self.term.theme):
+            self._row += 1
+            return
+
         window = self.term.stdscr.derwin(1, n_cols, self._row, 0)
         window.erase()
         window.bkgd(str(' '), self.term.attr('HelpBar'))
@@ -859,11 +962,46 @@ class Page(object):
         self._row += 1
 
     def _move_cursor(self, direction):
-        # Note: ACS_VLINE doesn't like changing the attribute, so disregard the
-        # redraw flag and opt to always redraw
+        # If the page doesn't need to scroll, only the items that the cursor
+        # moved between need to be repainted. They are erased and redrawn
+        # completely because ACS_VLINE doesn't like changing the attribute.
+        cursor_index = self.nav.cursor_index
         valid, redraw = self.nav.move(direction, len(self._subwindows))
         if not valid:
             self.term.flash()
+        elif redraw:
+            # Force a full redraw, even if the cursor moves again before the
+            # next draw
+            self._damaged_items = None
+            self._layout = None
+        else:
+            if self._damaged_items is None:
+                self._damaged_items = set()
+            self._damaged_items.update((cursor_index, self.nav.cursor_index))
+
+    def _move_cursor_to(self, index):
+        """
+        Select the item at the given index without stepping through the items
+        in between. If the item is already on the screen only the cursor
+        moves, otherwise the page is scrolled so that the item ends up at the
+        same edge of the screen as it would have with _move_cursor().
+        """
+        nav = self.nav
+        offset = index - nav.absolute_index
+        cursor_index = nav.cursor_index + nav.step * offset
+        if 0 <= cursor_index < len(self._subwindows) - 1 and \
+                not (cursor_index == 0 and nav.top_item_height):
+            if self._damaged_items is None:
+                self._damaged_items = set()
+            self._damaged_items.update((nav.cursor_index, cursor_index))
+            nav.cursor_index = cursor_index
+        else:
+            nav.inverted = offset > 0
+            nav.page_index = index
+            nav.cursor_index = 0
+            nav.top_item_height = None
+            self._damaged_items = None
+            self._layout = None
 
     def _move_page(self, direction):
         valid, redraw = self.nav.move_page(direction, len(self._subwindows)-1)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from .packages import praw
+
+
+class Record(object):
+    """
+    A compact container for the data that is displayed for a single item.
+
+    The content classes used to store each item as a dict, which costs a few
+    hundred bytes of hash table per item on top of the values themselves. A
+    record declares its fields with __slots__ instead, so each instance is a
+    flat array of references. Records support the parts of the dict interface
+    that the pages rely on, e.g. data['title'], data.get('url'), 'likes' in
+    data, and '{title}'.format(**data). Fields that have not been assigned a
+    value are treated like missing keys. Keys that aren't declared as fields
+    are stored in a separate dict that is only created when it's needed.
+
+    Each record holds a reference to the PRAW object that it was built from,
+    which is used to vote, reply, etc. PRAW objects keep every attribute that
+    was returned by the api, so for long listings they are the bulk of the
+    memory usage. Records that support it can release the object and keep
+    only its id. A lightweight edit-only object is rebuilt from the id when
+    data['object'] is accessed again, without making an http request.
+    """
+
+    __slots__ = ('_object', '_fullname', '_reddit', '_archived', '_extra')
+
+    _fields = ()
+    _keys = frozenset()
+    _releasable = False
+
+    def __init__(self, obj=None, **fields):
+        self._object = obj
+        self._fullname = None
+        self._reddit = None
+        self._archived = False
+        self._extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def __repr__(self):
+        return '<{0} {1!r}>'.format(type(self).__name__, dict(self.items()))
+
+    def __getitem__(self, key):
+        if key in self._keys:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._keys:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key):
+        if key == 'object':
+            return self._object is not None or self._fullname is not None
+        elif key in self._keys:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        keys = [key for key in ('object',) + self._fields if key in self]
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    @property
+    def object(self):
+        if self._object is None and self._fullname is not None:
+            return self._rehydrate()
+        return self._object
+
+    @object.setter
+    def object(self, obj):
+        self._object = obj
+        self._fullname = None
+        self._reddit = None
+
+    def release_object(self):
+        """
+        Drop the reference to the PRAW object. This is a no-op for records
+        that can't rebuild their object.
+        """
+        obj = self._object
+        if self._releasable and obj is not None:
+            self._fullname = obj.fullname
+            self._reddit = obj.reddit_session
+            self._archived = bool(getattr(obj, 'archived', False))
+            self._object = None
+
+    def _rehydrate(self):
+        raise NotImplementedError
+
+
+class SubmissionRecord(Record):
+
+    _fields = (
+        'type', 'title', 'text', 'html', 'created', 'created_long',
+        'comments', 'score', 'author', 'permalink', 'subreddit', 'flair',
+        'url_full', 'url', 'url_type', 'likes', 'gold', 'nsfw', 'stickied',
+        'hidden', 'xpost_subreddit', 'index', 'saved', 'edited',
+        'edited_long', 'split_title', 'split_text', 'n_rows', 'h_offset')
+    _keys = frozenset(_fields + ('object',))
+    __slots__ = _fields
+
+    _releasable = True
+
+    def _rehydrate(self):
+        submission_id = self._fullname.split('_', 1)[1]
+        submission = praw.objects.Submission.from_id(
+            self._reddit, submission_id)
+        submission.archived = self._archived
+        return submission
+
+
+class CommentRecord(Record):
+
+    _fields = (
+        'type', 'level', 'body', 'html', 'created', 'score', 'author',
+        'is_author', 'flair', 'likes', 'gold', 'permalink', 'stickied',
+        'hidden', 'saved', 'edited', 'split_body', 'n_rows', 'h_offset')
+    _keys = frozenset(_fields + ('object',))
+    __slots__ = _fields
+
+
+class MoreCommentsRecord(Record):
+
+    _fields = ('type', 'level', 'count', 'body', 'hidden', 'n_rows',
+               'h_offset')
+    _keys = frozenset(_fields + ('object',))
+    __slots__ = _fields
+
+
+class SavedCommentRecord(Record):
+
+    _fields = (
+        'type', 'level', 'title', 'comments', 'url_full', 'url', 'permalink',
+        'nsfw', 'subreddit', 'url_type', 'score', 'likes', 'created', 'saved',
+        'stickied', 'gold', 'author', 'flair', 'hidden', 'edited', 'index',
+        'split_title', 'n_rows', 'h_offset')
+    _keys = frozenset(_fields + ('object',))
+    __slots__ = _fields
+
+    _releasable = True
+
+    def _rehydrate(self):
+        comment_id = self._fullname.split('_', 1)[1]
+        pseudo_data = {'id': comment_id, 'archived': self._archived,
+                       'replies': ''}
+        return praw.objects.Comment(self._reddit, pseudo_data)
+
+
+class SubscriptionRecord(Record):
+
+    _fields = ('type', 'name', 'title', 'split_title', 'n_rows', 'h_offset')
+    _keys = frozenset(_fields + ('object',))
+    __slots__ = _fields
+
+
+class MessageRecord(Record):
+
+    _fields = (
+        'type', 'level', 'id', 'subject', 'body', 'html', 'created',
+        'created_long', 'recipient', 'distinguished', 'author', 'is_new',
+        'was_comment', 'permalink', 'submission_permalink', 'subreddit_name',
+        'link_title', 'context', 'split_body', 'n_rows', 'h_offset')
+    _keys = frozenset(_fields + ('object',))
+    __slots__ = _fields
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+import six
+from six.moves.urllib.parse import urlparse
+from requests import RequestException
+
+from .content import SubredditContent
+from .packages.praw.errors import ClientException
+
+_logger = logging.getLogger(__name__)
+
+
+class StartupTrace(object):
+    """
+    Records how long each phase of startup takes.
+
+    Phases can be timed from any thread, which makes it possible to see
+    which of the background tasks overlapped with the work done on the main
+    thread. All times are measured from when the trace was created.
+
+    >>> trace = StartupTrace()
+    >>> with trace.phase('login'):
+    >>>     oauth.authorize(autologin=True)
+    >>> print(trace.format())
+    """
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._start = clock()
+        self._lock = threading.Lock()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            end = self._clock()
+            thread = threading.current_thread().name
+            with self._lock:
+                self.phases.append(
+                    (name, start - self._start, end - start, thread))
+
+    def format(self):
+        """
+        Return the recorded phases as a table, ordered by their start time.
+        """
+        lines = ['{0:<20} {1:>10} {2:>10}  {3}'.format(
+            'phase', 'start (ms)', 'time (ms)', 'thread')]
+        with self._lock:
+            phases = sorted(self.phases, key=lambda phase: phase[1])
+        for name, start, duration, thread in phases:
+            lines.append('{0:<20} {1:>10.1f} {2:>10.1f}  {3}'.format(
+                name, start * 1000, duration * 1000, thread))
+        return '\n'.join(lines)
+
+
+class Task(object):
+    """
+    Run a function on a background thread during startup.
+
+    The result of the function, or the exception that it raised, is held
+    until it's collected with `result()` on the main thread. Tasks can depend
+    on other tasks, in which case the function is called as soon as all of
+    them have finished, or not at all if any of them failed. If a trace is
+    given, the time taken by the function is recorded under the task's name.
+
+    >>> login = Task('login', reddit.refresh_access_information, (token,))
+    >>> listing = Task('first listing', prefetch_listing, (reddit, name),
+    >>>                after=[login])
+    >>> login.start(), listing.start()
+    >>> login.result()
+    """
+
+    def __init__(self, name, function, args=(), after=(), trace=None):
+        self.name = name
+        self._function = function
+        self._args = args
+        self._after = list(after)
+        self._trace = trace
+        self._result = None
+        self._exc_info = None
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def done(self):
+        return self._finished.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the task to finish and return the value returned by the
+        function. Exceptions raised by the function are re-raised here.
+        """
+        if not self._finished.wait(timeout):
+            raise RuntimeError('Task `{0}` did not finish'.format(self.name))
+        if self._exc_info:
+            six.reraise(*self._exc_info)
+        return self._result
+
+    def _run(self):
+        try:
+            for task in self._after:
+                task.result()
+            if self._trace:
+                with self._trace.phase(self.name):
+                    self._result = self._function(*self._args)
+            else:
+                self._result = self._function(*self._args)
+        except Exception:
+            self._exc_info = sys.exc_info()
+        finally:
+            self._finished.set()
+
+
+class _QuietLoader(object):
+    """
+    Stands in for the terminal loader when content is loaded off of the main
+    thread, where there is nothing to draw on. Exceptions are not caught.
+    """
+
+    exception = None
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+def warm_connection(session, url, headers=None, timeout=10):
+    """
+    Open a keep-alive connection to the host of the given url, so that the
+    DNS lookup and the TLS handshake are already done by the time that the
+    first real request is sent to it. Failures are logged and ignored.
+    """
+    try:
+        session.head(
+            url, headers=headers, allow_redirects=False, timeout=timeout)
+    except RequestException as e:
+        _logger.warning('Unable to connect to %s: %s', url, e)
+        return False
+    return True
+
+
+def is_short_link(url, short_domain):
+    """
+    Check if the url uses reddit's link shortener, e.g. https://redd.it/8s4kd2
+    """
+    if not short_domain:
+        return False
+    host = urlparse(url).netloc.lower()
+    short_host = urlparse(short_domain).netloc.lower()
+    return host in (short_host, 'www.' + short_host)
+
+
+def expand_link(reddit, url):
+    """
+    Resolve short links to the full submission url, which is the only form
+    that PRAW will accept. Any other url is returned unchanged.
+    """
+    try:
+        short_domain = reddit.config.short_domain
+    except ClientException:
+        # The reddit server doesn't have a link shortener
+        short_domain = None
+
+    if not is_short_link(url, short_domain):
+        return url
+
+    # Add the reddit headers to avoid a 429 response from reddit.com. The
+    # handler's session is used so the connection to reddit.com that the
+    # link redirects to can be shared with the api requests.
+    response = reddit.handler.http.head(
+        url, headers=reddit.http.headers, allow_redirects=True,
+        timeout=reddit.config.timeout)
+    return response.url
+
+
+def prefetch_listing(reddit, name):
+    """
+    Send the request for the first page of a subreddit listing. The response
+    is discarded, but it's kept in the request cache so it can be picked up
+    by the page when it loads the same listing on the main thread. Errors are
+    left for the page to report.
+    """
+    try:
+        SubredditContent.from_name(reddit, name, _QuietLoader())
+    except Exception as e:
+        _logger.info('Unable to prefetch %s: %r', name, e)
+        return False
+    return True
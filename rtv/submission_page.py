@@ -110,6 +110,13 @@ class SubmissionPage(Page):
                 self.nav.flip(len(self._subwindows) - 1)
                 self.nav.top_item_height = n_rows
 
+    @SubmissionController.register(Command('SUBMISSION_EXPAND_ALL'))
+    def expand_all_comments(self):
+        """
+        Load all of the collapsed "more comments" in the submission
+        """
+        self.content.expand_all()
+
     @SubmissionController.register(Command('SUBMISSION_EXIT'))
     def exit_submission(self):
         """
@@ -197,11 +204,10 @@ class SubmissionPage(Page):
         """
         cursor = self.nav.absolute_index
         if cursor > 0:
-            level = max(self.content.get(cursor)['level'], 1)
-            while self.content.get(cursor - 1)['level'] >= level:
-                self._move_cursor(-1)
-                cursor -= 1
-            self._move_cursor(-1)
+            parent = self.content.get_parent(cursor)
+            if parent < 0:
+                parent = self.content.get_root(cursor - 1)
+            self._move_cursor_to(parent)
         else:
             self.term.flash()
 
@@ -214,22 +220,14 @@ class SubmissionPage(Page):
         comment and shares the same parent.
         """
         cursor = self.nav.absolute_index
+        sibling = None
         if cursor >= 0:
-            level = self.content.get(cursor)['level']
-            try:
-                move = 1
-                while self.content.get(cursor + move)['level'] > level:
-                    move += 1
-            except IndexError:
-                self.term.flash()
-            else:
-                if self.content.get(cursor + move)['level'] == level:
-                    for _ in range(move):
-                        self._move_cursor(1)
-                else:
-                    self.term.flash()
-        else:
+            sibling = self.content.get_next_sibling(cursor)
+
+        if sibling is None:
             self.term.flash()
+        else:
+            self._move_cursor_to(sibling)
 
         self.clear_input_queue()
 
@@ -338,6 +336,9 @@ class SubmissionPage(Page):
 
     def _draw_submission(self, win, data):
 
+        if data['url_type'] == 'external':
+            self.term.prefetch_link(data['url_full'])
+
         n_rows, n_cols = win.getmaxyx()
         n_cols -= 3  # one for each side of the border + one for offset
 
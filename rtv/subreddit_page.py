@@ -28,7 +28,10 @@ class SubredditPage(Page):
         super(SubredditPage, self).__init__(reddit, term, config, oauth)
 
         self.controller = SubredditController(self, keymap=config.keymap)
-        self.content = SubredditContent.from_name(reddit, name, term.loader)
+        self.content = SubredditContent.from_name(
+            reddit, name, term.loader,
+            prefetch_items=config['prefetch_items'],
+            keep_objects=not config['low_memory'])
         self.nav = Navigator(self.content.get)
         self.toggled_subreddit = None
 
@@ -66,9 +69,12 @@ class SubredditPage(Page):
         if order == 'ignore':
             order = None
 
+        self.term.cancel_prefetch()
         with self.term.loader('Refreshing page'):
             self.content = SubredditContent.from_name(
-                self.reddit, name, self.term.loader, order=order, query=query)
+                self.reddit, name, self.term.loader, order=order, query=query,
+                prefetch_items=self.config['prefetch_items'],
+                keep_objects=not self.config['low_memory'])
         if not self.term.loader.exception:
             self.nav = Navigator(self.content.get)
 
@@ -133,7 +139,9 @@ class SubredditPage(Page):
 
         with self.term.loader('Searching'):
             self.content = SubredditContent.from_name(
-                self.reddit, name, self.term.loader, query=query)
+                self.reddit, name, self.term.loader, query=query,
+                prefetch_items=self.config['prefetch_items'],
+                keep_objects=not self.config['low_memory'])
         if not self.term.loader.exception:
             self.nav = Navigator(self.content.get)
 
@@ -243,6 +251,9 @@ class SubredditPage(Page):
         valid_rows = range(0, n_rows)
         offset = 0 if not inverted else -(data['n_rows'] - n_rows)
 
+        if data['url_type'] == 'external':
+            self.term.prefetch_link(data['url_full'])
+
         n_title = len(data['split_title'])
         if data['url_full'] in self.config.history:
             attr = self.term.attr('SubmissionTitleSeen')
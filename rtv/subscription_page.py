@@ -22,7 +22,8 @@ class SubscriptionPage(Page):
 
         self.controller = SubscriptionController(self, keymap=config.keymap)
         self.content = SubscriptionContent.from_user(
-            reddit, term.loader, content_type)
+            reddit, term.loader, content_type,
+            prefetch_items=config['prefetch_items'])
         self.nav = Navigator(self.content.get)
         self.content_type = content_type
 
@@ -44,7 +45,8 @@ class SubscriptionPage(Page):
 
         with self.term.loader():
             self.content = SubscriptionContent.from_user(
-                self.reddit, self.term.loader, self.content_type)
+                self.reddit, self.term.loader, self.content_type,
+                prefetch_items=self.config['prefetch_items'])
         if not self.term.loader.exception:
             self.nav = Navigator(self.content.get)
 
@@ -23,15 +23,12 @@ from kitchen.text.display import textual_width_chop
 
 from . import exceptions, mime_parsers, content
 from .docs import TOKEN
+from .cache import LRUCache
+from .config import MIME_CACHE, MAILCAP_CACHE, PARSERS
+from .mailcap_index import MailcapIndex
 from .theme import Theme, ThemeList
 from .objects import LoadScreen
 
-try:
-    # Fix only needed for versions prior to python 3.6
-    from mailcap_fix import mailcap
-except ImportError:
-    import mailcap
-
 try:
     # Added in python 3.4+
     from html import unescape
@@ -53,7 +50,14 @@ class Terminal(object):
     RETURN = 10
     SPACE = 32
 
-    def __init__(self, stdscr, config):
+    def __init__(self, stdscr, config, session=None):
+        """
+        Params:
+            stdscr: The curses window that the terminal draws to.
+            config (Config): The user's settings.
+            session: The http session used by the MIME parsers. If None, a
+                session is only created if one hasn't been set already.
+        """
 
         self.stdscr = stdscr
         self.config = config
@@ -62,12 +66,34 @@ class Terminal(object):
         self.theme_list = ThemeList()
 
         self._display = None
-        self._mailcap_dict = mailcap.getcaps()
+        self._clean_cache = LRUCache(max_entries=2048)
+        # Number of times that curses was suspended for another program
+        self.suspended = 0
         self._term = os.environ.get('TERM')
 
         # This is a hack, the MIME parsers should be stateless
         # but we need to load the imgur credentials from the config
         mime_parsers.ImgurApiMIMEParser.CLIENT_ID = config['imgur_client_id']
+        if session is not None:
+            mime_parsers.set_session(session)
+        else:
+            mime_parsers.set_session(
+                mime_parsers.HTTPSession(
+                    user_agent=config['media_user_agent']),
+                replace=False)
+
+        if config['persistent_cache']:
+            mime_cache_file, mailcap_cache_file = MIME_CACHE, MAILCAP_CACHE
+        else:
+            mime_cache_file, mailcap_cache_file = None, None
+        self._mailcap = MailcapIndex(mailcap_cache_file)
+        self._mime_registry = mime_parsers.ParserRegistry(
+            mime_parsers.parsers, plugin_dir=PARSERS)
+        self._mime_cache = mime_parsers.MIMECache(
+            mime_cache_file, self._mime_registry)
+        self._mime_resolver = mime_parsers.MIMEResolver(
+            self._mime_cache, self._mime_registry,
+            max_workers=config['media_prefetch'] or 0)
 
     @property
     def up_arrow(self):
@@ -159,9 +185,8 @@ class Terminal(object):
         """
         return self.stdscr.getch()
 
-    @staticmethod
     @contextmanager
-    def suspend():
+    def suspend(self):
         """
         Suspend curses in order to open another subprocess in the terminal.
         """
@@ -170,6 +195,9 @@ class Terminal(object):
             curses.endwin()
             yield
         finally:
+            # The program could have changed anything on the screen,
+            # including the window title, so the page needs a full repaint
+            self.suspended += 1
             curses.doupdate()
 
     @contextmanager
@@ -229,11 +257,25 @@ class Terminal(object):
             &amp;amp; -> returned directly from reddit's api
             &amp;     -> returned after PRAW decodes the html characters
             &         -> returned after our second pass, this is the true value
+
+        Most of the strings on the screen are drawn again on every frame, so
+        the results are memoized by (string, n_cols, ascii). The type of the
+        string is part of the key because on python 2 a byte string and a
+        unicode string can compare equal, but they are cleaned differently.
         """
 
         if n_cols is not None and n_cols <= 0:
             return ''
 
+        key = (type(string), string, n_cols, self.config['ascii'])
+        cleaned = self._clean_cache.get(key)
+        if cleaned is None:
+            cleaned = self._clean(string, n_cols)
+            self._clean_cache[key] = cleaned
+        return cleaned
+
+    def _clean(self, string, n_cols):
+
         if isinstance(string, six.text_type):
             string = unescape(string)
 
@@ -422,6 +464,21 @@ class Terminal(object):
             text += '[{}] [{}]({})\n'.format(i, capped_link_text, link['href'])
         return text
 
+    def prefetch_link(self, url):
+        """
+        Start looking up the media type of a link in the background, so that
+        it can be opened without waiting if the user selects it.
+        """
+        if self.config['enable_media']:
+            self._mime_resolver.prefetch(url)
+
+    def cancel_prefetch(self):
+        """
+        Forget about the links that are waiting to be looked up, e.g. because
+        they are no longer on the screen.
+        """
+        self._mime_resolver.cancel()
+
     def open_link(self, url):
         """
         Open a media link using the definitions from the user's mailcap file.
@@ -520,38 +577,43 @@ class Terminal(object):
                 in a subprocess to open the resource.
             entry (dict): The full mailcap entry for the corresponding command
         """
-
-        for parser in mime_parsers.parsers:
-            if parser.pattern.match(url):
-                # modified_url may be the same as the original url, but it
-                # could also be updated to point to a different page, or it
-                # could refer to the location of a temporary file with the
-                # page's downloaded content.
-                try:
-                    modified_url, content_type = parser.get_mimetype(url)
-                except Exception as e:
-                    # If Imgur decides to change its html layout, let it fail
-                    # silently in the background instead of crashing.
-                    _logger.warning('parser %s raised an exception', parser)
-                    _logger.exception(e)
-                    raise exceptions.MailcapEntryNotFound()
-                if not content_type:
-                    _logger.info('Content type could not be determined')
-                    raise exceptions.MailcapEntryNotFound()
-                elif content_type == 'text/html':
-                    _logger.info('Content type text/html, deferring to browser')
-                    raise exceptions.MailcapEntryNotFound()
-
-                command, entry = mailcap.findmatch(
-                    self._mailcap_dict, content_type, filename=modified_url)
-                if not entry:
-                    _logger.info('Could not find a valid mailcap entry')
-                    raise exceptions.MailcapEntryNotFound()
-
-                return command, entry
-
-        # No parsers matched the url
-        raise exceptions.MailcapEntryNotFound()
+        # Don't request the page again if it's already being looked up
+        self._mime_resolver.wait(url)
+
+        parser = self._mime_registry.find(url)
+        if parser is None:
+            # No parsers matched the url
+            raise exceptions.MailcapEntryNotFound()
+
+        # modified_url may be the same as the original url, but it
+        # could also be updated to point to a different page, or it
+        # could refer to the location of a temporary file with the
+        # page's downloaded content.
+        try:
+            modified_url, content_type = \
+                self._mime_cache.get_mimetype(parser, url)
+        except exceptions.MIMEParserError as e:
+            _logger.info('Skipping parser %s, %s', parser, e)
+            raise exceptions.MailcapEntryNotFound()
+        except Exception as e:
+            # If Imgur decides to change its html layout, let it fail
+            # silently in the background instead of crashing.
+            _logger.warning('parser %s raised an exception', parser)
+            _logger.exception(e)
+            raise exceptions.MailcapEntryNotFound()
+        if not content_type:
+            _logger.info('Content type could not be determined')
+            raise exceptions.MailcapEntryNotFound()
+        elif content_type == 'text/html':
+            _logger.info('Content type text/html, deferring to browser')
+            raise exceptions.MailcapEntryNotFound()
+
+        command, entry = self._mailcap.findmatch(content_type, modified_url)
+        if not entry:
+            _logger.info('Could not find a valid mailcap entry')
+            raise exceptions.MailcapEntryNotFound()
+
+        return command, entry
 
     def open_browser(self, url):
         """
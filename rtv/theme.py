@@ -157,6 +157,7 @@ class Theme(object):
 
         self._color_pair_map = None
         self._attribute_map = None
+        self._selected_attribute_map = None
         self._selected = None
 
         self.required_color_pairs = 0
@@ -251,6 +252,15 @@ class Theme(object):
 
             self._attribute_map[element] = attrs
 
+        # Look up table for the "Selected" version of each element, so get()
+        # doesn't need to build the '@' prefixed name every time it's called
+        self._selected_attribute_map = {}
+        for element in self._attribute_map:
+            selected = '@{0}'.format(element)
+            if selected in self._attribute_map:
+                self._selected_attribute_map[element] = \
+                    self._attribute_map[selected]
+
     def get(self, element, selected=False):
         """
         Returns the curses attribute code for the given element.
@@ -260,7 +270,7 @@ class Theme(object):
                                'calling initialize_curses_theme()')
 
         if selected or self._selected:
-            element = '@{0}'.format(element)
+            return self._selected_attribute_map[element]
 
         return self._attribute_map[element]
 
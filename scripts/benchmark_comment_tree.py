@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark for navigating and collapsing large comment threads.
+
+Builds a synthetic thread and compares walking the comment levels one row at
+a time, which is how the parent and sibling jumps used to work, against the
+tree index in SubmissionContent. Both methods are checked to find the same
+rows before they are timed. Hiding and unpacking comments is timed at the
+top, the middle, and the bottom of the thread, along with the walk over the
+hidden rows that hiding a comment used to need.
+
+    $ python scripts/benchmark_comment_tree.py [size] [repeat]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import random
+import timeit
+
+from rtv.content import SubmissionContent
+from rtv.packages.praw.objects import Comment
+
+SIZE = 50000
+
+
+def build_comment(level):
+    # Skip the RedditContentObject constructor, which expects a live session
+    comment = Comment.__new__(Comment)
+    comment.__dict__.update(nested_level=level)
+    return comment
+
+
+def build_content(size, seed=0):
+    """
+    Build a thread in tree order where about one in a hundred comments is top
+    level, and the rest are either a reply to the comment above, a sibling of
+    it, or a sibling of one of its ancestors.
+    """
+    rand = random.Random(seed)
+    level, comments = 0, []
+    for _ in range(size):
+        comments.append(build_comment(level))
+        if rand.random() < 0.01:
+            level = 0
+        else:
+            level = max(min(level + rand.choice((1, 0, -1, -2)), 10), 1)
+
+    # Skip the constructor, which expects a live submission
+    content = SubmissionContent.__new__(SubmissionContent)
+    content.indent_size = 2
+    content.max_indent_level = 8
+    content._max_comment_cols = 120
+    content._comment_data = comments
+    content._reindex()
+    return content
+
+
+def linear_parent(content, index):
+    level = max(content.get_level(index), 1)
+    while content.get_level(index - 1) >= level:
+        index -= 1
+    return index - 1
+
+
+def linear_sibling(content, index):
+    level = content.get_level(index)
+    move = 1
+    try:
+        while content.get_level(index + move) > level:
+            move += 1
+        if content.get_level(index + move) == level:
+            return index + move
+    except IndexError:
+        pass
+    return None
+
+
+def linear_subtree(content, index):
+    # The rows that hiding a comment used to pack, one level check at a time
+    level = content.get_level(index)
+    end = index + 1
+    while end <= content.range[1] and content.get_level(end) > level:
+        end += 1
+    return content._comment_data[index:end]
+
+
+def indexed_parent(content, index):
+    parent = content.get_parent(index)
+    if parent < 0:
+        parent = content.get_root(index - 1)
+    return parent
+
+
+def run(name, func, count, repeat):
+    times = timeit.repeat(func, number=1, repeat=repeat)
+    best = min(times)
+    print('{0:<20} {1:>7} calls {2:>9.2f} ms {3:>8.2f} us/call'.format(
+        name, count, best * 1000, best * 1e6 / count))
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else SIZE
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    content = build_content(size)
+    rows = list(range(1, size))
+    for i in rows[::97]:
+        assert linear_parent(content, i) == indexed_parent(content, i), i
+        assert linear_sibling(content, i) == content.get_next_sibling(i), i
+
+    # Start from the top level comments, where the walks are the longest
+    top_level = [i for i in rows if content.get_level(i) == 0]
+    print('{0} comments, {1} top level'.format(size, len(top_level)))
+    roots = top_level[:1000]
+    run('linear sibling', lambda: [linear_sibling(content, i) for i in roots],
+        len(roots), repeat)
+    run('indexed sibling', lambda: [content.get_next_sibling(i)
+                                    for i in roots], len(roots), repeat)
+
+    # And from the last reply in each thread
+    leaves = [i - 1 for i in roots if i > 1]
+    run('linear parent', lambda: [linear_parent(content, i) for i in leaves],
+        len(leaves), repeat)
+    run('indexed parent', lambda: [indexed_parent(content, i)
+                                   for i in leaves], len(leaves), repeat)
+
+    positions = [('top', top_level[0]),
+                 ('middle', top_level[len(top_level) // 2]),
+                 ('bottom', top_level[-1])]
+    for name, index in positions:
+        # Only the comment that's hidden needs to be stripped
+        content._comment_data[index] = {
+            'type': 'Comment', 'level': 0, 'body': 'Hidden comment'}
+
+        def toggle():
+            content.toggle(index)
+            content.toggle(index)
+        run('linear walk ' + name, lambda: linear_subtree(content, index), 1,
+            repeat)
+        run('hide + unpack ' + name, toggle, 2, repeat)
+
+    assert content._build_index(content._comment_data) == (
+        content._offsets, content._sizes, content._counts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark for flattening large comment trees.
+
+Builds synthetic comment forests and times Content.flatten_comments() and
+PRAW's Submission._extract_more_comments(). Both should scale linearly, so the
+time per comment should stay roughly constant as the tree grows.
+
+    $ python scripts/benchmark_comments.py
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import random
+import timeit
+
+from rtv.content import Content
+from rtv.packages.praw.objects import MoreComments, Submission
+
+SIZES = (10000, 50000)
+
+
+class FakeComment(object):
+
+    def __init__(self, id, parent_id):
+        self.id = id
+        self.parent_id = parent_id
+        self.replies = []
+
+
+def build_more_comments(id, parent_id):
+    # Skip the RedditContentObject constructor, which expects a live session
+    more = MoreComments.__new__(MoreComments)
+    more.__dict__.update(id=id, parent_id=parent_id, count=1, replies=[])
+    return more
+
+
+def build_tree(size, seed=0):
+    """
+    Build a wide forest of comments, where half of the items are top level
+    and the rest reply to a random recent comment. Roughly one in twenty items
+    is a MoreComments placeholder.
+    """
+    rand = random.Random(seed)
+    roots, comments = [], []
+    for i in range(size):
+        parent = None
+        if comments and rand.random() < 0.5:
+            parent = comments[-rand.randint(1, min(len(comments), 50))]
+
+        parent_id = 't1_{0}'.format(parent.id) if parent else 't3_root'
+        if rand.random() < 0.05:
+            item = build_more_comments('m{0}'.format(i), parent_id)
+        else:
+            item = FakeComment('c{0}'.format(i), parent_id)
+            comments.append(item)
+
+        (parent.replies if parent else roots).append(item)
+    return roots
+
+
+def run(name, func, size, repeat):
+    times = timeit.repeat(func, number=1, repeat=repeat)
+    best = min(times)
+    print('{0:<24} {1:>7} comments {2:>9.1f} ms {3:>7.2f} us/comment'.format(
+        name, size, best * 1000, best * 1e6 / size))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    for size in SIZES:
+        tree = build_tree(size)
+        run('flatten_comments', lambda: Content.flatten_comments(tree),
+            size, repeat)
+
+    for size in SIZES:
+        # The tree is modified in place, so it needs to be rebuilt every time
+        trees = [build_tree(size) for _ in range(repeat)]
+        run('_extract_more_comments',
+            lambda: Submission._extract_more_comments(trees.pop()),
+            size, repeat)
+
+
+if __name__ == '__main__':
+    main()
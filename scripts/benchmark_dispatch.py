@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark for selecting the MIME parser for a link.
+
+Compares trying every parser's pattern in order against the domain index in
+ParserRegistry, over a corpus of links in the style that show up on the
+front page of reddit. Both methods are checked to pick the same parser for
+every link before they are timed.
+
+    $ python scripts/benchmark_dispatch.py [repeat]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import timeit
+
+from rtv.mime_parsers import parsers, ParserRegistry
+
+CORPUS = [
+    'https://i.redd.it/8r4qk2xvlv011.jpg',
+    'https://i.redd.it/x1fe4qtqzr011.png',
+    'https://v.redd.it/k8w3p4a1ls011',
+    'https://i.imgur.com/9NDumvP.jpg',
+    'https://i.imgur.com/Jv0G5NS.gifv',
+    'https://imgur.com/gallery/yjP1v4B',
+    'https://imgur.com/a/pRYEi',
+    'http://imgur.com/yW0kbMi',
+    'https://gfycat.com/DeliciousUnfortunateAdouri',
+    'https://gfycat.com/gifs/detail/UntidyAcidicIberianemeraldlizard',
+    'https://www.youtube.com/watch?v=FjNdYp2gXRY',
+    'https://youtu.be/dQw4w9WgXcQ',
+    'https://m.youtube.com/watch?v=9bZkp7q19f0',
+    'https://vimeo.com/76979871',
+    'https://streamable.com/vkc0y',
+    'https://www.instagram.com/p/BIxQ0vrBN2Y/?taken-by=kimchi_chic',
+    'https://www.flickr.com/photos/obamawhitehouse/8191317327/',
+    'https://giphy.com/gifs/cat-funny-JIX9t2j0ZTN9S',
+    'https://imgflip.com/i/21s1ga',
+    'https://www.liveleak.com/view?i=08b_1494604433',
+    'https://streamja.com/qLaQ',
+    'https://www.clippituser.tv/c/dljbzo',
+    'https://www.nytimes.com/2018/06/01/us/politics/trade-tariffs.html',
+    'https://www.theguardian.com/world/2018/jun/01/spain-pm-rajoy-ousted',
+    'https://www.bbc.com/news/world-us-canada-44329876',
+    'https://www.washingtonpost.com/news/politics/wp/2018/06/01/',
+    'https://arstechnica.com/science/2018/06/nasa-curiosity-organics/',
+    'https://github.com/michael-lazar/rtv',
+    'https://en.wikipedia.org/wiki/Reddit',
+    'https://twitter.com/reddit/status/1002612386046984192',
+    'https://www.reddit.com/r/python/comments/8nq7jp/',
+    'https://www.example.com/files/report.pdf',
+    'https://www.example.com/audio/episode-12.mp3',
+    'https://medium.com/@someone/an-article-about-python-9a8b7c6d5e4f',
+    'https://www.theverge.com/2018/6/1/17417612/microsoft-github-deal',
+    'https://news.ycombinator.com/item?id=17207765',
+]
+
+
+def linear(url):
+    for parser in parsers:
+        if parser.pattern.match(url):
+            return parser
+
+
+def run(name, func, count, repeat):
+    def dispatch():
+        for url in CORPUS:
+            func(url)
+
+    times = timeit.repeat(dispatch, number=count, repeat=repeat)
+    best = min(times)
+    total = count * len(CORPUS)
+    print('{0:<16} {1:>8} links {2:>9.1f} ms {3:>7.2f} us/link'.format(
+        name, total, best * 1000, best * 1e6 / total))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    registry = ParserRegistry(parsers)
+
+    for url in CORPUS:
+        assert registry.find(url) is linear(url), url
+
+    run('linear', linear, 1000, repeat)
+    run('registry', registry.find, 1000, repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark for drawing submissions on the subreddit page.
+
+Times SubredditPage._draw_item() on a fake curses window, which mimics a page
+being redrawn after every keypress. The first run has the Terminal.clean()
+render cache disabled, and the second run uses the default cache.
+
+    $ python scripts/benchmark_draw.py [frames]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import timeit
+
+from rtv.cache import LRUCache
+from rtv.config import Config
+from rtv.content import Content
+from rtv.records import SubmissionRecord
+from rtv.subreddit_page import SubredditPage
+from rtv.terminal import Terminal
+from rtv.theme import Theme
+
+ITEMS = 20
+FRAMES = 500
+
+
+class FakeWindow(object):
+    """
+    Implements the parts of a curses window that are used to draw an item,
+    without writing anything to the screen.
+    """
+
+    def __init__(self, n_rows, n_cols):
+        self.n_rows, self.n_cols = n_rows, n_cols
+        self.y, self.x = 0, 0
+
+    def getyx(self):
+        return self.y, self.x
+
+    def getmaxyx(self):
+        return self.n_rows, self.n_cols
+
+    def addstr(self, row, col, text, *args):
+        self.y, self.x = row, col + len(text)
+
+    def addch(self, *args):
+        pass
+
+    def chgat(self, *args):
+        pass
+
+
+def build_item(i):
+    data = SubmissionRecord(
+        type='Submission', index=i, title='{0}. Submission title'.format(i),
+        url='self.python',
+        url_full='https://www.reddit.com/r/python/{0}'.format(i),
+        score='{0} pts'.format(i * 7), likes=None if i % 3 else True,
+        created='{0}hr'.format(i), edited='',
+        comments='{0} comments'.format(i),
+        saved=bool(i % 5 == 0), hidden=False, stickied=bool(i == 1),
+        gold=i % 4, nsfw=False, author='redditor{0}'.format(i),
+        subreddit='python', flair='[Discussion]' if i % 2 else '')
+    data['split_title'] = Content.wrap_text(data['title'], width=78)
+    data['n_rows'] = len(data['split_title']) + 3
+    return data
+
+
+def build_page():
+    config = Config()
+    term = Terminal(None, config)
+    term.theme = Theme(use_color=False)
+    term.theme.bind_curses()
+
+    # Skip the constructor, which expects a live reddit session
+    page = SubredditPage.__new__(SubredditPage)
+    page.term = term
+    page.config = config
+    return page
+
+
+def run(name, page, items, frames):
+    def draw():
+        for data in items:
+            win = FakeWindow(data['n_rows'], 80)
+            page._draw_item(win, data, False)
+
+    times = timeit.repeat(draw, number=frames, repeat=3)
+    best = min(times)
+    print('{0:<16} {1:>7} items {2:>9.1f} ms {3:>7.2f} us/item'.format(
+        name, len(items) * frames, best * 1000,
+        best * 1e6 / (len(items) * frames)))
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else FRAMES
+    items = [build_item(i) for i in range(1, ITEMS + 1)]
+
+    page = build_page()
+    page.term._clean_cache = LRUCache(max_entries=0)
+    run('uncached', page, items, frames)
+
+    page = build_page()
+    run('cached', page, items, frames)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Import time budget for launching rtv.
+
+Imports the modules that rtv.__main__ loads before the first frame is drawn,
+in a new interpreter for each run so that nothing is already in
+sys.modules, and reports the best time along with the slowest modules from
+`python -X importtime`. The script exits with an error if the import takes
+longer than the budget, or if any of the modules that are supposed to be
+imported on first use were loaded at launch. Run `python -m compileall rtv`
+first so that the times don't include compiling stale bytecode.
+
+    $ python scripts/benchmark_import.py [budget_ms] [repeat]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import json
+import subprocess
+
+BUDGET_MS = 250
+REPEAT = 7
+
+# Everything that rtv.__main__ imports, it can't be imported directly
+# because it calls main() at the module level
+MODULES = [
+    'rtv.config',
+    'rtv.content',
+    'rtv.docs',
+    'rtv.exceptions',
+    'rtv.oauth',
+    'rtv.objects',
+    'rtv.packages.praw',
+    'rtv.startup',
+    'rtv.submission_page',
+    'rtv.subreddit_page',
+    'rtv.terminal',
+    'rtv.theme',
+]
+
+# Modules that should only be imported when they're needed, e.g. when a
+# link is opened
+DEFERRED = [
+    'bs4',
+    'mailcap',
+    'mailcap_fix',
+    'multiprocessing.pool',
+    'orjson',
+]
+
+CODE = """
+import sys, json, time
+start = time.time()
+import {modules}
+elapsed = time.time() - start
+print(json.dumps({{
+    'elapsed': elapsed,
+    'loaded': [name for name in {deferred!r} if name in sys.modules]}}))
+""".format(modules=', '.join(MODULES), deferred=DEFERRED)
+
+
+def run_once():
+    process = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-c', CODE],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = process.communicate()
+    if process.returncode != 0:
+        sys.exit(stderr.decode('utf-8'))
+
+    result = json.loads(stdout.decode('utf-8'))
+    modules = []
+    for line in stderr.decode('utf-8').splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((int(self_us), name.strip()))
+    return result['elapsed'], result['loaded'], modules
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET_MS
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else REPEAT
+
+    runs = sorted(run_once() for _ in range(repeat))
+    elapsed, loaded, modules = runs[0]
+
+    print('Slowest modules (self time):')
+    for self_us, name in sorted(modules, reverse=True)[:15]:
+        print('  {0:<40} {1:>8.1f} ms'.format(name, self_us / 1000.0))
+    print('')
+    print('{0:<16} {1:>8.1f} ms (budget {2:.0f} ms)'.format(
+        'best', elapsed * 1000, budget))
+    print('{0:<16} {1:>8.1f} ms'.format(
+        'median', runs[len(runs) // 2][0] * 1000))
+
+    failed = False
+    if loaded:
+        print('Deferred modules were imported on launch: ' + ', '.join(loaded))
+        failed = True
+    if elapsed * 1000 > budget:
+        print('Import time is over the budget')
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for decoding reddit api responses of different sizes.
+
+Compares the old path in BaseReddit._request(), which decoded the body to
+text, ran a regex over all of it to decode html entities and then parsed the
+json, against BaseReddit.request_json() parsing the raw bytes and decoding
+entities in the string values only. Every json backend that's installed is
+timed, both building PRAW objects (with `lazy_objects` on, like rtv) and
+returning plain dicts. The responses are served from a fake handler, so only
+the decoding is measured.
+
+    $ python scripts/benchmark_json_decode.py [repeat]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import re
+import sys
+import json
+import timeit
+
+import requests
+import six
+from six.moves import html_entities
+
+from rtv.packages import praw
+from rtv.packages.praw import internal
+
+SIZES_KB = (100, 1024, 5 * 1024)
+
+
+def build_submission(i):
+    return {'kind': 't3', 'data': {
+        'id': 's{0}'.format(i), 'name': 't3_s{0}'.format(i),
+        'title': 'Submission &amp; title number {0} &lt;3'.format(i),
+        'author': 'redditor{0}'.format(i % 97), 'subreddit': 'python',
+        'url': 'https://example.com/watch?v={0}&amp;t=10'.format(i),
+        'permalink': '/r/python/comments/s{0}/title/'.format(i),
+        'selftext': 'Some text in the body of the post. ' * 20,
+        'selftext_html': '&lt;div class="md"&gt;&lt;p&gt;Some text'
+                         '&lt;/p&gt;&lt;/div&gt;' * 10,
+        'score': i, 'num_comments': i % 40, 'created_utc': 1528000000.0,
+        'link_flair_text': None, 'likes': None, 'saved': False,
+        'hidden': False, 'stickied': False, 'over_18': False,
+        'is_self': True, 'gilded': 0, 'edited': False,
+        'preview': {'images': [{'source': {
+            'url': 'https://i.redditmedia.com/x.jpg?s=1&amp;w=640'}}]}}}
+
+
+def build_payload(size_kb):
+    children = []
+    payload = ''
+    while len(payload) < size_kb * 1024:
+        children.extend(build_submission(len(children) + j)
+                        for j in range(50))
+        payload = json.dumps({'kind': 'Listing', 'data': {
+            'children': children, 'after': None, 'before': None,
+            'modhash': ''}})
+    return payload.encode('utf-8')
+
+
+def build_response(content):
+    response = requests.models.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json; charset=UTF-8'
+    response._content = content
+    return response
+
+
+class FakeHandler(object):
+
+    def __init__(self, content):
+        self.content = content
+
+    def request(self, **_):
+        return build_response(self.content)
+
+
+def old_decode(reddit, content, as_objects):
+    def decode(match):
+        return six.unichr(html_entities.name2codepoint[match.group(1)])
+
+    text = build_response(content).text
+    text = re.sub('&([^;]+);', decode, text)
+    hook = reddit._json_reddit_objecter if as_objects else None
+    with reddit._request_context(url='https://api.reddit.com/r/python.json'):
+        return json.loads(text, object_hook=hook)
+
+
+def run(name, func, repeat):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print('    {0:<24} {1:>9.1f} ms'.format(name, best * 1000))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    url = 'https://api.reddit.com/r/python'
+
+    for size_kb in SIZES_KB:
+        content = build_payload(size_kb)
+        print('{0:.0f} KB listing'.format(len(content) / 1024.0))
+
+        for as_objects in (True, False):
+            suffix = ' (objects)' if as_objects else ' (dicts)'
+            reddit = praw.Reddit(user_agent='benchmark', lazy_objects=True,
+                                 disable_update_check=True)
+            run('text + regex' + suffix,
+                lambda: old_decode(reddit, content, as_objects), repeat)
+
+            for backend in sorted(internal.JSON_BACKENDS):
+                reddit = praw.Reddit(
+                    user_agent='benchmark', lazy_objects=True,
+                    json_backend=backend, handler=FakeHandler(content),
+                    disable_update_check=True)
+                run('bytes, ' + backend + suffix,
+                    lambda: reddit.request_json(url, as_objects=as_objects),
+                    repeat)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark for loading a large comment listing into PRAW objects.
+
+Builds a synthetic response for a submission's comment page, in the same
+shape that reddit returns with fields padded out to match a real listing,
+and times decoding it through the PRAW object hook with `lazy_objects`
+disabled and enabled. The second column includes converting every comment
+with Content.strip_praw_comment(), which is what happens when a submission
+page is opened. Peak memory is measured with tracemalloc.
+
+    $ python scripts/benchmark_praw_objects.py [n_comments]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import json
+import timeit
+import tracemalloc
+
+from rtv.content import Content
+from rtv.packages import praw
+
+N_COMMENTS = 2000
+
+
+def build_comment(i, depth):
+    data = {
+        'id': 'c{0}'.format(i), 'name': 't1_c{0}'.format(i),
+        'link_id': 't3_s1', 'parent_id': 't3_s1', 'subreddit': 'python',
+        'subreddit_id': 't5_2qh0y', 'subreddit_name_prefixed': 'r/python',
+        'subreddit_type': 'public', 'author': 'redditor{0}'.format(i % 97),
+        'author_flair_text': None, 'author_flair_css_class': None,
+        'body': 'Some text in the body of comment {0}. '.format(i) * 4,
+        'body_html': '&lt;div class="md"&gt;&lt;p&gt;Some text&lt;/p&gt;'
+                     '&lt;/div&gt;' * 4,
+        'score': i % 50, 'ups': i % 50, 'downs': 0, 'likes': None,
+        'score_hidden': False, 'controversiality': 0, 'gilded': 0,
+        'created': 1528000000.0 + i, 'created_utc': 1528000000.0 + i,
+        'edited': False, 'saved': False, 'stickied': False,
+        'archived': False, 'distinguished': None, 'approved_by': None,
+        'banned_by': None, 'mod_reports': [], 'user_reports': [],
+        'num_reports': None, 'report_reasons': None, 'removal_reason': None,
+        'can_gild': True, 'can_mod_post': False, 'collapsed': False,
+        'collapsed_reason': None, 'is_submitter': False, 'depth': depth,
+        'permalink': '/r/python/comments/s1/title/c{0}/'.format(i),
+        'replies': ''}
+    return {'kind': 't1', 'data': data}
+
+
+def build_payload(n_comments):
+    submission = {
+        'kind': 'Listing', 'data': {'children': [{'kind': 't3', 'data': {
+            'id': 's1', 'name': 't3_s1', 'title': 'A submission',
+            'author': 'spez', 'subreddit': 'python', 'num_comments': 1,
+            'permalink': '/r/python/comments/s1/title/',
+            'url': 'https://www.reddit.com/r/python/comments/s1/title/',
+            'selftext': '', 'selftext_html': None, 'is_self': True,
+            'score': 1, 'created_utc': 1528000000.0}}]}}
+
+    # Threads of comments five levels deep
+    roots, parent = [], None
+    for i in range(n_comments):
+        depth = i % 5
+        comment = build_comment(i, depth)
+        if depth == 0:
+            roots.append(comment)
+        else:
+            parent['data']['replies'] = {
+                'kind': 'Listing', 'data': {'children': [comment]}}
+        parent = comment
+
+    comments = {'kind': 'Listing', 'data': {'children': roots}}
+    return json.dumps([submission, comments])
+
+
+def load(reddit, payload):
+    return json.loads(payload, object_hook=reddit._json_reddit_objecter)
+
+
+def load_and_strip(reddit, payload):
+    listing, comments = load(reddit, payload)
+    submission = listing['data']['children'][0]
+    stack = list(reversed(comments['data']['children']))
+    while stack:
+        comment = stack.pop()
+        comment._submission = submission
+        comment.nested_level = 0
+        Content.strip_praw_comment(comment)
+        stack.extend(reversed(comment.replies))
+
+
+def run(name, reddit, payload, repeat):
+    parse = min(timeit.repeat(lambda: load(reddit, payload),
+                              number=1, repeat=repeat))
+    strip = min(timeit.repeat(lambda: load_and_strip(reddit, payload),
+                              number=1, repeat=repeat))
+
+    tracemalloc.start()
+    data = load(reddit, payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+
+    print('{0:<8} {1:>9.1f} ms parse {2:>9.1f} ms parse+strip '
+          '{3:>7.1f} MB peak'.format(
+              name, parse * 1000, strip * 1000, peak / 1024.0 / 1024.0))
+
+
+def main():
+    n_comments = int(sys.argv[1]) if len(sys.argv) > 1 else N_COMMENTS
+    payload = build_payload(n_comments)
+    print('{0} comments, {1:.1f} MB of json'.format(
+        n_comments, len(payload) / 1024.0 / 1024.0))
+
+    for lazy in (False, True):
+        reddit = praw.Reddit(user_agent='benchmark', lazy_objects=lazy,
+                             disable_update_check=True)
+        run('lazy' if lazy else 'eager', reddit, payload, 3)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark for building PRAW objects from the recorded api responses.
+
+Every json response from reddit in tests/cassettes/ is decoded with the PRAW
+object hook, which is the work done for each listing and comment page that
+rtv loads. The populate step is timed three ways:
+
+    setattr    the original loop, calling __setattr__ for every field, and
+               urljoin() for every url
+    bulk       fields written straight into __dict__, Redditor and Subreddit
+               objects only built on access, and urls joined directly
+    lazy       with the `lazy_objects` option that rtv uses
+
+The time to decode the json into plain dicts is shown first for reference.
+
+    $ python scripts/benchmark_praw_populate.py [repeat]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import os
+import sys
+import gzip
+import timeit
+from glob import glob
+
+import six
+import yaml
+
+from rtv.packages import praw
+from rtv.packages.praw import objects
+from six.moves.urllib.parse import urljoin
+
+CASSETTES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'tests', 'cassettes')
+
+
+def load_responses():
+    responses = []
+    for filename in sorted(glob(os.path.join(CASSETTES, '*.yaml'))):
+        with open(filename) as fp:
+            cassette = yaml.safe_load(fp)
+        for interaction in cassette['interactions']:
+            uri = interaction['request']['uri']
+            response = interaction['response']
+            headers = response['headers']
+            content_type = ''.join(headers.get('Content-Type', []))
+            if 'reddit.com' not in uri or 'json' not in content_type:
+                continue
+            body = response['body']['string']
+            if isinstance(body, six.text_type):
+                body = body.encode('utf-8')
+            if 'gzip' in headers.get('Content-Encoding', []):
+                body = gzip.GzipFile(fileobj=six.BytesIO(body)).read()
+            if body:
+                responses.append((uri, body))
+    return responses
+
+
+def setattr_populate(self, json_dict):
+    for name, value in six.iteritems(json_dict):
+        if self._underscore_names and name in self._underscore_names:
+            name = '_' + name
+        setattr(self, name, value)
+
+
+def config_getitem(self, key):
+    prefix = self.permalink_url if key in self.WWW_PATHS else self.api_url
+    return urljoin(prefix, self.API_PATHS[key])
+
+
+def decode_all(reddit, responses, as_objects=True):
+    hook = reddit._json_reddit_objecter if as_objects else None
+    for uri, body in responses:
+        with reddit._request_context(url=uri):
+            reddit.json_loads(body, hook)
+
+
+def run(name, reddit, responses, repeat, as_objects=True):
+    best = min(timeit.repeat(
+        lambda: decode_all(reddit, responses, as_objects),
+        number=1, repeat=repeat))
+    print('{0:<10} {1:>5} responses {2:>9.1f} ms'.format(
+        name, len(responses), best * 1000))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    responses = load_responses()
+    print('{0:.1f} MB of json'.format(
+        sum(len(body) for _, body in responses) / 1024.0 / 1024.0))
+
+    reddit = praw.Reddit(user_agent='benchmark', disable_update_check=True)
+    run('dicts', reddit, responses, repeat, as_objects=False)
+
+    # Swap in the original implementations for the first run
+    bulk_populate = objects.RedditContentObject._bulk_populate
+    getitem = praw.Config.__getitem__
+    join_url = objects._join_url
+    objects.RedditContentObject._bulk_populate = setattr_populate
+    praw.Config.__getitem__ = config_getitem
+    objects._join_url = urljoin
+    reddit = praw.Reddit(user_agent='benchmark', disable_update_check=True)
+    run('setattr', reddit, responses, repeat)
+
+    objects.RedditContentObject._bulk_populate = bulk_populate
+    praw.Config.__getitem__ = getitem
+    objects._join_url = join_url
+    reddit = praw.Reddit(user_agent='benchmark', disable_update_check=True)
+    run('bulk', reddit, responses, repeat)
+
+    reddit = praw.Reddit(user_agent='benchmark', lazy_objects=True,
+                         disable_update_check=True)
+    run('lazy', reddit, responses, repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Memory benchmark for the records that are stored by SubredditContent.
+
+Builds a long synthetic listing and measures the memory that is allocated to
+hold the parsed items when they are stored as plain dicts, as slotted records,
+and as slotted records that have released their PRAW objects. The fake
+submissions carry roughly as many attributes as a real listing response.
+
+Requires python 3 for the tracemalloc module.
+
+    $ python scripts/benchmark_records.py [count]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import time
+import tracemalloc
+
+from rtv.content import Content
+
+COUNT = 10000
+
+# Most of the attributes in a listing response are never displayed by rtv
+EXTRA_ATTRIBUTES = 80
+
+
+class FakeSubmission(object):
+
+    reddit_session = None
+
+    def __init__(self, i):
+        now = time.time()
+        self.id = 'sub{0}'.format(i)
+        self.fullname = 't3_{0}'.format(self.id)
+        self.title = 'Submission title number {0}'.format(i)
+        self.selftext = 'Text for submission {0}'.format(i) * 5
+        self.selftext_html = '<p>{0}</p>'.format(self.selftext)
+        self.created_utc = now - i * 60
+        self.num_comments = i % 500
+        self.hide_score = False
+        self.score = i * 3
+        self.author = None
+        self.permalink = '/r/python/comments/{0}/title/'.format(self.id)
+        self.subreddit = 'python'
+        self.link_flair_text = None
+        self.url = 'https://example.com/{0}'.format(i)
+        self.likes = None
+        self.gilded = 0
+        self.over_18 = False
+        self.stickied = False
+        self.hidden = False
+        self.saved = False
+        self.edited = False
+        self.archived = False
+        for n in range(EXTRA_ATTRIBUTES):
+            setattr(self, 'attribute_{0}'.format(n), '{0}-{1}'.format(n, i))
+
+
+def measure(name, build, count):
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    items = build(count)
+    stats = tracemalloc.take_snapshot().compare_to(start, 'filename')
+    tracemalloc.stop()
+
+    total = sum(stat.size_diff for stat in stats)
+    print('{0:<24} {1:>7} items {2:>9.1f} MB {3:>7.0f} bytes/item'.format(
+        name, count, total / 1024.0 / 1024.0, total / float(count)))
+    return items
+
+
+def build_dicts(count):
+    return [dict(Content.strip_praw_submission(FakeSubmission(i)).items())
+            for i in range(count)]
+
+
+def build_records(count):
+    return [Content.strip_praw_submission(FakeSubmission(i))
+            for i in range(count)]
+
+
+def build_released_records(count):
+    items = []
+    for i in range(count):
+        data = Content.strip_praw_submission(FakeSubmission(i))
+        data.release_object()
+        items.append(data)
+    return items
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else COUNT
+    measure('dict', build_dicts, count)
+    measure('record', build_records, count)
+    measure('record (low_memory)', build_released_records, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark for scraping media links out of html pages.
+
+Builds a synthetic page that resembles a heavy media site, with the open
+graph tags in the <head> followed by a large body, and compares building a
+full BeautifulSoup tree against streaming the page through the TagScanner
+used by OpenGraphMIMEParser. This is run for a video page, where the scan
+stops at the video tag, and for a page that only has an image, where it
+stops at the end of the <head>. The page is served from memory in fixed
+size chunks, so the number of bytes that each method consumes is reported
+along with the time.
+
+    $ python scripts/benchmark_scrape.py [body_kb]
+"""
+
+from __future__ import unicode_literals
+from __future__ import print_function
+
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+from rtv import mime_parsers
+from rtv.mime_parsers import OpenGraphMIMEParser
+
+BODY_KB = 500
+CHUNK_SIZE = 8 * 1024
+
+HEAD = """<!DOCTYPE html>
+<html><head>
+<meta charset="utf-8">
+<title>Some video</title>
+<link rel="stylesheet" href="/static/style.css">
+<script>window.config = {"debug": false, "locale": "en"};</script>
+<meta property="og:title" content="Some video">
+<meta property="og:image" content="https://cdn.example.com/v/poster.jpg">
+</head>
+"""
+
+VIDEO = ('<meta property="og:video:secure_url" '
+         'content="https://cdn.example.com/v.mp4">\n')
+
+ROW = """<div class="comment"><a href="/u/user">user</a>
+<p>Some text that makes up the body of a <b>comment</b> on the page.</p>
+<img src="/static/avatar.png" alt=""></div>
+"""
+
+
+def build_page(body_kb, video=True):
+    rows = body_kb * 1024 // len(ROW)
+    head = HEAD.replace('</head>', (VIDEO if video else '') + '</head>')
+    body = '<body>' + ROW * rows + '</body></html>'
+    return (head + body).encode('utf-8')
+
+
+class FakeResponse(object):
+
+    def __init__(self, content):
+        self.content = content
+        self.headers = {'Content-Type': 'text/html; charset=utf-8'}
+        self.encoding = 'utf-8'
+        self.consumed = 0
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.content), chunk_size):
+            chunk = self.content[i:i + chunk_size]
+            self.consumed += len(chunk)
+            yield chunk
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+
+    def __init__(self, content):
+        self.content = content
+        self.last_response = None
+
+    def get(self, url, **kwargs):
+        self.last_response = FakeResponse(self.content)
+        return self.last_response
+
+
+def soup(page):
+    tree = BeautifulSoup(page, 'html.parser')
+    for prop in OpenGraphMIMEParser.PROPERTIES:
+        tag = tree.find('meta', attrs={'property': prop})
+        if tag:
+            return tag.get('content')
+
+
+def run(name, func, size, repeat):
+    times = timeit.repeat(func, number=1, repeat=repeat)
+    best = min(times)
+    print('{0:<16} {1:>9.0f} KB read {2:>9.2f} ms'.format(
+        name, size / 1024.0, best * 1000))
+
+
+def main():
+    body_kb = int(sys.argv[1]) if len(sys.argv) > 1 else BODY_KB
+    url = 'https://www.example.com/v/1'
+
+    for name, video in [('video', True), ('image only', False)]:
+        print(name)
+        page = build_page(body_kb, video)
+        run('beautifulsoup', lambda: soup(page), len(page), 3)
+
+        session = FakeSession(page)
+        mime_parsers.set_session(session)
+
+        def scan():
+            return OpenGraphMIMEParser.get_mimetype(url)
+
+        assert scan()[0] == soup(page)
+        run('tag scanner', scan, session.last_response.consumed, 20)
+
+
+if __name__ == '__main__':
+    main()
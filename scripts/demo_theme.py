@@ -231,7 +231,7 @@ def main():
             config.refresh_token = 'mock_refresh_token'
 
         reddit = praw.Reddit(user_agent='RTV Theme Demo',
-                             decode_html_entities=False,
+                             decode_html_entities=True,
                              disable_update_check=True)
         reddit.config.api_request_delay = 0
 
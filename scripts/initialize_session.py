@@ -13,7 +13,7 @@ config.load_refresh_token()
 
 reddit = praw.Reddit(
     user_agent=AGENT.format(version='test_session'),
-    decode_html_entities=False,
+    decode_html_entities=True,
     disable_update_check=True,
     timeout=10,  # 10 second request timeout
     handler=RequestHeaderRateLimiter())
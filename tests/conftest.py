@@ -133,6 +133,9 @@ def refresh_token(request):
 @pytest.yield_fixture()
 def config():
     conf = Config()
+    # Background requests would race against the recorded cassettes
+    conf['prefetch_items'] = 0
+    conf['media_prefetch'] = 0
     with mock.patch.object(conf, 'save_history'),          \
             mock.patch.object(conf, 'delete_history'),     \
             mock.patch.object(conf, 'save_refresh_token'), \
@@ -187,7 +190,8 @@ def reddit(vcr, request):
         with patch('rtv.packages.praw.Reddit.get_access_information'):
             handler = RequestHeaderRateLimiter()
             reddit = praw.Reddit(user_agent='rtv test suite',
-                                 decode_html_entities=False,
+                                 decode_html_entities=True,
+                                 lazy_objects=True,
                                  disable_update_check=True,
                                  handler=handler)
             # praw uses a global cache for requests, so we need to clear it
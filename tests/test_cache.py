@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import time
+
+from rtv.cache import DiskCache, LRUCache
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def test_disk_cache(tmpdir):
+
+    filename = os.path.join(tmpdir.strpath, 'rtv', 'cache.db')
+    cache = DiskCache(filename)
+    assert os.path.exists(filename)
+
+    assert cache.get('key') is None
+    cache.set('key', {'value': [1, 2, 3]}, url='https://www.reddit.com')
+    timestamp, value = cache.get('key')
+    assert value == {'value': [1, 2, 3]}
+    assert timestamp <= time.time()
+
+    # Entries should persist after the cache is re-opened
+    cache.close()
+    cache = DiskCache(filename)
+    assert cache.get('key')[1] == {'value': [1, 2, 3]}
+
+    cache.delete('key')
+    assert cache.get('key') is None
+
+
+def test_disk_cache_evict(tmpdir):
+
+    cache = DiskCache(tmpdir.join('cache.db').strpath)
+    cache.set('a', 1, url='https://www.reddit.com/r/python')
+    cache.set('b', 2, url='https://www.reddit.com/r/python')
+    cache.set('c', 3, url='https://www.reddit.com/r/linux')
+
+    cache.evict(['https://www.reddit.com/r/python'])
+    assert cache.get('a') is None
+    assert cache.get('b') is None
+    assert cache.get('c')[1] == 3
+
+    cache.clear()
+    assert cache.get('c') is None
+
+
+def test_disk_cache_max_age(tmpdir):
+
+    filename = tmpdir.join('cache.db').strpath
+    cache = DiskCache(filename)
+    cache.set('key', 'value')
+    cache.close()
+
+    # Expired entries are dropped when the cache is opened
+    cache = DiskCache(filename, max_age=-1)
+    assert cache.get('key') is None
+
+
+def test_disk_cache_invalid_file(tmpdir):
+
+    # The cache should fail silently if the database can't be opened
+    filename = tmpdir.join('cache.db').strpath
+    with open(filename, 'w') as fp:
+        fp.write('not a database')
+
+    cache = DiskCache(filename)
+    cache.set('key', 'value')
+    assert cache.get('key') is None
+
+
+def test_lru_cache():
+
+    cache = LRUCache(max_entries=3)
+    for key in 'abc':
+        cache[key] = key.upper()
+    assert len(cache) == 3
+    assert cache.keys() == ['a', 'b', 'c']
+
+    # Accessing an entry moves it to the back of the eviction queue
+    assert cache.get('a') == 'A'
+    assert cache.get('z') is None
+    cache['d'] = 'D'
+    assert cache.keys() == ['c', 'a', 'd']
+    assert 'b' not in cache
+
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['evictions'] == 1
+
+    del cache['a']
+    assert cache.values() == ['C', 'D']
+
+    cache.clear()
+    assert not cache
+    assert cache.size == 0
+
+
+def test_lru_cache_max_bytes():
+
+    cache = LRUCache(max_bytes=10)
+    cache['a'] = 'x' * 4
+    cache['b'] = 'x' * 4
+    assert cache.size == 8
+
+    cache['c'] = 'x' * 4
+    assert cache.keys() == ['b', 'c']
+    assert cache.size == 8
+
+    # Entries that are larger than the cache won't be stored
+    cache['d'] = 'x' * 11
+    assert not cache
+    assert cache.size == 0
+    assert cache.evictions == 4
+
+
+def test_lru_cache_expire():
+
+    cache = LRUCache()
+    with mock.patch('rtv.cache.timer') as timer:
+        timer.return_value = 0
+        cache['a'] = 'A'
+        timer.return_value = 10
+        cache['b'] = 'B'
+        timer.return_value = 20
+        cache['c'] = 'C'
+
+        # Reading an entry doesn't extend its lifetime
+        cache.get('a')
+        timer.return_value = 25
+        cache.expire(12)
+
+    assert cache.keys() == ['c']
+    assert cache.expirations == 2
+
+
+def test_lru_cache_set_age():
+
+    cache = LRUCache()
+    with mock.patch('rtv.cache.timer') as timer:
+        timer.return_value = 100
+        cache['a'] = 'A'
+        cache['b'] = 'B'
+        cache.set('c', 'C', age=5)
+        cache.set('d', 'D', age=50)
+        assert cache.keys() == ['a', 'b', 'c', 'd']
+
+        # The older entries are not fresh for as long
+        assert cache.get('d', max_age=30) is None
+        assert cache.get('c', max_age=30) == 'C'
+
+        # And they expire first, even though they were added last
+        timer.return_value = 120
+        cache.expire(20)
+        assert sorted(cache.keys()) == ['a', 'b']
+        timer.return_value = 121
+        cache.expire(20)
+
+    assert not cache
+    assert cache.expirations == 4
+
+
+def test_lru_cache_max_age():
+
+    cache = LRUCache()
+    with mock.patch('rtv.cache.timer') as timer:
+        timer.return_value = 0
+        cache['a'] = 'A'
+        timer.return_value = 10
+
+        # Old entries are skipped but kept around for callers that want them
+        assert cache.get('a', max_age=5) is None
+        assert cache.get('a', max_age=15) == 'A'
+        assert cache.get('a') == 'A'
+
+    assert cache.misses == 1
+    assert cache.hits == 2
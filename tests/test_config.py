@@ -93,7 +93,8 @@ def test_config_get_args():
             '--theme', 'molokai',
             '--list-themes',
             '--no-flash',
-            '--no-autologin']
+            '--no-autologin',
+            '--startup-trace']
 
     with mock.patch('sys.argv', ['rtv']):
         config_dict = Config.get_args()
@@ -119,6 +120,7 @@ def test_config_get_args():
         assert config['list_themes'] is True
         assert config['flash'] is False
         assert config['autologin'] is False
+        assert config['startup_trace'] is True
 
 
 def test_config_link_deprecated():
@@ -156,6 +158,11 @@ def test_config_from_file():
         'theme': 'molokai',
         'flash': True,
         'autologin': True,
+        'prefetch_items': 10,
+        'media_prefetch': 4,
+        'low_memory': True,
+        'response_cache_entries': 100,
+        'response_cache_mb': 8,
     }
 
     bindings = {
@@ -2,17 +2,19 @@
 from __future__ import unicode_literals
 
 import time
+import threading
 from itertools import islice
 from collections import OrderedDict
 
 import six
 import pytest
+import requests
 
 from rtv import exceptions
 from rtv.packages import praw
 from rtv.content import (
     Content, SubmissionContent, SubredditContent, SubscriptionContent,
-    RequestHeaderRateLimiter)
+    RequestHeaderRateLimiter, RequestPriority, Prefetcher)
 
 try:
     from unittest import mock
@@ -124,6 +126,25 @@ def test_content_wrap_text():
     assert Content.wrap_text('\n\n\n\n', 70) == ['', '', '', '']
 
 
+def test_content_wrap_text_cached():
+
+    text = 'four score\nand seven\n\n'
+    with mock.patch('rtv.content.wrap', side_effect=lambda x, width: [x]) \
+            as wrap:
+        lines = Content.wrap_text(text, 17)
+        assert wrap.call_count == 3
+
+        # The text should only be wrapped once for each width
+        lines.append('modified')
+        assert Content.wrap_text(text, 17) == ['four score', 'and seven', '']
+        assert wrap.call_count == 3
+
+        Content.wrap_text(text, 18)
+        assert wrap.call_count == 6
+        Content.wrap_text(text + '!', 17)
+        assert wrap.call_count == 10
+
+
 @pytest.mark.skip('Reddit API changed, need to update this test')
 def test_content_flatten_comments(reddit):
 
@@ -282,6 +303,85 @@ def test_content_submission(reddit, terminal):
     assert content.range == (-1, 44)
 
 
+def test_content_submission_lazy(reddit, terminal):
+
+    url = 'https://www.reddit.com/r/Python/comments/2xmo63/'
+    submission = reddit.get_submission(url)
+    content = SubmissionContent(submission, terminal.loader)
+
+    # Comments aren't stripped until they are displayed
+    with mock.patch.object(Content, 'strip_praw_comment') as strip:
+        levels = [content.get_level(i) for i in range(45)]
+        assert not strip.called
+    assert levels[0] == 0
+    assert isinstance(content._comment_data[2], praw.objects.Comment)
+
+    data = content.get(2)
+    assert data['level'] == levels[2]
+    assert content._comment_data[2] is data
+
+    # Hiding a comment packs its children without stripping them
+    content.toggle(2)
+    assert content.get(2)['count'] == 3
+    assert isinstance(content._comment_data[3], praw.objects.Comment)
+    content.toggle(2)
+    assert [content.get_level(i) for i in range(45)] == levels
+
+    with pytest.raises(IndexError):
+        content.get_level(-1)
+    with pytest.raises(IndexError):
+        content.get_level(45)
+
+
+def test_content_submission_tree_index(reddit, terminal):
+
+    url = 'https://www.reddit.com/r/Python/comments/2xmo63/'
+    submission = reddit.get_submission(url)
+    content = SubmissionContent(submission, terminal.loader)
+
+    def check_index():
+        # The incremental updates should match rebuilding from scratch
+        index = content._build_index(content._comment_data)
+        assert (content._offsets, content._sizes, content._counts) == index
+
+        for i in range(content.range[1] + 1):
+            level = content.get_level(i)
+            parent = i - 1
+            while parent >= 0 and content.get_level(parent) >= level:
+                parent -= 1
+            assert content.get_parent(i) == parent
+
+            sibling = i + 1
+            while sibling <= content.range[1] and \
+                    content.get_level(sibling) > level:
+                sibling += 1
+            if sibling > content.range[1] or \
+                    content.get_level(sibling) != level:
+                sibling = None
+            assert content.get_next_sibling(i) == sibling
+
+    check_index()
+    assert content.get_root(3) == 0
+    with pytest.raises(IndexError):
+        content.get_parent(-1)
+
+    # Hide a nested comment, then its parent, then unpack them again
+    content.toggle(3)
+    check_index()
+    content.toggle(2)
+    check_index()
+    assert content.get(2)['count'] == 3
+    content.toggle(0)
+    check_index()
+    content.toggle(0)
+    content.toggle(2)
+    check_index()
+    assert content.get(3)['type'] == 'HiddenComment'
+    content.toggle(3)
+    check_index()
+    assert content.range == (-1, 44)
+
+
 def test_content_submission_load_more_comments(reddit, terminal):
 
     url = 'https://www.reddit.com/r/AskReddit/comments/2np694/'
@@ -297,6 +397,65 @@ def test_content_submission_load_more_comments(reddit, terminal):
     assert content.range[0] == -1
     assert content.range[1] > last_index
     assert content.get(last_index)['type'] == 'Comment'
+    assert (content._offsets, content._sizes, content._counts) == \
+        content._build_index(content._comment_data)
+
+
+def test_content_submission_expand_all(reddit, terminal):
+
+    url = 'https://www.reddit.com/r/AskReddit/comments/2np694/'
+    submission = reddit.get_submission(url)
+    content = SubmissionContent(submission, terminal.loader)
+    comments = [d for d in content.iterate(0, 1) if d['type'] == 'Comment']
+    more_comments = [d['object'] for d in content.iterate(0, 1)
+                     if d['type'] == 'MoreComments']
+    assert len(more_comments) > 1
+
+    # Loading the first item uncovers a new one for the next round
+    extra = praw.objects.MoreComments(reddit, {
+        'count': 3, 'children': ['abc'], 'id': 'abc', 'name': 't1_abc',
+        'parent_id': more_comments[0].parent_id})
+    threads = set()
+
+    def load_comments(self, update=True):
+        threads.add(threading.current_thread().name)
+        return [extra] if self is more_comments[0] else []
+
+    with mock.patch.object(praw.objects.MoreComments, 'comments',
+                           autospec=True, side_effect=load_comments) as m:
+        content.expand_all(max_workers=4)
+        assert not terminal.loader.exception
+
+    # Every item was requested once from a worker thread
+    assert m.call_count == len(more_comments) + 1
+    assert threading.current_thread().name not in threads
+    assert [d['type'] for d in content.iterate(0, 1)] == \
+        ['Comment'] * len(comments)
+
+
+def test_content_submission_expand_all_error(reddit, terminal):
+
+    url = 'https://www.reddit.com/r/AskReddit/comments/2np694/'
+    submission = reddit.get_submission(url)
+    content = SubmissionContent(submission, terminal.loader)
+    more_comments = [d['object'] for d in content.iterate(0, 1)
+                     if d['type'] == 'MoreComments']
+
+    def load_comments(self, update=True):
+        if self is more_comments[0]:
+            raise praw.errors.HTTPException(None)
+        return []
+
+    with mock.patch.object(praw.objects.MoreComments, 'comments',
+                           autospec=True, side_effect=load_comments):
+        with terminal.loader():
+            content.expand_all()
+    assert isinstance(terminal.loader.exception, praw.errors.HTTPException)
+
+    # The comments that loaded successfully should still be merged in
+    remaining = [d['object'] for d in content.iterate(0, 1)
+                 if d['type'] == 'MoreComments']
+    assert remaining == more_comments[:1]
 
 
 def test_content_submission_from_url(reddit, oauth, refresh_token, terminal):
@@ -333,6 +492,65 @@ def test_content_subreddit_initialize(reddit, terminal):
     assert content.range == (0, 0)
 
 
+def test_content_prefetcher():
+
+    items = Prefetcher(iter(range(10)), lambda x: x * 2, batch_size=4)
+    assert not items.running
+
+    items.prefetch()
+    items.wait()
+    assert list(items._buffer) == [0, 2, 4, 6]
+
+    # Buffered items are returned first, then the generator is read directly
+    assert list(items) == [x * 2 for x in range(10)]
+
+    # Prefetching an exhausted generator is a no-op
+    items.prefetch()
+    assert not items.running
+    with pytest.raises(StopIteration):
+        next(items)
+
+
+def test_content_prefetcher_exception():
+
+    def generator():
+        yield 1
+        yield 2
+        raise praw.errors.HTTPException(None)
+
+    items = Prefetcher(generator(), batch_size=5)
+    items.prefetch()
+    items.wait()
+
+    # The error is raised on the main thread after the buffer is drained
+    assert next(items) == 1
+    assert next(items) == 2
+    with pytest.raises(praw.errors.HTTPException):
+        next(items)
+    with pytest.raises(StopIteration):
+        next(items)
+
+
+def test_content_subreddit_prefetch(reddit, terminal):
+
+    submissions = reddit.get_front_page(limit=None)
+    content = SubredditContent('front', submissions, terminal.loader,
+                               prefetch_items=10)
+
+    # Loading the first submission starts reading ahead in the background
+    content._submissions.wait()
+    assert content.range == (0, 0)
+    assert len(content._submissions._buffer) == 10
+
+    for i, data in enumerate(islice(content.iterate(0, 1), 0, 20)):
+        assert data['index'] == i + 1
+        assert data['title'].startswith(six.text_type(i + 1))
+    assert content.range == (0, 19)
+
+    content._submissions.wait()
+    assert len(content._submissions._buffer) == 10
+
+
 def test_content_subreddit_initialize_invalid(reddit, terminal):
 
     submissions = reddit.get_subreddit('invalidsubreddit7').get_top(limit=None)
@@ -365,6 +583,24 @@ def test_content_subreddit(reddit, terminal):
         content.get(5)
 
 
+def test_content_subreddit_low_memory(reddit, terminal):
+
+    submissions = reddit.get_front_page(limit=5)
+    content = SubredditContent('front', submissions, terminal.loader,
+                               keep_objects=False)
+
+    for data in content.iterate(0, 1):
+        assert data['type'] == 'Submission'
+        assert data._object is None
+
+        # The object can still be used for actions like voting
+        obj = data['object']
+        assert isinstance(obj, praw.objects.Submission)
+        assert obj.fullname.startswith('t3_')
+        assert obj.archived in (True, False)
+    assert content.range == (0, 4)
+
+
 def test_content_subreddit_load_more(reddit, terminal):
 
     submissions = reddit.get_front_page(limit=None)
@@ -601,6 +837,124 @@ def test_content_cache(reddit):
     assert not reddit.handler.cache
 
 
+def test_content_persistent_cache(tmpdir):
+
+    filename = tmpdir.join('cache.db').strpath
+    url = 'https://oauth.reddit.com/r/python/.json'
+    request = requests.Request('GET', url).prepare()
+    kwargs = {'request': request, 'proxies': None, 'timeout': None,
+              'verify': True}
+
+    def build_response(content):
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.headers['content-type'] = 'application/json'
+        response._content = content
+        return response
+
+    def open_handler(refresh_token='refresh-1'):
+        handler = RequestHeaderRateLimiter(cache_file=filename)
+        handler.set_account(refresh_token)
+        return handler
+
+    # The cache key includes the access token, which changes between sessions
+    key_url = 'https://oauth.reddit.com/r/python'
+    key = (key_url, ((), None, (), None, 'bearer token-1'))
+    handler = open_handler()
+    with mock.patch.object(handler, '_request') as _request:
+        _request.return_value = build_response(b'{"version": 1}')
+        handler.request(key, False, 30, **kwargs)
+        assert _request.call_count == 1
+
+    # A new session should load the response from disk
+    key = (key_url, ((), None, (), None, 'bearer token-2'))
+    handler = open_handler()
+    with mock.patch.object(handler, '_request') as _request:
+        response = handler.request(key, False, 30, **kwargs)
+        assert not _request.called
+        assert response.status_code == 200
+        assert response.json() == {'version': 1}
+        assert response.headers['Content-Type'] == 'application/json'
+
+    # Other accounts, or a session where the account isn't known yet, don't
+    # see the responses
+    for refresh_token in ('refresh-2', None):
+        handler = open_handler(refresh_token)
+        with mock.patch.object(handler, '_request') as _request:
+            _request.return_value = build_response(b'{"version": 0}')
+            response = handler.request(key, False, 30, **kwargs)
+            assert _request.call_count == 1
+            assert response.json() == {'version': 0}
+
+    # Stale responses are returned immediately and refreshed in the background
+    handler = open_handler()
+    with mock.patch.object(handler, '_request') as _request:
+        _request.return_value = build_response(b'{"version": 2}')
+        response = handler.request(key, False, 0, **kwargs)
+        assert response.json() == {'version': 1}
+
+        for _ in range(100):
+            if not handler._revalidating:
+                break
+            time.sleep(0.01)
+        assert _request.call_count == 1
+        assert handler.disk_cache.get(handler._disk_cache_key(
+            (key_url, ((), None, None, 'bearer token-2'))))[1]['content'] == \
+            b'{"version": 2}'
+
+    # Evicting the url should also remove it from the disk
+    handler.evict(url)
+    handler = open_handler()
+    with mock.patch.object(handler, '_request') as _request:
+        _request.return_value = build_response(b'{"version": 3}')
+        response = handler.request(key, False, 30, **kwargs)
+        assert _request.call_count == 1
+        assert response.json() == {'version': 3}
+
+
+def test_content_cache_coalesce():
+
+    url = 'https://oauth.reddit.com/r/python/.json'
+    request = requests.Request('GET', url).prepare()
+    kwargs = {'request': request, 'proxies': None, 'timeout': None,
+              'verify': True}
+    key = ('https://oauth.reddit.com/r/python', ((), None, (), None, None))
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{}'
+
+    handler = RequestHeaderRateLimiter()
+    release = threading.Event()
+
+    def _request(**_):
+        release.wait()
+        return response
+
+    results = []
+    with mock.patch.object(handler, '_request', side_effect=_request) as m:
+        threads = [threading.Thread(target=lambda: results.append(
+            handler.request(key, False, 30, **kwargs))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while handler.single_flight.coalesced < 3:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        # Only the first request went out to the network
+        assert m.call_count == 1
+        assert results == [response] * 4
+        assert handler.single_flight.stats()['coalesced'] == 3
+
+        # Requests that aren't cached are never coalesced
+        post = requests.Request('POST', url).prepare()
+        handler.request(key, False, 30, **dict(kwargs, request=post))
+        assert m.call_count == 2
+
+
 def test_content_rate_limit(reddit, oauth, refresh_token):
 
     # Make sure the test suite is configured to use the custom handler
@@ -621,7 +975,87 @@ def test_content_rate_limit(reddit, oauth, refresh_token):
 
     # Even though the headers were returned, the rate limiting should
     # still not be triggering a delay for the next request
-    assert reddit.handler.next_request_timestamp is None
+    assert reddit.handler._pacing(False, time.time()) == 0
+
+
+def test_content_rate_limit_pacing():
+
+    handler = RequestHeaderRateLimiter()
+    handler._update({
+        'x-ratelimit-used': '500',
+        'x-ratelimit-remaining': '100',
+        'x-ratelimit-reset': '300'})
+    now = handler.last_response_timestamp
+
+    # The requests are spread over the rest of the period, but interactive
+    # requests are never held back for long
+    assert handler._pacing(False, now) == handler.MAX_INTERACTIVE_DELAY
+    assert handler._pacing(False, now + 5) == 0
+    # Background requests are slowed down more, and leave a reserve
+    assert handler._pacing(True, now) == pytest.approx(230 / 35.0)
+    handler.remaining = handler.BACKGROUND_RESERVE
+    assert handler._pacing(True, now) is None
+    assert handler._pacing(False, now) == handler.MAX_INTERACTIVE_DELAY
+
+    # Plenty of requests left
+    handler.remaining = 600
+    assert handler._pacing(False, now) == 0
+    assert handler._pacing(True, now) == 0
+
+    # The budget is used up until the period resets
+    handler.remaining = 0
+    assert handler._pacing(False, now) is None
+    assert handler._pacing(False, now + 300) == 0
+
+    with mock.patch('time.sleep') as sleep:
+        with pytest.raises(exceptions.RateLimitExceeded):
+            handler._delay()
+        assert not sleep.called
+
+    # Background requests are moved to the front when the user is waiting on
+    # them, and fail instead of waiting for the period to reset
+    priority = RequestPriority()
+    with mock.patch('time.sleep') as sleep, priority.use():
+        sleep.side_effect = lambda _: setattr(priority, 'background', False)
+        with pytest.raises(exceptions.RateLimitExceeded):
+            handler._delay()
+        assert sleep.call_count == 1
+    assert not RequestPriority.is_background()
+
+
+def test_content_rate_limit_exhausted():
+
+    url = 'https://oauth.reddit.com/r/python/.json'
+    request = requests.Request('GET', url).prepare()
+    kwargs = {'request': request, 'proxies': None, 'timeout': None,
+              'verify': True}
+    key = ('https://oauth.reddit.com/r/python', ((), None, (), None, None))
+
+    response = requests.Response()
+    response.status_code = 200
+    response._content = b'{}'
+
+    handler = RequestHeaderRateLimiter()
+    handler._update({
+        'x-ratelimit-used': '600',
+        'x-ratelimit-remaining': '0',
+        'x-ratelimit-reset': '300'})
+
+    # Nothing has been cached yet
+    with mock.patch.object(handler.http, 'send') as send:
+        with pytest.raises(exceptions.RateLimitExceeded):
+            handler.request(key, False, 30, **kwargs)
+        assert not send.called
+    assert handler.take_notice() is None
+
+    # Expired responses are served instead of sleeping until the reset
+    with mock.patch.object(handler.http, 'send') as send:
+        # The session cookies are dropped from the key that's cached
+        handler.cache[(key[0], ((), None, None, None))] = response
+        assert handler.request(key, False, 0, **kwargs) is response
+        assert not send.called
+    assert 'rate limit' in handler.take_notice()
+    assert handler.take_notice() is None
 
 
 def test_content_extract_links():
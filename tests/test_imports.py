@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import sys
+import subprocess
+
+
+def test_imports_deferred():
+    """
+    Modules that are only needed to open links or parse html shouldn't be
+    imported when rtv is launched.
+    """
+    code = (
+        'import sys; '
+        'import rtv.terminal, rtv.startup, rtv.oauth, rtv.theme, '
+        'rtv.subreddit_page, rtv.submission_page; '
+        'print(" ".join(name for name in '
+        '("bs4", "mailcap", "mailcap_fix", "multiprocessing.pool", "orjson") '
+        'if name in sys.modules))')
+    output = subprocess.check_output([sys.executable, '-c', code])
+    assert output.decode('utf-8').split() == []
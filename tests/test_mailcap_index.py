@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+
+from rtv.mailcap_index import MailcapIndex, get_mailcap
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+MAILCAP = """
+image/png; feh %s; test=test -n "$DISPLAY"
+image/*; fbi %s; needsterminal
+"""
+
+
+def write_mailcap(tmpdir, text):
+    filename = tmpdir.join('mailcap')
+    filename.write(text)
+    return filename.strpath
+
+
+def test_mailcap_index(tmpdir):
+
+    filename = write_mailcap(tmpdir, MAILCAP)
+    with mock.patch.dict('os.environ', {'MAILCAPS': filename}), \
+            mock.patch('os.system') as system:
+
+        index = MailcapIndex()
+        assert index._caps is None
+
+        # The test command is only run once
+        system.return_value = 0
+        command, entry = index.findmatch('image/png', '/tmp/a.png')
+        assert command == 'feh /tmp/a.png'
+        command, entry = index.findmatch('image/png', '/tmp/b.png')
+        assert command == 'feh /tmp/b.png'
+        assert system.call_count == 1
+
+        # Falls through to the wildcard subtype
+        index = MailcapIndex()
+        system.return_value = 1
+        command, entry = index.findmatch('image/png', '/tmp/a.png')
+        assert command == 'fbi /tmp/a.png'
+        assert 'needsterminal' in entry
+
+        assert index.findmatch('text/plain', '/tmp/a.txt') == (None, None)
+
+
+def test_mailcap_index_cache_file(tmpdir):
+
+    filename = write_mailcap(tmpdir, MAILCAP)
+    cache_file = tmpdir.join('mailcap.db').strpath
+    with mock.patch.dict('os.environ', {'MAILCAPS': filename}):
+
+        assert 'image/png' in MailcapIndex(cache_file).caps
+
+        with mock.patch.object(get_mailcap(), 'getcaps') as getcaps:
+            caps = MailcapIndex(cache_file).caps
+            assert not getcaps.called
+            assert 'image/png' in caps
+
+        # Editing the mailcap file invalidates the cache
+        write_mailcap(tmpdir, 'audio/*; sox %s\n')
+        mtime = os.path.getmtime(filename) + 10
+        os.utime(filename, (mtime, mtime))
+        caps = MailcapIndex(cache_file).caps
+        assert 'audio/*' in caps
+        assert 'image/png' not in caps
@@ -2,11 +2,23 @@
 from __future__ import unicode_literals
 
 import re
+import time
+import threading
 from collections import OrderedDict
 
 import pytest
 
-from rtv.mime_parsers import parsers, ImgurApiMIMEParser
+from rtv.exceptions import MIMEParserError
+from rtv import mime_parsers
+from rtv.mime_parsers import (parsers, ImgurApiMIMEParser, BaseMIMEParser,
+                              MIMECache, GfycatMIMEParser, HTTPSession,
+                              ImgurScrapeMIMEParser, MIMEResolver,
+                              OpenGraphMIMEParser, ParserRegistry)
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
 
 
 RegexpType = type(re.compile(''))
@@ -182,3 +194,341 @@ def test_imgur_fallback(reddit):
         # Not sure why, but http://imgur.com/gallery/yjP1v4B (a .gif)
         # appears to incorrectly return as a JPG type from the scraper
         assert parsed_type is not None
+
+
+def test_mime_cache(tmpdir):
+
+    class MockParser(BaseMIMEParser):
+        cache_ttl = 60
+        get_mimetype = mock.Mock(return_value=('http://a.com/a.png',
+                                               'image/png'))
+
+    url = 'http://a.com/a'
+    filename = tmpdir.join('mime-cache.db').strpath
+    cache = MIMECache(filename)
+
+    assert cache.get_mimetype(MockParser, url) == ('http://a.com/a.png',
+                                                   'image/png')
+    assert cache.get_mimetype(MockParser, url) == ('http://a.com/a.png',
+                                                   'image/png')
+    assert MockParser.get_mimetype.call_count == 1
+
+    # Results are loaded from disk in a new session
+    cache = MIMECache(filename)
+    assert cache.get_mimetype(MockParser, url)[1] == 'image/png'
+    assert MockParser.get_mimetype.call_count == 1
+
+    # Until they expire
+    with mock.patch('time.time', return_value=time.time() + 61):
+        cache.get_mimetype(MockParser, url)
+    assert MockParser.get_mimetype.call_count == 2
+
+    # Parsers that don't make requests are never cached
+    MockParser.cache_ttl = None
+    cache.get_mimetype(MockParser, url)
+    cache.get_mimetype(MockParser, url)
+    assert MockParser.get_mimetype.call_count == 4
+
+
+def test_mime_cache_registry(tmpdir):
+
+    class MockParser(BaseMIMEParser):
+        cache_ttl = 30 * 24 * 60 * 60
+        get_mimetype = mock.Mock(return_value=('http://a.com/a.png',
+                                               'image/png'))
+
+    url = 'http://a.com/a'
+    filename = tmpdir.join('mime-cache.db').strpath
+    registry = ParserRegistry(parsers + [MockParser])
+    cache = MIMECache(filename, registry)
+    cache.get_mimetype(MockParser, url)
+    assert MockParser.get_mimetype.call_count == 1
+
+    # Entries are kept on disk for as long as the registered parsers need,
+    # which can be longer than any of the built-in parsers
+    later = time.time() + 10 * 24 * 60 * 60
+    with mock.patch('time.time', return_value=later):
+        cache = MIMECache(filename, registry)
+        cache.get_mimetype(MockParser, url)
+        assert MockParser.get_mimetype.call_count == 1
+
+        cache = MIMECache(filename)
+        cache.get_mimetype(MockParser, url)
+        assert MockParser.get_mimetype.call_count == 2
+
+
+def test_mime_cache_failure():
+
+    class MockParser(BaseMIMEParser):
+        cache_ttl = 60 * 60
+        get_mimetype = mock.Mock(side_effect=IOError('Connection refused'))
+
+    url = 'http://a.com/a'
+    cache = MIMECache(negative_ttl=60)
+
+    with pytest.raises(IOError):
+        cache.get_mimetype(MockParser, url)
+
+    # The host shouldn't be contacted again while the failure is cached
+    with pytest.raises(MIMEParserError):
+        cache.get_mimetype(MockParser, url)
+    assert MockParser.get_mimetype.call_count == 1
+
+    MockParser.get_mimetype.side_effect = None
+    MockParser.get_mimetype.return_value = (url, None)
+    with mock.patch('time.time', return_value=time.time() + 61):
+        assert cache.get_mimetype(MockParser, url) == (url, None)
+    assert MockParser.get_mimetype.call_count == 2
+
+    # Pages where no media was found are also retried after the negative ttl
+    with mock.patch('time.time', return_value=time.time() + 61 * 2):
+        cache.get_mimetype(MockParser, url)
+    assert MockParser.get_mimetype.call_count == 3
+
+
+def test_http_session():
+
+    session = HTTPSession(user_agent='test-agent', timeout=5)
+    assert session.headers['User-Agent'] == 'test-agent'
+    assert 'gzip' in session.headers['Accept-Encoding']
+    assert HTTPSession().headers['User-Agent'].startswith('desktop:')
+
+    # A timeout is always passed down to the adapter
+    with mock.patch('requests.Session.send') as send:
+        session.get('http://www.example.com')
+        assert send.call_args[1]['timeout'] == 5
+        session.get('http://www.example.com', timeout=1)
+        assert send.call_args[1]['timeout'] == 1
+
+    # The same adapter, and its connection pool, is re-used for every host
+    assert (session.get_adapter('https://i.imgur.com') is
+            session.get_adapter('https://api.gfycat.com'))
+
+
+def test_http_session_injected():
+
+    session = mock.Mock()
+    session.get.return_value.json.return_value = {
+        'gfyItem': {'mp4Url': 'https://giant.gfycat.com/Test.mp4'}}
+
+    original = mime_parsers.get_session()
+    mime_parsers.set_session(session)
+    try:
+        url = 'https://gfycat.com/Test'
+        assert GfycatMIMEParser.get_mimetype(url) == (
+            'https://giant.gfycat.com/Test.mp4', 'video/mp4')
+        session.get.assert_called_once_with(
+            'https://api.gfycat.com/v1/gfycats/Test')
+    finally:
+        mime_parsers.set_session(original)
+
+
+def test_mime_resolver():
+
+    started, release = threading.Event(), threading.Event()
+
+    def resolve(url):
+        started.set()
+        release.wait(5)
+        return url + '.mp4', 'video/mp4'
+
+    class MockParser(BaseMIMEParser):
+        cache_ttl = 60
+        get_mimetype = mock.Mock(side_effect=resolve)
+
+    url = 'http://a.com/a'
+    cache = MIMECache()
+    resolver = MIMEResolver(cache, ParserRegistry([MockParser]),
+                            max_workers=1)
+
+    resolver.prefetch(url)
+    assert started.wait(5)
+
+    # The only worker is busy, so the next links are queued
+    resolver.prefetch('http://a.com/b')
+    resolver.prefetch('http://a.com/c')
+    resolver.prefetch(url)
+    assert list(resolver._pending) == ['http://a.com/b', 'http://a.com/c']
+
+    resolver.cancel()
+    release.set()
+    resolver.wait(url, timeout=5)
+
+    # Resolved and cached exactly once
+    assert cache.get_mimetype(MockParser, url) == (url + '.mp4',
+                                                   'video/mp4')
+    assert MockParser.get_mimetype.call_count == 1
+
+    resolver.prefetch(url)
+    assert not resolver._pending
+
+
+def test_mime_resolver_no_prefetch():
+
+    # Parsers that use up an API quota only run when the link is opened
+    class MockParser(BaseMIMEParser):
+        cache_ttl = 60
+        prefetch = False
+        get_mimetype = mock.Mock(return_value=('http://a.com/a.png',
+                                               'image/png'))
+
+    url = 'http://a.com/a'
+    resolver = MIMEResolver(MIMECache(), ParserRegistry([MockParser]),
+                            max_workers=1)
+    resolver.prefetch(url)
+    for _ in range(500):
+        if not resolver._workers:
+            break
+        time.sleep(0.01)
+    assert url in resolver._resolved
+    assert not MockParser.get_mimetype.called
+    assert not ImgurApiMIMEParser.prefetch
+
+
+def test_mime_resolver_disabled():
+
+    resolver = MIMEResolver(MIMECache(), ParserRegistry(parsers),
+                            max_workers=0)
+    resolver.prefetch('http://a.com/a')
+    assert not resolver._pending
+    assert not resolver._workers
+
+
+@pytest.mark.parametrize('meta,expected', [
+    (b'<meta property="og:image" content="https://a.com/a.jpg" />'
+     b'<meta property="og:video" content="https://a.com/a.mp4">',
+     ('https://a.com/a.mp4', 'video/mp4')),
+    (b'<meta property="og:image" content="https://a.com/a.jpg" />',
+     ('https://a.com/a.jpg', 'image/jpeg'))])
+def test_scan_page_stops_early(meta, expected):
+
+    head = (b'<html><head><title>Test</title>' + meta +
+            b'</head><body>')
+    chunks = [head[:40], head[40:]] + [b'<p>filler</p>' * 100] * 100
+
+    response = mock.Mock()
+    response.headers = {'Content-Type': 'text/html'}
+    response.iter_content.return_value = iter(chunks)
+    session = mock.Mock()
+    session.get.return_value = response
+
+    original = mime_parsers.get_session()
+    mime_parsers.set_session(session)
+    try:
+        url = 'https://www.example.com/page'
+        assert OpenGraphMIMEParser.get_mimetype(url) == expected
+        session.get.assert_called_once_with(url, stream=True)
+    finally:
+        mime_parsers.set_session(original)
+
+    # Only the chunks up to the end of the <head> should have been read
+    assert len(list(response.iter_content.return_value)) == 100
+    assert response.close.called
+
+
+def test_scan_page_body_meta():
+
+    # The tags are found even when they're placed after the <head>
+    page = (b'<html><head><title>Test</title></head><body>' +
+            b'<p>filler</p>' * 100 +
+            b'<meta property="og:image" content="https://a.com/a.jpg" />'
+            b'</body></html>')
+    chunks = [page[i:i + 64] for i in range(0, len(page), 64)]
+
+    response = mock.Mock()
+    response.headers = {'Content-Type': 'text/html'}
+    response.iter_content.return_value = iter(chunks)
+    session = mock.Mock()
+    session.get.return_value = response
+
+    original = mime_parsers.get_session()
+    mime_parsers.set_session(session)
+    try:
+        url = 'https://www.example.com/page'
+        assert OpenGraphMIMEParser.get_mimetype(url) == (
+            'https://a.com/a.jpg', 'image/jpeg')
+    finally:
+        mime_parsers.set_session(original)
+
+    assert response.close.called
+
+
+def test_scan_page_imgur_stops_early():
+
+    # The page has no twitter:image tag, but the other meta tags show that
+    # there's no need to look for it in the <body>
+    head = (b'<html><head><title>Test</title>'
+            b'<meta property="og:image" content="https://i.imgur.com/a.jpg">'
+            b'</head><body>')
+    chunks = [head] + [b'<p>filler</p>' * 100] * 100
+
+    response = mock.Mock()
+    response.headers = {'Content-Type': 'text/html'}
+    response.iter_content.return_value = iter(chunks)
+    session = mock.Mock()
+    session.get.return_value = response
+
+    original = mime_parsers.get_session()
+    mime_parsers.set_session(session)
+    try:
+        url = 'https://imgur.com/a'
+        assert ImgurScrapeMIMEParser.get_mimetype(url) == (url, None)
+    finally:
+        mime_parsers.set_session(original)
+
+    assert len(list(response.iter_content.return_value)) == 100
+
+
+def test_parser_registry():
+
+    registry = ParserRegistry(parsers)
+    for url, _, _ in URLS.values():
+        linear = next(p for p in parsers if p.pattern.match(url))
+        assert registry.find(url) is linear
+
+    urls = [
+        'https://m.imgur.com/yW0kbMi',
+        'https://i.imgur.com/yW0kbMi.gifv',
+        'https://www.youtube.com/watch?v=FjNdYp2gXRY',
+        'youtu.be/FjNdYp2gXRY',
+        'https://example.com/notgfycat.com/video',
+        'http://[invalid',
+    ]
+    for url in urls:
+        linear = next(p for p in parsers if p.pattern.match(url))
+        assert registry.find(url) is linear
+
+
+def test_parser_registry_plugins(tmpdir):
+
+    tmpdir.join('custom.py').write(
+        'import re\n'
+        'from rtv.mime_parsers import BaseMIMEParser\n'
+        '\n'
+        'class CustomMIMEParser(BaseMIMEParser):\n'
+        '    pattern = re.compile(r"https://gfycat\\.com/custom$")\n'
+        '    domains = ("gfycat.com",)\n'
+        '\n'
+        '\n'
+        'class AnyMIMEParser(BaseMIMEParser):\n'
+        '    pattern = re.compile(r"https://.*/any$")\n'
+        '\n'
+        'parsers = [CustomMIMEParser, AnyMIMEParser]\n')
+    tmpdir.join('broken.py').write('raise ValueError()\n')
+
+    registry = ParserRegistry(parsers, plugin_dir=tmpdir.strpath)
+    assert not registry._plugins_loaded
+
+    parser = registry.find('https://gfycat.com/custom')
+    assert parser.__name__ == 'CustomMIMEParser'
+    assert registry.parsers[0] is parser
+    assert registry.find('https://gfycat.com/other') is GfycatMIMEParser
+
+    # Parsers without domains take priority over the indexed built-ins too
+    parser = registry.find('https://gfycat.com/any')
+    assert parser.__name__ == 'AnyMIMEParser'
+    assert registry.find('https://example.com/any') is parser
+
+    # A missing directory is ignored
+    registry = ParserRegistry(parsers, plugin_dir=tmpdir.join('x').strpath)
+    assert registry.find('https://gfycat.com/custom') is GfycatMIMEParser
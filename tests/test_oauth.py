@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+import time
+
 import requests
 
-from rtv.oauth import OAuthHelper, OAuthHandler
+from rtv.oauth import OAuthHelper, OAuthHandler, TokenRefresher
 from rtv.exceptions import InvalidRefreshToken
 from rtv.packages.praw.errors import OAuthException
 
@@ -103,6 +105,50 @@ def test_oauth_authorize_with_refresh_token(oauth, refresh_token):
     assert oauth.config.refresh_token is None
 
 
+def test_oauth_authorize_with_refresh_task(oauth, refresh_token):
+
+    oauth.config.refresh_token = refresh_token
+
+    # The result of a refresh that was started in the background is used
+    # instead of sending a new request
+    refresh = mock.Mock()
+    with mock.patch.object(oauth.reddit, 'refresh_access_information'):
+        oauth.authorize(autologin=True, refresh=refresh)
+        assert refresh.result.called
+        assert not oauth.reddit.refresh_access_information.called
+
+    # Errors from the background request are handled the same way
+    refresh.result.side_effect = OAuthException('', '')
+    oauth.authorize(autologin=True, refresh=refresh)
+    assert isinstance(oauth.term.loader.exception, InvalidRefreshToken)
+    assert oauth.config.refresh_token is None
+
+
+def test_oauth_token_refresher(reddit):
+
+    refresher = TokenRefresher(reddit, margin=60)
+
+    # Nothing to refresh until logged in with a refreshable token
+    assert refresher.seconds_until_refresh() is None
+    reddit.refresh_token = 'secrettoken'
+    reddit.access_token = 'accesstoken'
+    reddit.access_token_expires = time.time() + 3600
+    assert 3500 < refresher.seconds_until_refresh() <= 3540
+
+    reddit.access_token_expires = time.time() + 30
+    assert refresher.seconds_until_refresh() == 0
+
+    with mock.patch.object(reddit, 'refresh_access_information') as refresh:
+        assert refresher.refresh()
+        assert refresh.called
+        assert refresher.refreshes == 1
+
+        # Failures are logged and retried later
+        refresh.side_effect = OAuthException('', '')
+        assert not refresher.refresh()
+        assert refresher.refreshes == 1
+
+
 def test_oauth_authorize_without_autologin(oauth, terminal, refresh_token):
 
     # The welcome message should be displayed when autologin is set to
@@ -118,9 +164,12 @@ def test_oauth_authorize_without_autologin(oauth, terminal, refresh_token):
 def test_oauth_clear_data(oauth):
     oauth.config.refresh_token = 'secrettoken'
     oauth.reddit.refresh_token = 'secrettoken'
+    oauth.reddit.handler.set_account('secrettoken')
+    assert oauth.reddit.handler.account
     oauth.clear_oauth_data()
     assert oauth.config.refresh_token is None
     assert oauth.reddit.refresh_token is None
+    assert oauth.reddit.handler.account is None
 
 
 def test_oauth_authorize(oauth, reddit, stdscr, refresh_token):
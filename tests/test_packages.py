@@ -1,4 +1,16 @@
+import re
+import json
+import time
+import threading
+
+import pytest
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import parse_qs, urlparse
+
 from rtv import packages
+from rtv.packages.praw import internal
+from rtv.content import RequestHeaderRateLimiter
+from rtv.packages.praw.handlers import SingleFlight
 
 
 def test_praw3_package():
@@ -6,3 +18,387 @@ def test_praw3_package():
     assert packages.praw
     assert len(packages.__praw_hash__) == 40
     assert packages.__praw_bundled__ is True
+
+
+def build_reddit(**kwargs):
+    return packages.praw.Reddit(
+        user_agent='rtv test suite', disable_update_check=True, **kwargs)
+
+
+COMMENT = {
+    'kind': 't1',
+    'data': {
+        'id': 'c1', 'name': 't1_c1', 'body': 'Hello', 'author': 'spez',
+        'subreddit': 'python', 'link_id': 't3_s1', 'parent_id': 't3_s1',
+        'replies': '', 'score': 5,
+        'permalink': '/r/python/comments/s1/_/c1/'}}
+
+
+def test_praw3_lazy_objects():
+    reddit = build_reddit(lazy_objects=True)
+    comment = reddit._json_reddit_objecter(dict(COMMENT))
+
+    # Attributes are converted the first time that they're accessed
+    assert 'body' not in comment.__dict__
+    assert 'author' not in comment.__dict__
+    assert comment.body == 'Hello'
+    assert 'body' in comment.__dict__
+    assert isinstance(comment.author, packages.praw.objects.Redditor)
+    assert comment.author.name == 'spez'
+    assert isinstance(comment.subreddit, packages.praw.objects.Subreddit)
+    assert comment.replies == []
+
+    # Materializing fills in everything that hasn't been accessed yet
+    comment._materialize()
+    assert '_raw' not in comment.__dict__
+    assert comment.__dict__['score'] == 5
+    assert comment.__dict__['_replies'] == []
+
+
+def test_praw3_lazy_objects_disabled():
+    reddit = build_reddit()
+    assert reddit.config.lazy_objects is False
+
+    comment = reddit._json_reddit_objecter(dict(COMMENT))
+    assert comment.__dict__['body'] == 'Hello'
+    assert comment.__dict__['_replies'] == []
+    assert 'permalink' not in comment.__dict__
+
+    # The author and subreddit are only wrapped when they're accessed
+    assert comment.__dict__['_raw'] == {'author': 'spez',
+                                        'subreddit': 'python'}
+    assert 'author' not in comment.__dict__
+    assert comment.author.name == 'spez'
+    assert isinstance(comment.subreddit, packages.praw.objects.Subreddit)
+
+    # A deleted author becomes None, like it does in __setattr__
+    data = dict(COMMENT, data=dict(COMMENT['data'], author='[deleted]'))
+    comment = reddit._json_reddit_objecter(data)
+    assert comment.author is None
+
+
+def test_praw3_unescape_leaves():
+    data = {'title': 'Q&amp;A &lt;3 &#39;quoted&#39; &bogus;',
+            'url': 'https://example.com/?a=1&amp;b=2',
+            'reports': [['spam &amp; eggs', 1]],
+            'score': 1}
+    internal._unescape_leaves(data)
+    assert data['title'] == "Q&A <3 &#39;quoted&#39; &bogus;"
+    assert data['url'] == 'https://example.com/?a=1&b=2'
+    assert data['reports'] == [['spam & eggs', 1]]
+
+    # Keys are decoded too
+    data = internal._unescape_leaves({'a&amp;b': 'c&amp;d', 'e': 1})
+    assert data == {'a&b': 'c&d', 'e': 1}
+
+
+def test_praw3_unescape_top_level_list():
+    reddit = build_reddit(decode_html_entities=True)
+    content = b'["a&amp;b", {"c&amp;d": "e&amp;f"}, [["g&amp;h"]]]'
+    reddit._request = lambda *args, **kwargs: content
+
+    # The object hook is never called for the list at the top
+    data = reddit.request_json('https://www.example.com', as_objects=False)
+    assert data == ['a&b', {'c&d': 'e&f'}, [['g&h']]]
+
+
+@pytest.mark.parametrize('name', sorted(internal.JSON_BACKENDS))
+def test_praw3_json_backend(name):
+    content = b'{"a": [{"b": 1}, {"c": {"d": "\xc3\xa9"}}], "e": null}'
+    loads = internal._get_json_backend(name)
+
+    assert loads(content) == {'a': [{'b': 1}, {'c': {'d': '\xe9'}}], 'e': None}
+
+    # The hook is called on the innermost objects first
+    seen = []
+
+    def hook(obj):
+        seen.append(sorted(obj))
+        return len(obj)
+    assert loads(content, hook) == 2
+    assert seen == [['b'], ['d'], ['c'], ['a', 'e']]
+
+    with pytest.raises(packages.praw.errors.ClientException):
+        internal._get_json_backend('missing')
+
+
+def test_praw3_access_token_expires():
+    reddit = packages.praw.Reddit(user_agent='rtv test suite')
+    reddit.set_oauth_app_info('client_id', 'client_secret', 'redirect_uri')
+    assert reddit.access_token_expires is None
+
+    now = time.time()
+    reddit.set_access_credentials(
+        {'read'}, 'token', 'refresh', update_user=False, expires_in=3600)
+    assert reddit.access_token == 'token'
+    assert now + 3600 <= reddit.access_token_expires <= time.time() + 3600
+
+    reddit.clear_authentication()
+    assert reddit.access_token_expires is None
+
+
+def test_praw3_single_flight():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def function(value):
+        calls.append(value)
+        started.set()
+        release.wait()
+        if value == 'error':
+            raise ValueError(value)
+        return [value]
+
+    def call(key, value):
+        try:
+            results.append(flight.do(key, function, value))
+        except ValueError as e:
+            results.append(e)
+
+    for key in ('result', 'error'):
+        started.clear()
+        release.clear()
+        results = []
+        threads = [threading.Thread(target=call, args=(key, key))]
+        threads[0].start()
+        started.wait()
+        assert flight.in_flight == 1
+
+        # These callers join the request that's already in flight
+        threads.extend(threading.Thread(target=call, args=(key, key))
+                       for _ in range(3))
+        for thread in threads[1:]:
+            thread.start()
+        while flight.coalesced < (3 if key == 'result' else 6):
+            release.wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 4
+        assert all(r is results[0] for r in results)
+        assert flight.in_flight == 0
+
+    assert calls == ['result', 'error']
+    assert isinstance(results[0], ValueError)
+    assert flight.stats() == {'requests': 2, 'coalesced': 6, 'in_flight': 0}
+
+    # Once the call has finished, the next one runs the function again
+    release.set()
+    assert flight.do('result', function, 'result') == ['result']
+    assert flight.requests == 3
+
+
+def test_praw3_single_flight_interrupted():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    class Interrupt(BaseException):
+        pass
+
+    def function():
+        started.set()
+        release.wait()
+        raise Interrupt()
+
+    def call():
+        try:
+            results.append(flight.do('key', function))
+        except Interrupt as e:
+            results.append(e)
+
+    # The callers that are waiting see the same exception as the leader,
+    # even though it's not an Exception subclass
+    results = []
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    while flight.coalesced < 2:
+        release.wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 3
+    assert all(isinstance(r, Interrupt) for r in results)
+    assert flight.in_flight == 0
+
+
+class StandInServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Serves a tiny subset of the reddit api from a background thread. The
+    responses echo the parameters of each request, so the caller can check
+    that it received the response to its own request.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, access_token=None):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ('127.0.0.1', 0), StandInRequestHandler)
+        self.access_token = access_token
+        self.log = []
+        self.log_lock = threading.Lock()
+        self.url = 'http://127.0.0.1:{0}'.format(self.server_address[1])
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.respond()
+
+    def do_POST(self):
+        self.respond()
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        form = dict((k, v[0]) for k, v in form.items())
+        path = urlparse(self.path).path
+        auth = self.headers.get('Authorization')
+        with self.server.log_lock:
+            self.server.log.append((self.command, path, auth))
+
+        # Give the other threads a chance to interleave with this request
+        time.sleep(0.002)
+
+        token = self.server.access_token
+        if token and auth != 'bearer ' + token:
+            self.send_response(401)
+            self.send_header('www-authenticate', 'Bearer error="invalid_token"')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        match = re.match(r'/r/(\w+)/(wiki/pages)?', path)
+        if path.startswith('/api/v1/access_token'):
+            data = {'access_token': 'token-2', 'scope': 'read vote'}
+        elif path.startswith('/api/morechildren'):
+            data = {'json': {'errors': [], 'data': {'things': [
+                {'kind': 't1', 'data': {
+                    'id': child, 'name': 't1_' + child, 'body': child,
+                    'link_id': form['link_id'], 'parent_id': form['link_id'],
+                    'replies': ''}}
+                for child in form['children'].split(',')]}}}
+        elif path.startswith('/api/vote'):
+            data = {'json': {'errors': [], 'data': {'id': form['id']}}}
+        elif match and not match.group(2):
+            sub = match.group(1)
+            data = {'kind': 'Listing', 'data': {'after': None, 'children': [
+                {'kind': 't3', 'data': {
+                    'id': '{0}{1}'.format(sub, i), 'subreddit': sub,
+                    'name': 't3_{0}{1}'.format(sub, i), 'title': sub,
+                    'permalink': '/r/{0}/comments/{1}/'.format(sub, i)}}
+                for i in range(5)]}}
+        elif match:
+            data = {'kind': 'wikipagelisting', 'data': ['index', 'faq']}
+        else:
+            self.send_error(404)
+            return
+
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def stand_in():
+    api = StandInServer()
+    oauth = StandInServer(access_token='token-1')
+    try:
+        yield api, oauth
+    finally:
+        api.stop()
+        oauth.stop()
+
+
+def test_praw3_concurrent_requests(stand_in):
+    api, oauth = stand_in
+
+    reddit = build_reddit(
+        handler=RequestHeaderRateLimiter(), oauth_client_id='id',
+        oauth_client_secret='secret', oauth_redirect_uri='http://127.0.0.1/')
+    reddit.config.api_url = reddit.config.permalink_url = api.url
+    reddit.config.oauth_url = oauth.url
+    reddit.set_access_credentials(
+        {'read', 'vote'}, 'token-1', 'refresh', update_user=False)
+
+    # The token has already expired, so the workers will all find out that
+    # it needs to be refreshed at the same time
+    oauth.access_token = 'token-2'
+
+    errors = []
+
+    def listing(sub):
+        submissions = list(reddit.get_subreddit(sub).get_hot(limit=5))
+        assert [s.id for s in submissions] == [
+            '{0}{1}'.format(sub, i) for i in range(5)]
+        submissions[0].upvote()
+
+    def wiki(sub):
+        # There's no wikiread scope, so this goes to the regular domain
+        pages = reddit.get_wiki_pages(sub)
+        assert [p.page for p in pages] == ['index', 'faq']
+        assert all(p.subreddit.display_name == sub for p in pages)
+
+    def morechildren(sub):
+        submission = reddit._json_reddit_objecter({'kind': 't3', 'data': {
+            'id': sub, 'name': 't3_' + sub, 'subreddit': sub,
+            'permalink': '/r/{0}/comments/{0}/'.format(sub)}})
+        children = ['{0}c{1}'.format(sub, i) for i in range(3)]
+        more = packages.praw.objects.MoreComments(
+            reddit, {'count': 3, 'children': children})
+        more._update_submission(submission)
+        assert [c.id for c in more.comments()] == children
+
+    def worker(i):
+        sub = 'sub{0}'.format(i)
+        try:
+            [listing, wiki, morechildren][i % 3](sub)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(30)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert reddit.access_token == 'token-2'
+    assert not reddit._use_oauth
+
+    # Only the first thread to see the expired token refreshed it
+    refreshes = [r for r in api.log if r[1].startswith('/api/v1/')]
+    assert len(refreshes) == 1
+
+    # The OAuth domain only saw requests with an access token, and the
+    # regular domain never did
+    assert all(auth and auth.startswith('bearer ') for _, _, auth in oauth.log)
+    assert not any(auth and auth.startswith('bearer ')
+                   for _, _, auth in api.log)
+
+    listings = [r for r in oauth.log if re.match(r'/r/\w+/.json', r[1])]
+    votes = [r for r in oauth.log if r[1].startswith('/api/vote')]
+    wikis = [r for r in api.log if '/wiki/pages' in r[1]]
+    more = [r for r in api.log if r[1].startswith('/api/morechildren')]
+    assert len(set(r[1] for r in listings)) == 10
+    assert len([r for r in votes if r[2] == 'bearer token-2']) == 10
+    assert len(wikis) == 10
+    assert len(more) == 10
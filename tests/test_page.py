@@ -49,9 +49,12 @@ def test_page_unauthenticated(reddit, terminal, config, oauth):
         # Loop
         def func(_):
             page.active = False
-        with mock.patch.object(page, 'controller'):
+        with mock.patch.object(page, 'controller'), \
+                mock.patch.object(terminal, 'cancel_prefetch'):
             page.controller.trigger = mock.MagicMock(side_effect=func)
             page.loop()
+            # Links are no longer prefetched once the page is left
+            assert terminal.cancel_prefetch.call_count == 2
         assert page.draw.called
 
         # Quit, confirm
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import pytest
+
+from rtv.records import CommentRecord, SubmissionRecord
+from rtv.packages import praw
+
+
+def test_record_mapping():
+
+    data = CommentRecord(None, type='Comment', body='hello', level=0)
+    assert data['type'] == 'Comment'
+    assert data.get('body') == 'hello'
+    assert 'body' in data
+    assert 'count' not in data
+    assert data.get('count', 1) == 1
+    with pytest.raises(KeyError):
+        data['count']
+
+    # Methods of the record should never be mistaken for keys
+    assert 'keys' not in data
+    with pytest.raises(KeyError):
+        data['keys']
+
+    data['level'] = 2
+    assert data['level'] == 2
+    assert sorted(data.keys()) == ['body', 'level', 'type']
+    assert dict(data.items()) == {'type': 'Comment', 'body': 'hello',
+                                  'level': 2}
+    assert '{type}: {body}'.format(**data) == 'Comment: hello'
+
+    # Keys that are not fields can still be added
+    data['extra'] = True
+    assert data['extra'] is True
+    assert 'extra' in data
+    assert len(data) == 4
+
+
+def test_record_slots():
+
+    data = SubmissionRecord(None)
+    assert not hasattr(data, '__dict__')
+
+
+def test_record_release_object(reddit):
+
+    submission = praw.objects.Submission(reddit, {
+        'id': 'abc123', 'title': 'Title', 'archived': True,
+        'permalink': '/comments/abc123'})
+    data = SubmissionRecord(submission, title='Title')
+    assert data['object'] is submission
+
+    data.release_object()
+    assert data._object is None
+    assert 'object' in data
+
+    # A minimal object is rebuilt without making a request
+    obj = data['object']
+    assert isinstance(obj, praw.objects.Submission)
+    assert obj.fullname == 't3_abc123'
+    assert obj.archived is True
+    assert obj.reddit_session is reddit
+
+    # Assigning a new object replaces the released one
+    data['object'] = submission
+    assert data['object'] is submission
+
+
+def test_record_release_object_unsupported(reddit):
+
+    comment = praw.objects.Comment(reddit, {'id': 'abc123', 'replies': ''})
+    data = CommentRecord(comment)
+    data.release_object()
+    assert data['object'] is comment
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+import requests
+
+from rtv.startup import (
+    StartupTrace, Task, warm_connection, is_short_link, expand_link,
+    prefetch_listing)
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def test_startup_trace():
+
+    clock = mock.Mock(side_effect=[10.0, 10.5, 11.0, 10.1, 10.3])
+    trace = StartupTrace(clock=clock)
+    with trace.phase('terminal'):
+        pass
+    with trace.phase('login'):
+        pass
+
+    assert trace.phases[0] == ('terminal', 0.5, 0.5, 'MainThread')
+    lines = trace.format().splitlines()
+    assert lines[0].split() == ['phase', 'start', '(ms)', 'time', '(ms)',
+                                'thread']
+    # Phases are ordered by when they started, not when they finished
+    assert lines[1].split() == ['login', '100.0', '200.0', 'MainThread']
+    assert lines[2].split() == ['terminal', '500.0', '500.0', 'MainThread']
+
+
+def test_startup_task():
+
+    trace = StartupTrace()
+    event = threading.Event()
+    task = Task('double', lambda x: event.wait() and x * 2, (21,), trace=trace)
+    task.start()
+    assert not task.done
+    with pytest.raises(RuntimeError):
+        task.result(timeout=0.01)
+
+    event.set()
+    assert task.result() == 42
+    assert task.done
+    assert trace.phases[0][0] == 'double'
+    assert trace.phases[0][3] == 'double'
+
+    # Exceptions are re-raised when the result is collected
+    task = Task('fail', lambda: 1 / 0).start()
+    with pytest.raises(ZeroDivisionError):
+        task.result()
+
+
+def test_startup_task_after():
+
+    calls = []
+    first = Task('first', calls.append, ('first',))
+    second = Task('second', calls.append, ('second',), after=[first])
+    second.start()
+    first.start()
+    second.result()
+    assert calls == ['first', 'second']
+
+    # The task is skipped if one of the tasks before it failed
+    failed = Task('failed', lambda: 1 / 0).start()
+    skipped = Task('skipped', calls.append, ('skipped',), after=[failed])
+    with pytest.raises(ZeroDivisionError):
+        skipped.start().result()
+    assert 'skipped' not in calls
+
+
+def test_startup_warm_connection():
+
+    session = mock.Mock()
+    headers = {'User-Agent': 'rtv test suite'}
+    assert warm_connection(session, 'https://oauth.reddit.com', headers)
+    session.head.assert_called_with(
+        'https://oauth.reddit.com', headers=headers, allow_redirects=False,
+        timeout=10)
+
+    # Errors are not fatal, the real request will try to connect again
+    session.head.side_effect = requests.ConnectionError()
+    assert not warm_connection(session, 'https://oauth.reddit.com')
+
+
+def test_startup_is_short_link():
+
+    assert is_short_link('https://redd.it/8s4kd2', 'http://redd.it')
+    assert is_short_link('http://www.redd.it/8s4kd2', 'http://redd.it')
+    assert not is_short_link('https://www.reddit.com/8s4kd2', 'http://redd.it')
+    assert not is_short_link('https://i.redd.it/x1fe4qtqzr011.png',
+                             'http://redd.it')
+    assert not is_short_link('https://redd.it/8s4kd2', None)
+
+
+def test_startup_expand_link(reddit):
+
+    url = 'https://www.reddit.com/r/Python/comments/2xmo63/'
+    with mock.patch.object(reddit.handler.http, 'head') as head:
+        assert expand_link(reddit, url) == url
+        assert not head.called
+
+        head.return_value.url = url
+        assert expand_link(reddit, 'https://redd.it/2xmo63') == url
+        args, kwargs = head.call_args
+        assert args == ('https://redd.it/2xmo63',)
+        assert kwargs['allow_redirects'] is True
+        assert kwargs['headers'] is reddit.http.headers
+
+
+def test_startup_prefetch_listing(reddit):
+
+    with mock.patch('rtv.startup.SubredditContent.from_name') as from_name:
+        assert prefetch_listing(reddit, '/r/python')
+        args, _ = from_name.call_args
+        assert args[:2] == (reddit, '/r/python')
+
+        # The loader doesn't need a terminal to run
+        loader = args[2]
+        with loader('Loading more submissions'):
+            pass
+        assert loader.exception is None
+
+        # Errors are left for the page to report
+        from_name.side_effect = ValueError()
+        assert not prefetch_listing(reddit, '/r/python')
@@ -220,6 +220,68 @@ def test_submission_move_sibling_parent(submission_page):
     assert submission_page.nav.absolute_index == 0
 
 
+def press(page, keys):
+    # Draw after every key, like the page loop, so that the jumps can tell
+    # which comments are on the screen
+    for key in keys:
+        with mock.patch.object(page, 'clear_input_queue'):
+            page.controller.trigger(key)
+        page.draw()
+
+
+def test_submission_move_parent_screen(submission_page):
+
+    nav = submission_page.nav
+    submission_page.draw()
+
+    # The parent is on the screen, so only the cursor moves
+    press(submission_page, 'jjjj')
+    assert (nav.absolute_index, nav.page_index) == (3, 0)
+    press(submission_page, 'K')
+    assert (nav.absolute_index, nav.page_index) == (2, 0)
+    assert nav.cursor_index == 2
+    assert not nav.inverted
+
+    # The same when the page is drawn from the bottom up
+    press(submission_page, 'jjjjjj')
+    assert (nav.absolute_index, nav.page_index) == (8, 8)
+    assert nav.inverted
+    press(submission_page, 'K')
+    assert (nav.absolute_index, nav.page_index) == (7, 8)
+    assert nav.cursor_index == 1
+    assert nav.inverted
+
+    # The parent is above the screen, so it's scrolled to the top
+    press(submission_page, 'K')
+    assert (nav.absolute_index, nav.page_index) == (0, 0)
+    assert nav.cursor_index == 0
+    assert not nav.inverted
+
+
+def test_submission_move_sibling_screen(submission_page):
+
+    nav = submission_page.nav
+    submission_page.draw()
+
+    # The sibling is below the screen, so it's scrolled to the bottom
+    press(submission_page, 'jJ')
+    assert (nav.absolute_index, nav.page_index) == (7, 7)
+    assert nav.cursor_index == 0
+    assert nav.inverted
+
+    press(submission_page, 'JJ')
+    assert (nav.absolute_index, nav.page_index) == (15, 15)
+
+    # The sibling is on the screen, so only the cursor moves
+    press(submission_page, 'K')
+    assert (nav.absolute_index, nav.page_index) == (14, 15)
+    assert nav.cursor_index == 1
+    press(submission_page, 'J')
+    assert (nav.absolute_index, nav.page_index) == (15, 15)
+    assert nav.cursor_index == 0
+    assert nav.inverted
+
+
 def test_submission_pager(submission_page, terminal):
 
     # View a submission with the pager
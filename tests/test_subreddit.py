@@ -545,6 +545,75 @@ def test_subreddit_draw_header(subreddit_page, refresh_token, terminal):
     terminal.stdscr.subwin.addstr.assert_any_call(0, 0, text)
 
 
+def test_subreddit_draw_cursor_move(subreddit_page, terminal):
+
+    footer = subreddit_page.FOOTER.strip()
+    with mock.patch.object(terminal, 'clear_screen') as clear_screen, \
+            mock.patch.object(terminal, 'add_line') as add_line, \
+            mock.patch.object(subreddit_page, '_draw_item') as draw_item, \
+            mock.patch.object(subreddit_page, 'clear_input_queue'):
+
+        # Moving the cursor only repaints the two affected items
+        subreddit_page.controller.trigger('j')
+        subreddit_page.draw()
+        assert draw_item.call_count == 2
+        assert not clear_screen.called
+        assert curses.doupdate.called
+        assert not add_line.called
+
+        # Anything else repaints the content, but not the header and footer
+        draw_item.reset_mock()
+        subreddit_page.draw()
+        assert draw_item.call_count == len(subreddit_page._subwindows)
+        assert clear_screen.called
+        assert not add_line.called
+
+        # The header is repainted when the page title changes
+        subreddit_page.content.name = '/r/test'
+        subreddit_page.draw()
+        add_line.assert_called_once_with(mock.ANY, '/r/test', 0, 0)
+
+        # Changing the terminal size repaints everything
+        add_line.reset_mock()
+        terminal.stdscr.ncols -= 1
+        subreddit_page.draw()
+        add_line.assert_any_call(mock.ANY, footer, 0, 0)
+
+
+def test_subreddit_draw_after_child_page(subreddit_page, terminal):
+
+    child = mock.Mock()
+    child.name = 'submission'
+    child.loop.return_value = None
+
+    def trigger(ch):
+        if child.loop.called:
+            subreddit_page.active = False
+        else:
+            subreddit_page.selected_page = child
+
+    with mock.patch.object(terminal, 'add_line') as add_line, \
+            mock.patch.object(subreddit_page.controller, 'trigger') as m:
+        m.side_effect = trigger
+
+        # The child page draws its own header over the parent's, so the
+        # parent's header is repainted once the child page is closed
+        child.loop.side_effect = lambda: add_line.reset_mock()
+        subreddit_page.draw()
+        add_line.reset_mock()
+        subreddit_page.loop()
+        assert child.loop.called
+        add_line.assert_any_call(mock.ANY, '/r/python', 0, 0)
+
+        # The same goes for programs that take over the terminal
+        subreddit_page.draw()
+        add_line.reset_mock()
+        with terminal.suspend():
+            pass
+        subreddit_page.draw()
+        add_line.assert_any_call(mock.ANY, '/r/python', 0, 0)
+
+
 def test_subreddit_frontpage_toggle(subreddit_page, terminal):
     with mock.patch.object(terminal, 'prompt_input'):
 
@@ -10,7 +10,9 @@ from textwrap import dedent
 import six
 import pytest
 
+from rtv import mime_parsers
 from rtv.theme import Theme
+from rtv.terminal import Terminal
 from rtv.docs import (HELP, REPLY_FILE, COMMENT_EDIT_FILE, TOKEN,
                       SUBMISSION_FILE, SUBMISSION_EDIT_FILE, MESSAGE_FILE)
 from rtv.exceptions import TemporaryFileError, BrowserError
@@ -21,6 +23,24 @@ except ImportError:
     import mock
 
 
+def test_terminal_mime_session(stdscr, config):
+
+    original = mime_parsers.get_session()
+    try:
+        # A session that was already set isn't replaced
+        session = mock.Mock()
+        mime_parsers.set_session(session)
+        Terminal(stdscr, config)
+        assert mime_parsers.get_session() is session
+
+        # Unless one is passed in
+        other = mock.Mock()
+        Terminal(stdscr, config, session=other)
+        assert mime_parsers.get_session() is other
+    finally:
+        mime_parsers.set_session(original)
+
+
 def test_terminal_properties(terminal, config):
 
     assert isinstance(terminal.up_arrow, six.text_type)
@@ -157,6 +177,27 @@ def test_terminal_clean_ncols(terminal):
     assert text.decode('utf-8') == 'ｈｅｌｌ'
 
 
+def test_terminal_clean_cached(terminal):
+
+    terminal.config['ascii'] = False
+    with mock.patch.object(terminal, '_clean', wraps=terminal._clean) as m:
+        assert terminal.clean('hello ❤', n_cols=10) == 'hello ❤'.encode('utf-8')
+        assert terminal.clean('hello ❤', n_cols=10) == 'hello ❤'.encode('utf-8')
+        assert m.call_count == 1
+
+        # Changing the width or the ascii setting is a different entry
+        assert terminal.clean('hello ❤', n_cols=3) == b'hel'
+        terminal.config['ascii'] = True
+        assert terminal.clean('hello ❤', n_cols=10) == b'hello ?'
+        assert m.call_count == 3
+
+        # Byte strings and unicode strings can be equal on python 2, but
+        # they shouldn't share an entry
+        assert terminal.clean(b'hello', n_cols=10) == b'hello'
+        assert terminal.clean('hello', n_cols=10) == b'hello'
+        assert m.call_count == 5
+
+
 @pytest.mark.parametrize('use_ascii', [True, False])
 def test_terminal_clean_unescape_html(terminal, use_ascii):
 
@@ -363,12 +404,13 @@ def test_terminal_open_link_mailcap(terminal):
 
     class MockMimeParser(object):
         pattern = re.compile('')
+        cache_ttl = None
 
     mock_mime_parser = MockMimeParser()
 
     with mock.patch.object(terminal, 'open_browser'), \
-            mock.patch('rtv.terminal.mime_parsers') as mime_parsers:
-        mime_parsers.parsers = [mock_mime_parser]
+            mock.patch.object(terminal._mime_registry, 'find') as find:
+        find.return_value = mock_mime_parser
 
         # Pass through to open_browser if media is disabled
         terminal.config['enable_media'] = False
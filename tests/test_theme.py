@@ -210,6 +210,14 @@ def test_theme_initialize_attributes(stdscr):
     for element in Theme.DEFAULT_ELEMENTS:
         assert isinstance(theme.get(element), int)
 
+    # Selected elements are looked up from the "@" versions
+    assert theme.get('Link', selected=True) == theme.get('@Link')
+    attr = theme.get('@CursorBlock')
+    with theme.turn_on_selected():
+        assert theme.get('CursorBlock') == attr
+    with pytest.raises(KeyError):
+        theme.get('TitleBar', selected=True)
+
     theme = Theme(use_color=False)
     theme.bind_curses()
 